@@ -1,140 +1,252 @@
 #!/usr/bin/env python3
-import feedparser
-import yaml
-from datetime import datetime, timedelta, date
+from collections import namedtuple
+from datetime import datetime, date
 from pathlib import Path
-import re
-import html
-import asyncio
-import random
-from googletrans import Translator
+import functools
+from dedup import DuplicateIndex, group_duplicates
+from feed_fetcher import OFFLINE, fetch_feed_entries, gather_feeds_async, open_feed_cache, open_parse_pool
+from metrics import RunMetrics
+from pipeline import (
+    DEFAULT_FORMATS, TranslationStage, build_arg_parser, check_date_range, get_prev_week_range,
+    open_translation_stage, render_json_document, render_jsonl, run_async, strip_html, write_atomic,
+    write_run_metrics
+)
+# safe_translate_async は互換のため translation から再エクスポートしている
+from translation import safe_translate_async
+
+# ブログまとめで出力できる形式 → 拡張子
+BLOG_FORMATS = {'md': '.md', 'json': '.json', 'jsonl': '.jsonl'}
 
 def load_blog_sources():
+    # yaml は起動を速くするためここで読み込む
+    import yaml
+
     with open('blog_sources.yaml', 'r', encoding='utf-8') as f:
         return yaml.safe_load(f)['blogs']
 
-async def safe_translate_async(translator, text, dest='ja', max_retries=2):
-    if not text or len(text.strip()) == 0:
-        return text
-    for attempt in range(max_retries):
-        try:
-            if attempt > 0:
-                await asyncio.sleep(random.uniform(1, 3))
-            result = await translator.translate(text, dest=dest)
-            return result.text if hasattr(result, 'text') else text
-        except Exception as e:
-            if attempt == max_retries - 1:
-                return text
-    return text
-
 def trim_summary(text, limit=200):
     if len(text) > limit:
         return text[:limit-3] + '...'
     return text
 
-def get_prev_week_range(today=None):
-    if today is None:
-        today = date.today()
-    # 0=Monday, 5=Saturday, 6=Sunday in weekday()
-    # Get the week ending on the most recent Saturday
-    
-    if today.weekday() == 5:
-        # Today is Saturday - get this week
-        week_end = today
-    else:
-        # Sunday-Friday - get previous Saturday
-        if today.weekday() == 6:
-            # Sunday - yesterday was Saturday
-            week_end = today - timedelta(days=1)
-        else:
-            # Monday-Friday - get last Saturday
-            days_since_saturday = today.weekday() + 2
-            week_end = today - timedelta(days=days_since_saturday)
-    
-    # Get the Sunday of that week
-    week_start = week_end - timedelta(days=6)
-    return week_start, week_end
+# ブログ記事（published は公開日の date、summary は HTML を除いた概要、
+# sources は複数のブログに載っていた場合の掲載元のブログ名）
+BlogPost = namedtuple('BlogPost', ['title', 'link', 'published', 'summary', 'sources'], defaults=((),))
 
-def fetch_blog_posts(blog_url, start_date, end_date):
-    feed = feedparser.parse(blog_url)
-    posts = []
-    
-    for entry in feed.entries:
-        pub_date = datetime(*entry.published_parsed[:6]).date()
-        if start_date <= pub_date <= end_date:
-            posts.append({
-                'title': entry.title,
-                'link': entry.link,
-                'date': pub_date.strftime('%Y-%m-%d'),
-                'summary': entry.get('summary', '')
-            })
-    
-    return sorted(posts, key=lambda x: x['date'], reverse=True)
+def clean_summary(summary):
+    """概要から HTML タグを除き、実体参照を戻して空白をまとめる"""
+    return strip_html(summary)
 
-async def generate_markdown_async(blog_data, start_date, end_date, translator):
-    md = f"# AWS ブログ記事まとめ ({start_date} ～ {end_date})\n\n"
+def fetch_blog_posts(blog_url, start_date, end_date, cache=None, offline=False, metrics=None, pool=None):
+    """期間内の記事を新しい順に BlogPost のリストで返す（パース結果は手元に残さない）
+
+    公開日やリンクのない記事は除く。pool（パース用のプロセスプール）を渡すと、
+    パースと概要のテキスト化を別プロセスで行う（渡さなければこのスレッドで行う）。
+    """
+    entries = fetch_feed_entries(blog_url, cache=cache, offline=offline, metrics=metrics, pool=pool,
+                                 clean_summary=True)
+    posts = [BlogPost(title=entry.title, link=entry.link, published=entry.published.date(),
+                      summary=entry.summary)
+             for entry in entries if start_date <= entry.published.date() <= end_date]
+    return sorted(posts, key=lambda post: post.published, reverse=True)
+
+def merge_duplicate_posts(blog_data):
+    """複数のブログに載った同じ記事を最初のブログの1件にまとめる
+
+    まとめた記事の sources に掲載元のブログ名を記録し、(新しい blog_data, 除いた件数) を返す。
+    """
+    positions = [(i, j) for i, blog in enumerate(blog_data) for j in range(len(blog['posts']))]
+
+    def _key(position):
+        post = blog_data[position[0]]['posts'][position[1]]
+        return post.link, post.title
+
+    kept = {}
+    removed = 0
+    for group in group_duplicates(positions, _key):
+        sources = []
+        for i, _ in group:
+            if blog_data[i]['name'] not in sources:
+                sources.append(blog_data[i]['name'])
+        kept[group[0]] = tuple(sources) if len(sources) > 1 else ()
+        removed += len(group) - 1
+
+    merged = []
+    for i, blog in enumerate(blog_data):
+        posts = [post._replace(sources=kept[(i, j)]) if kept[(i, j)] else post
+                 for j, post in enumerate(blog['posts']) if (i, j) in kept]
+        merged.append(dict(blog, posts=posts))
+    return merged, removed
+
+def collect_blog_texts(blog_data):
+    """翻訳対象のタイトルと概要を出力順に集める"""
+    texts = []
+    for blog in blog_data:
+        for post in blog['posts']:
+            texts.append(post.title)
+            texts.append(post.summary)
+    return texts
+
+def iter_blog_markdown(blog_data, start_date, end_date, translations):
+    """翻訳済みのテキストを使ってブログ記事まとめの Markdown をチャンクごとに返す"""
+    yield f"# AWS ブログ記事まとめ ({start_date} ～ {end_date})\n\n"
     
     for blog in blog_data:
         if not blog['posts']:
             continue
             
-        md += f"## {blog['name']}\n\n"
+        yield f"## {blog['name']}\n\n"
         for post in blog['posts']:
-            clean_summary = re.sub('<[^<]+?>', '', post['summary'])
-            clean_summary = html.unescape(clean_summary).strip()
+            title_ja = translations.get(post.title, post.title)
+            summary_ja = trim_summary(translations.get(post.summary, post.summary))
             
-            title_ja = await safe_translate_async(translator, post['title'])
-            summary_ja = await safe_translate_async(translator, clean_summary)
-            summary_ja = trim_summary(summary_ja)
-            
-            md += f"### {title_ja}\n"
-            md += f"- **日付**: {post['date']}\n"
-            md += f"- **リンク**: {post['link']}\n"
-            md += f"- **概要**: {summary_ja}\n\n"
-            md += "---\n\n"
-    
-    return md
+            sources = f"- **掲載ブログ**: {' / '.join(post.sources)}\n" if post.sources else ''
+            yield (f"### {title_ja}\n"
+                   f"- **日付**: {post.published.isoformat()}\n"
+                   f"- **リンク**: {post.link}\n"
+                   f"{sources}"
+                   f"- **概要**: {summary_ja}\n\n"
+                   "---\n\n")
+
+def iter_blog_items(blog_data, translations):
+    """記事ごとの構造化データ（原文と訳文）を出力順に返す"""
+    for blog in blog_data:
+        for post in blog['posts']:
+            yield {
+                'blog': blog['name'],
+                'sources': list(post.sources or (blog['name'],)),
+                'title': post.title,
+                'title_ja': translations.get(post.title, post.title),
+                'link': post.link,
+                'date': post.published.isoformat(),
+                'summary': post.summary,
+                'summary_ja': translations.get(post.summary, post.summary),
+            }
+
+def render_blog_report(fmt, blog_data, start_date, end_date, translations):
+    """指定した形式でブログ記事まとめをチャンクとして返す"""
+    if fmt == 'md':
+        return iter_blog_markdown(blog_data, start_date, end_date, translations)
+    items = iter_blog_items(blog_data, translations)
+    if fmt == 'jsonl':
+        return render_jsonl(items)
+    meta = {
+        'title': f"AWS ブログ記事まとめ ({start_date} ～ {end_date})",
+        'start_date': start_date,
+        'end_date': end_date,
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'total': sum(len(blog['posts']) for blog in blog_data),
+    }
+    return render_json_document(meta, items)
 
-async def main_async():
+def render_blog_markdown(blog_data, start_date, end_date, translations):
+    """ブログ記事まとめの Markdown を1つの文字列として返す"""
+    return ''.join(iter_blog_markdown(blog_data, start_date, end_date, translations))
+
+async def generate_markdown_async(blog_data, start_date, end_date, translator, cache=None):
+    """記事を翻訳してブログ記事まとめの Markdown を返す（翻訳は TranslationStage で行う）"""
+    stage = TranslationStage(translator, cache)
+    translations = await stage.translate_all(
+        collect_blog_texts(blog_data), {post.summary for blog in blog_data for post in blog['posts']})
+    return render_blog_markdown(blog_data, start_date, end_date, translations)
+
+async def main_async(translator_name=None, offline=OFFLINE, start_date=None, end_date=None,
+                     formats=None):
     blogs = load_blog_sources()
     today = date.today()
-    prev_sunday, prev_saturday = get_prev_week_range()
+    if start_date is None or end_date is None:
+        start_date, end_date = get_prev_week_range()
+    if formats is None:
+        formats = [fmt for fmt in DEFAULT_FORMATS if fmt in BLOG_FORMATS] or ['md']
     
     print(f"Today: {today} ({today.strftime('%A')}), weekday={today.weekday()}")
-    print(f"Week range: {prev_sunday} to {prev_saturday}")
+    print(f"Week range: {start_date} to {end_date}")
+    metrics = RunMetrics()
     
-    translator = Translator()
+    with metrics.stage('translator_setup'):
+        stage = await open_translation_stage(translator_name, check=False)
     
+    # 全フィードを並列に取得する（失敗したフィードは空として扱う）
+    # パースはプロセスプールで行い、取得できたフィードの記事から翻訳待ちに加える。
+    # 重複をまとめたあとに残る記事（ブログの並び順で最初のもの）だけを送るため、
+    # 前のブログがすべてそろった分から順に調べる（失敗したブログより後ろは取得後にまとめて加える）
+    print(f"Fetching {len(blogs)} feeds...")
+    feed_cache = open_feed_cache()
+    duplicate_index = DuplicateIndex()
+    arrived = {}
+    released = 0
+
+    def _queue_posts(index, posts):
+        nonlocal released
+        arrived[index] = posts
+        while released in arrived:
+            kept = [post for post in arrived.pop(released) if duplicate_index.add(post.link, post.title)]
+            stage.queue(collect_blog_texts([{'posts': kept}]), {post.summary for post in kept}, metrics)
+            released += 1
+
+    with open_parse_pool(feeds=len(blogs)) as pool, metrics.stage('fetch'):
+        results = await gather_feeds_async(
+            functools.partial(fetch_blog_posts, cache=feed_cache, offline=offline, metrics=metrics, pool=pool),
+            [(blog['url'], start_date, end_date) for blog in blogs],
+            on_result=_queue_posts
+        )
     blog_data = []
-    for blog in blogs:
-        print(f"Fetching {blog['name']}...")
-        posts = fetch_blog_posts(blog['url'], prev_sunday, prev_saturday)
+    failures = 0
+    for blog, (posts, error) in zip(blogs, results):
+        if error is not None:
+            failures += 1
+            print(f"Failed to fetch {blog['name']}: {error}")
+            posts = []
         blog_data.append({
             'name': blog['name'],
             'posts': posts
         })
+    print(f"Fetched {len(blogs) - failures}/{len(blogs)} feeds")
+    metrics.count('feed_failures', failures)
+    with metrics.stage('dedup'):
+        blog_data, duplicates = merge_duplicate_posts(blog_data)
+    if duplicates:
+        print(f"Merged {duplicates} duplicate posts")
+    metrics.count('duplicate_posts', duplicates)
+    metrics.count('items', sum(len(blog['posts']) for blog in blog_data))
+    if feed_cache is not None:
+        print(feed_cache.summary())
+        feed_cache.report_metrics(metrics)
     
     print("Translating...")
-    markdown = await generate_markdown_async(
-        blog_data,
-        prev_sunday.strftime('%Y-%m-%d'),
-        prev_saturday.strftime('%Y-%m-%d'),
-        translator
-    )
-    
+    texts = collect_blog_texts(blog_data)
+    metrics.count('translate_texts', len(set(texts)))
+    stage.queue(texts, {post.summary for blog in blog_data for post in blog['posts']}, metrics)
+    translations = await stage.flush(metrics)
+    metrics.add_overlap('translate_overlap', 'fetch', 'translate')
     output_dir = Path('output')
     output_dir.mkdir(exist_ok=True)
     
-    filename = f"awsblogs_{prev_sunday.strftime('%Y-%m-%d')}_{prev_saturday.strftime('%Y-%m-%d')}.md"
-    output_path = output_dir / filename
-    
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(markdown)
-    
-    print(f"Generated: {output_path}")
+    with metrics.stage('render'):
+        for fmt in formats:
+            filename = f"awsblogs_{start_date.strftime('%Y-%m-%d')}_{end_date.strftime('%Y-%m-%d')}{BLOG_FORMATS[fmt]}"
+            output_path = output_dir / filename
+        
+            write_atomic(output_path, render_blog_report(
+                fmt,
+                blog_data,
+                start_date.strftime('%Y-%m-%d'),
+                end_date.strftime('%Y-%m-%d'),
+                translations
+            ))
+        
+            print(f"Generated: {output_path}")
+    metrics.count('reports', len(formats))
+    stage.report_metrics(metrics)
+    stage.close()
+    write_run_metrics(metrics, 'awsblogs', start_date, end_date, output_dir=str(output_dir), formats=formats)
 
-def main():
-    asyncio.run(main_async())
+def main(argv=None):
+    parser = build_arg_parser('AWS ブログ記事を取得・翻訳してまとめます', formats=tuple(BLOG_FORMATS))
+    args = check_date_range(parser, parser.parse_args(argv))
+    run_async(main_async(translator_name=args.translator, offline=args.offline,
+                         start_date=args.start, end_date=args.end, formats=args.formats),
+              args.profile)
 
 if __name__ == '__main__':
     main()
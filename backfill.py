@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+過去の週次レポートをまとめて生成する
+
+    python backfill.py --start 2025-09-01 --end 2025-11-29
+
+期間を日曜日～土曜日の週に分け（両端の週も丸ごと含める）、フィードの取得・分類・翻訳を
+一度だけ行ってから、週ごとのレポートを並列に出力する。
+"""
+import os
+import sys
+sys.path.insert(0, os.path.dirname(__file__))
+
+from pipeline import (
+    DEFAULT_FORMATS, build_arg_parser, check_date_range, run_async, run_whats_new_reports, split_weeks
+)
+
+BACKFILL_INTRO = "この週の AWS サービスアップデート情報をまとめています。"
+
+async def backfill_async(start_date, end_date, translator_name=None, offline=False,
+                         formats=DEFAULT_FORMATS):
+    weeks = split_weeks(start_date, end_date)
+    print(f"{len(weeks)} 週分のレポートを生成します: {weeks[0][0]} ～ {weeks[-1][1]}")
+    return await run_whats_new_reports(weeks, translator_name=translator_name, offline=offline,
+                                       intro=BACKFILL_INTRO, formats=formats)
+
+def main(argv=None):
+    parser = build_arg_parser('指定した期間の週次レポートをまとめて生成します', require_range=True)
+    args = check_date_range(parser, parser.parse_args(argv))
+    run_async(backfill_async(args.start, args.end, translator_name=args.translator,
+                             offline=args.offline, formats=args.formats),
+              args.profile)
+
+if __name__ == '__main__':
+    main()
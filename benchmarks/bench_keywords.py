@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+highlight_keywords / is_important_update のベンチマーク
+（旧: キーワードごとの str.replace と部分一致 / 新: 部分一致で絞り込んでから必要なときだけ正規表現）
+重要度の判定は分類ステージで英語の原文に対して行うので、合成フィードのタイトル・概要でも計測する。
+
+    python benchmarks/bench_keywords.py --texts 5000 --repeat 5 --keyword-ratio 0.05
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..'))
+sys.path.insert(0, BENCH_DIR)
+from feeds import make_entries
+from pipeline import IMPORTANT_KEYWORDS, highlight_keywords, is_important_update, strip_html
+
+FILLER = ['Amazon EC2 の', 'で利用可能になりました', 'AWS コンソールから', '追加料金なしで',
+          'すべての商用リージョンで', 'GAME', 'の', 'に対応しました', 'ドキュメントを参照してください']
+
+def highlight_keywords_replace(text):
+    """変更前の実装（キーワードごとに str.replace する）"""
+    for keyword in IMPORTANT_KEYWORDS:
+        text = text.replace(keyword, f'**{keyword}**')
+    return text
+
+def is_important_update_scan(title, summary):
+    """変更前の実装（キーワードごとに部分一致を調べる）"""
+    for keyword in IMPORTANT_KEYWORDS:
+        if keyword in title or keyword in summary:
+            return True
+    return False
+
+def make_texts(count, keyword_ratio=0.05, seed=0):
+    """キーワードを含む・含まない翻訳済みテキスト風の文字列を生成する"""
+    rng = random.Random(seed)
+
+    def _word():
+        return rng.choice(IMPORTANT_KEYWORDS if rng.random() < keyword_ratio else FILLER)
+
+    return [''.join(_word() for _ in range(rng.randint(5, 40))) for _ in range(count)]
+
+def bench(func, args_list, repeat):
+    """repeat 回実行した中で最速の所要時間（秒）を返す"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for args in args_list:
+            func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='キーワード強調・重要度判定のベンチマーク')
+    parser.add_argument('--texts', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--keyword-ratio', type=float, default=0.05,
+                        help='単語のうち重要キーワードにする割合')
+    args = parser.parse_args(argv)
+
+    texts = make_texts(args.texts, args.keyword_ratio)
+    single = [(t,) for t in texts]
+    pairs = [(t[:40], t) for t in texts]
+    english = [(title, strip_html(summary)) for title, _, summary, _ in make_entries(args.texts)]
+    results = [
+        ('highlight (str.replace)', bench(highlight_keywords_replace, single, args.repeat)),
+        ('highlight (new)', bench(highlight_keywords, single, args.repeat)),
+        ('important (scan)', bench(is_important_update_scan, pairs, args.repeat)),
+        ('important (new)', bench(is_important_update, pairs, args.repeat)),
+        ('important en (scan)', bench(is_important_update_scan, english, args.repeat)),
+        ('important en (new)', bench(is_important_update, english, args.repeat)),
+    ]
+    # 旧実装は隣接するキーワードで **A****B** のような壊れた強調を作る
+    broken = sum('****' in highlight_keywords_replace(t) for t in texts)
+
+    print(f"texts: {len(texts)}, keywords: {len(IMPORTANT_KEYWORDS)}")
+    for name, seconds in results:
+        print(f"{name:<24}: {seconds * 1000:8.2f} ms ({len(texts) / seconds:,.0f} texts/s)")
+    print(f"old highlighter produced broken markers (****) in {broken} texts")
+
+if __name__ == '__main__':
+    main()
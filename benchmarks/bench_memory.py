@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+取得～分類のメモリ使用量のベンチマーク
+（旧: 項目ごとの dict + 文字列の日付、パース結果を保持 / 新: UpdateItem + date、パース結果を解放）
+
+    python benchmarks/bench_memory.py --entries 10000
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import date
+
+import feedparser
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from entry_archive import entries_in_range, extract_entries, select_range
+from feeds import make_feed
+from pipeline import classify_entries, get_category, is_important_update, strip_html
+
+def classify_dicts(entries):
+    """変更前の実装（項目ごとに dict を作り、日付を文字列にする）"""
+    grouped = defaultdict(list)
+    service_count = defaultdict(int)
+    for entry in entries:
+        title = entry.title
+        summary = strip_html(entry.summary)
+        category, svc = get_category(title)
+        grouped[category].append({
+            'title': title,
+            'link': entry.link,
+            'summary': summary,
+            'service': svc,
+            'important': is_important_update(title, summary),
+            'date': entry.published.date().strftime('%Y-%m-%d')
+        })
+        if svc:
+            service_count[svc] += 1
+    return grouped, service_count
+
+def run_old(xml, start_date, end_date):
+    feed = feedparser.parse(xml)
+    grouped = classify_dicts(entries_in_range(feed.entries, start_date, end_date))
+    # 旧実装ではパース結果が実行の最後まで参照されていた
+    return feed, grouped
+
+def run_new(xml, start_date, end_date):
+    entries = extract_entries(feedparser.parse(xml).entries)
+    return classify_entries(select_range(entries, start_date, end_date))
+
+def measure(func, *args):
+    """(保持しているメモリ, ピークメモリ, 所要時間) を返す"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current, peak, elapsed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='取得～分類のメモリ使用量のベンチマーク')
+    parser.add_argument('--entries', type=int, default=10000)
+    args = parser.parse_args(argv)
+
+    xml = make_feed(args.entries)
+    # すべてのエントリが入る期間を対象にする（複数か月分のアーカイブを描画する場合に相当）
+    start_date, end_date = date(2000, 1, 1), date(2100, 1, 1)
+
+    mib = 1024 * 1024
+    print(f"entries: {args.entries}, feed size: {len(xml) / mib:.1f} MiB")
+    results = {}
+    for name, func in (('dict + raw feed', run_old), ('UpdateItem', run_new)):
+        current, peak, elapsed = measure(func, xml, start_date, end_date)
+        results[name] = current
+        print(f"{name:<16}: retained {current / mib:7.1f} MiB / peak {peak / mib:7.1f} MiB / {elapsed:.2f} s")
+    print(f"retained memory reduced by {1 - results['UpdateItem'] / results['dict + raw feed']:.0%}")
+
+    # 項目の表現だけの差（抽出済みのエントリを分類した結果が保持するメモリ）
+    entries = extract_entries(feedparser.parse(xml).entries)
+    print("classification only (entries already extracted):")
+    for name, func in (('dict', classify_dicts), ('UpdateItem', classify_entries)):
+        current, peak, elapsed = measure(func, entries)
+        print(f"  {name:<14}: retained {current / mib:7.1f} MiB / peak {peak / mib:7.1f} MiB / {elapsed:.2f} s")
+
+if __name__ == '__main__':
+    main()
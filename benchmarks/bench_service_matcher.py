@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+get_category のベンチマーク（旧: マッピングの線形走査 / 新: コンパイル済みマッチャー）
+
+    python benchmarks/bench_service_matcher.py --titles 5000 --repeat 5
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from pipeline import CATEGORY_MAPPINGS, get_category
+
+VERBS = ['now supports', 'announces general availability of', 'adds', 'launches', 'expands', 'introduces']
+NOUNS = ['new instance types', 'cross-region replication', 'IPv6 endpoints', 'additional regions',
+         'fine-grained access control', 'cost allocation tags', 'PrivateLink support']
+
+def get_category_linear(title):
+    """変更前の実装（マッピングを順に部分一致で走査する）"""
+    for svc, cat in CATEGORY_MAPPINGS.items():
+        if svc in title:
+            return cat, svc
+    return 'その他', None
+
+def make_titles(count, seed=0):
+    """サービス名を含む・含まないタイトルを混ぜて生成する"""
+    rng = random.Random(seed)
+    services = list(CATEGORY_MAPPINGS)
+    titles = []
+    for i in range(count):
+        noun = rng.choice(NOUNS)
+        if i % 5 == 0:
+            titles.append(f"Unknown Service {rng.choice(VERBS)} {noun}")
+            continue
+        subject = rng.choice(services)
+        title = f"{subject} {rng.choice(VERBS)} {noun}"
+        if i % 3 == 0:
+            title += f" for {rng.choice(services)}"
+        titles.append(title)
+    return titles
+
+def bench(func, titles, repeat):
+    """repeat 回実行した中で最速の所要時間（秒）を返す"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for title in titles:
+            func(title)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='get_category のベンチマーク')
+    parser.add_argument('--titles', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    titles = make_titles(args.titles)
+    linear = bench(get_category_linear, titles, args.repeat)
+    compiled = bench(get_category, titles, args.repeat)
+    changed = sum(get_category_linear(t) != get_category(t) for t in titles)
+
+    print(f"titles: {len(titles)}, services: {len(CATEGORY_MAPPINGS)}")
+    print(f"linear scan : {linear * 1000:8.2f} ms ({len(titles) / linear:,.0f} titles/s)")
+    print(f"matcher     : {compiled * 1000:8.2f} ms ({len(titles) / compiled:,.0f} titles/s)")
+    print(f"speedup     : {linear / compiled:.1f}x")
+    print(f"different results: {changed} (leftmost / longest match instead of mapping order)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+オフラインのベンチマークスイート
+
+合成フィード（RSS / Atom）と待ち時間を入れたローカル翻訳（local バックエンド）で
+取得～出力までを実行し、所要時間・ステージごとの時間・ピークメモリと、
+get_category / highlight_keywords / strip_html / trim_summary のスループットを計測する。
+結果は JSON で保存でき、基準値（benchmarks/baseline.json）と比べて遅くなった項目を表示する。
+
+    python benchmarks/bench_suite.py --sizes 100,1000,10000 --source http
+    python benchmarks/bench_suite.py --sizes 50000 --formats rss --no-memory
+    python benchmarks/bench_suite.py --baseline benchmarks/baseline.json --fail-on-regression
+    python benchmarks/bench_suite.py --save-baseline
+"""
+import argparse
+import asyncio
+import glob
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager, redirect_stdout
+from datetime import timedelta
+from functools import partial
+from unittest.mock import patch
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..'))
+sys.path.insert(0, BENCH_DIR)
+import pipeline
+from bench_keywords import make_texts
+from feeds import FEED_BASE, FEED_FORMATS, make_entries, serve_feeds, write_feed
+from pipeline import get_category, highlight_keywords, strip_html, trim_summary
+from rate_limiter import AdaptiveRateLimiter
+
+BASELINE_PATH = os.path.join(BENCH_DIR, 'baseline.json')
+
+# ベンチマーク中はキャッシュ・アーカイブを使わず、毎回フィードの取得と翻訳を行う
+BENCH_ENV = {
+    'AWS_UPDATES_ARCHIVE': '0',
+    'AWS_UPDATES_FEED_CACHE': '0',
+    'AWS_UPDATES_TRANSLATION_CACHE': '0',
+    'AWS_UPDATES_METRICS': '1',
+}
+
+def parse_sizes(value):
+    return [int(size) for size in value.split(',') if size.strip()]
+
+def bench_ops(func, args_list, repeat):
+    """repeat 回実行した中で最速の1秒あたりの呼び出し回数を返す"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for args in args_list:
+            func(*args)
+        best = min(best, time.perf_counter() - start)
+    return len(args_list) / best if best else float('inf')
+
+def run_micro(count, repeat):
+    """よく呼ばれる関数のスループット（回/秒）"""
+    entries = make_entries(count)
+    titles = [(title,) for title, _, _, _ in entries]
+    summaries = [(summary,) for _, _, summary, _ in entries]
+    texts = [(text,) for text in make_texts(count)]
+    return {
+        'get_category': {'ops_per_sec': bench_ops(get_category, titles, repeat)},
+        'highlight_keywords': {'ops_per_sec': bench_ops(highlight_keywords, texts, repeat)},
+        'strip_html': {'ops_per_sec': bench_ops(strip_html, summaries, repeat)},
+        'trim_summary': {'ops_per_sec': bench_ops(trim_summary, texts, repeat)},
+    }
+
+@contextmanager
+def feed_url(size, fmt, source, tmpdir, latency=0.0):
+    """合成フィードの URL（file:// またはローカルの HTTP サーバー）"""
+    if source == 'file':
+        yield write_feed(os.path.join(tmpdir, f"feed_{fmt}_{size}.xml"), size, fmt)
+        return
+    with serve_feeds({'/feed': FEED_FORMATS[fmt](size)}, latency) as base_url:
+        yield f"{base_url}/feed"
+
+def run_report(url, start_date, end_date, output_dir, translator):
+    """1回分のレポート生成を実行し、(所要時間, 計測結果の JSON) を返す"""
+    for path in glob.glob(os.path.join(output_dir, 'metrics', '*.json')):
+        os.remove(path)
+    with patch.object(pipeline, 'OUTPUT_DIR', output_dir), redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        asyncio.run(pipeline.run_whats_new_report(start_date, end_date, translator_name=translator,
+                                                  feed_url=url, formats=['md', 'json']))
+        elapsed = time.perf_counter() - start
+    path, = glob.glob(os.path.join(output_dir, 'metrics', '*.json'))
+    with open(path, encoding='utf-8') as f:
+        return elapsed, json.load(f)
+
+def run_end_to_end(size, fmt, source, translator, fetch_latency=0.0, memory=True):
+    """合成フィード1本分の取得～出力を計測する"""
+    # フィード内のすべてのエントリを1つのレポートにする
+    start_date = (FEED_BASE - timedelta(hours=size)).date()
+    end_date = FEED_BASE.date()
+    with tempfile.TemporaryDirectory() as tmpdir, \
+            feed_url(size, fmt, source, tmpdir, fetch_latency) as url:
+        elapsed, metrics = run_report(url, start_date, end_date, tmpdir, translator)
+        result = {
+            'entries': size,
+            'items': metrics['counters'].get('items', 0),
+            'seconds': elapsed,
+            'stages': {name: stage['seconds'] for name, stage in metrics['stages'].items()},
+            'translate_requests': metrics['counters'].get('translate_requests', 0),
+        }
+        if memory:
+            # tracemalloc は処理を遅くするので、時間とは別の実行で測る
+            tracemalloc.start()
+            try:
+                run_report(url, start_date, end_date, tmpdir, translator)
+                result['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+    return result
+
+def compare(current, baseline, tolerance):
+    """基準値より悪くなった項目を (名前, 基準値, 今回, 変化率) のリストで返す
+
+    スループットは下がったもの、所要時間・ピークメモリは増えたものを tolerance（割合）を超えたら数える。
+    """
+    regressions = []
+    for name, result in current.get('micro', {}).items():
+        base = baseline.get('micro', {}).get(name)
+        if base and result['ops_per_sec'] < base['ops_per_sec'] * (1 - tolerance):
+            regressions.append((f"{name} ops/s", base['ops_per_sec'], result['ops_per_sec'],
+                                result['ops_per_sec'] / base['ops_per_sec'] - 1))
+    for name, result in current.get('end_to_end', {}).items():
+        base = baseline.get('end_to_end', {}).get(name)
+        if not base:
+            continue
+        for key in ('seconds', 'peak_bytes'):
+            if key in result and base.get(key) and result[key] > base[key] * (1 + tolerance):
+                regressions.append((f"{name} {key}", base[key], result[key], result[key] / base[key] - 1))
+    return regressions
+
+def print_results(results):
+    print("micro (ops/s):")
+    for name, result in results['micro'].items():
+        print(f"  {name:<20}: {result['ops_per_sec']:12,.0f}")
+    print("end to end:")
+    for name, result in results['end_to_end'].items():
+        stages = ' / '.join(f"{stage} {seconds:.2f}s" for stage, seconds in result['stages'].items()
+                            if stage in ('fetch', 'filter', 'classify', 'translate', 'render'))
+        peak = f" / peak {result['peak_bytes'] / 1024 / 1024:.1f} MiB" if 'peak_bytes' in result else ''
+        print(f"  {name:<12}: {result['seconds']:7.2f} s{peak} ({stages})")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='合成フィードとローカル翻訳によるオフラインのベンチマーク')
+    parser.add_argument('--sizes', type=parse_sizes, default=[100, 1000, 10000],
+                        help='フィードのエントリ数（カンマ区切り、既定: 100,1000,10000）')
+    parser.add_argument('--formats', type=lambda v: v.split(','), default=list(FEED_FORMATS),
+                        help='フィードの形式（rss / atom のカンマ区切り）')
+    parser.add_argument('--source', choices=['file', 'http'], default='file',
+                        help='フィードの配信方法（file:// またはローカルの HTTP サーバー）')
+    parser.add_argument('--translate-latency', type=float, default=0.005,
+                        help='ローカル翻訳の1リクエストあたりの待ち時間（秒）')
+    parser.add_argument('--translate-rate', type=float, default=200.0,
+                        help='翻訳リクエストの送信レート（回/秒、0 でパイプラインの既定のレート制御を使う）')
+    parser.add_argument('--fetch-latency', type=float, default=0.0,
+                        help='HTTP サーバーの応答の待ち時間（秒、--source http のみ）')
+    parser.add_argument('--micro-count', type=int, default=2000, help='スループット計測の入力数')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--no-memory', dest='memory', action='store_false', help='ピークメモリを計測しない')
+    parser.add_argument('--output', help='結果を書き出す JSON ファイル')
+    parser.add_argument('--baseline', help='比較する基準値の JSON ファイル')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='遅くなったとみなす変化率（既定: 0.25）')
+    parser.add_argument('--fail-on-regression', action='store_true',
+                        help='基準値より遅くなった項目があれば終了コード 1 で終了する')
+    parser.add_argument('--save-baseline', action='store_true', help=f'結果を {BASELINE_PATH} に保存する')
+    args = parser.parse_args(argv)
+
+    env = dict(BENCH_ENV, AWS_UPDATES_LOCAL_LATENCY=str(args.translate_latency))
+    limiter = AdaptiveRateLimiter
+    if args.translate_rate:
+        # 既定のレート制御（初期 5 回/秒）では翻訳の待ちが処理時間のほとんどを占めるため固定する
+        limiter = partial(AdaptiveRateLimiter, rate=args.translate_rate, max_rate=args.translate_rate)
+    with patch.dict(os.environ, env), patch.object(pipeline, 'AdaptiveRateLimiter', limiter):
+        results = {
+            'python': platform.python_version(),
+            'config': {
+                'translate_latency': args.translate_latency,
+                'translate_rate': args.translate_rate,
+                'fetch_latency': args.fetch_latency,
+                'source': args.source,
+                'micro_count': args.micro_count,
+            },
+            'micro': run_micro(args.micro_count, args.repeat),
+            'end_to_end': {},
+        }
+        for fmt in args.formats:
+            for size in args.sizes:
+                results['end_to_end'][f"{fmt}-{size}"] = run_end_to_end(
+                    size, fmt, args.source, 'local', args.fetch_latency, args.memory)
+    print_results(results)
+
+    for path in filter(None, [args.output, BASELINE_PATH if args.save_baseline else None]):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+            f.write('\n')
+        print(f"結果を {path} に出力しました。")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for name, base, value, change in regressions:
+            print(f"遅くなりました: {name}: {base:,.3f} -> {value:,.3f} ({change:+.0%})")
+        if not regressions:
+            print(f"基準値との差は許容範囲内です（±{args.tolerance:.0%}）")
+        if regressions and args.fail_on_regression:
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
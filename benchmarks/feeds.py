@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+ベンチマーク用の合成フィード
+
+What's New 風の RSS / Atom を任意の件数で生成し、ファイルまたはローカルの HTTP サーバーから配信する。
+ネットワークに出ずに取得～出力までを実行できる（URL は file:// でも http://127.0.0.1 でもよい）。
+"""
+import os
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from pipeline import CATEGORY_MAPPINGS
+
+VERBS = ['now supports', 'announces general availability of', 'adds', 'launches', 'expands']
+NOUNS = ['new instance types', 'cross-region replication', 'IPv6 endpoints', 'additional regions']
+
+# 最新のエントリの公開日時（1時間おきに過去へさかのぼる）
+FEED_BASE = datetime(2025, 11, 30, 12, tzinfo=timezone.utc)
+
+def make_entries(count, seed=0):
+    """(タイトル, リンク, 概要の HTML, 公開日時) のリストを生成する"""
+    rng = random.Random(seed)
+    services = list(CATEGORY_MAPPINGS) or ['Amazon EC2']
+    entries = []
+    for i in range(count):
+        title = f"{rng.choice(services)} {rng.choice(VERBS)} {rng.choice(NOUNS)} ({i})"
+        summary = '<p>' + ' '.join(f"Sentence {j} about {title}." for j in range(rng.randint(2, 8))) + '</p>'
+        entries.append((title, f"https://aws.amazon.com/new/{i}/", summary, FEED_BASE - timedelta(hours=i)))
+    return entries
+
+def make_feed(count, seed=0):
+    """count 件のエントリを持つ What's New 風の RSS を生成する"""
+    items = [
+        f"<item><title>{escape(title)}</title><link>{link}</link>"
+        f"<description><![CDATA[{summary}]]></description>"
+        f"<pubDate>{format_datetime(published)}</pubDate></item>"
+        for title, link, summary, published in make_entries(count, seed)
+    ]
+    return ('<?xml version="1.0"?><rss version="2.0"><channel><title>bench</title>'
+            + ''.join(items) + '</channel></rss>')
+
+def make_atom_feed(count, seed=0):
+    """count 件のエントリを持つ Atom フィードを生成する（エントリの内容は make_feed と同じ）"""
+    items = [
+        f"<entry><title>{escape(title)}</title><link href=\"{link}\"/><id>{link}</id>"
+        f"<summary type=\"html\">{escape(summary)}</summary>"
+        f"<published>{published.isoformat()}</published><updated>{published.isoformat()}</updated></entry>"
+        for title, link, summary, published in make_entries(count, seed)
+    ]
+    return ('<?xml version="1.0" encoding="utf-8"?><feed xmlns="http://www.w3.org/2005/Atom">'
+            f"<title>bench</title><id>urn:bench</id><updated>{FEED_BASE.isoformat()}</updated>"
+            + ''.join(items) + '</feed>')
+
+FEED_FORMATS = {'rss': make_feed, 'atom': make_atom_feed}
+
+def write_feed(path, count, fmt='rss', seed=0):
+    """合成フィードをファイルに書き出し、file:// の URL を返す"""
+    path = Path(path)
+    path.write_text(FEED_FORMATS[fmt](count, seed), encoding='utf-8')
+    return path.resolve().as_uri()
+
+@contextmanager
+def serve_feeds(feeds, latency=0.0):
+    """{パス: フィード本文} をローカルの HTTP サーバーから配信し、ベース URL を返す
+
+    latency を指定すると応答ごとに待ち時間を入れる（取得の遅延の代わり）。
+    """
+    bodies = {path: body.encode('utf-8') for path, body in feeds.items()}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = bodies.get(self.path)
+            if body is None:
+                self.send_error(404)
+                return
+            if latency:
+                time.sleep(latency)
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/xml')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
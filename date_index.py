@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+公開日による項目の索引
+
+項目を一度だけ公開日でソートしておき、任意の期間に含まれる項目を
+bisect で取り出す。期間ごとに全件を走査しないので、複数の期間（複数週・月単位など）の
+レポートを同じ取得・分類結果から作るときに使う。
+"""
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+
+def _published_date(item):
+    published = item.published
+    return published.date() if isinstance(published, datetime) else published
+
+class DateIndex:
+    """公開日でソートした項目の索引
+
+    key は項目から公開日（date）を返す関数。既定では item.published を使う（datetime なら日付にする）。
+    """
+
+    def __init__(self, items, key=_published_date):
+        # (公開日, 元の位置) でソートし、期間内の項目を元の順序で返せるようにする
+        order = sorted(range(len(items)), key=lambda i: key(items[i]))
+        self._items = items
+        self._dates = [key(items[i]) for i in order]
+        self._positions = order
+
+    def __len__(self):
+        return len(self._items)
+
+    def bounds(self):
+        """最も古い公開日と最も新しい公開日（空なら (None, None)）"""
+        if not self._dates:
+            return None, None
+        return self._dates[0], self._dates[-1]
+
+    def count(self, start_date, end_date):
+        """期間（両端を含む）内の項目数"""
+        return max(0, bisect_right(self._dates, end_date) - bisect_left(self._dates, start_date))
+
+    def between(self, start_date, end_date):
+        """期間（両端を含む）内の項目を、索引に渡したときの順序で返す"""
+        lo = bisect_left(self._dates, start_date)
+        hi = bisect_right(self._dates, end_date)
+        return [self._items[i] for i in sorted(self._positions[lo:hi])]
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+フィード間で重複する記事の検出
+
+同じ発表が複数のブログフィードに載ったり、What's New のリンクに付くトラッキング用の
+パラメータが途中で変わってアーカイブに2件残ったりするため、
+正規化したリンク（トラッキング用パラメータ・フラグメント・末尾のスラッシュを除く）と
+タイトルの指紋（NFKC 正規化・小文字化・記号の除去）のどちらかが一致すれば同じ記事とみなす。
+"""
+import re
+import unicodedata
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# 除去するクエリパラメータ（小文字で比較する）
+TRACKING_PARAMS = frozenset(['trk', 'trkcampaign', 'fbclid', 'gclid', 'mc_cid', 'mc_eid'])
+TRACKING_PREFIXES = ('utm_', 'sc_')
+
+# 短いタイトル（"Weekly Roundup" など）は別の記事と一致しやすいので指紋を作らない
+MIN_FINGERPRINT_CHARS = 12
+
+_WORD_REGEX = re.compile(r'\w+')
+
+def _is_tracking_param(name):
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+def normalize_link(url):
+    """比較用にリンクを正規化する（表示には元のリンクを使う）"""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    if scheme == 'http':
+        scheme = 'https'
+    query = sorted((name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+                   if not _is_tracking_param(name))
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((scheme, parts.netloc.lower(), path, urlencode(query), ''))
+
+def title_fingerprint(title):
+    """タイトルの指紋（短すぎる場合は None）"""
+    fingerprint = ' '.join(_WORD_REGEX.findall(unicodedata.normalize('NFKC', title).casefold()))
+    if len(fingerprint) < MIN_FINGERPRINT_CHARS:
+        return None
+    return fingerprint
+
+def _link_and_title(item):
+    return item.link, item.title
+
+def _keys(link, title, match_titles):
+    keys = [('link', normalize_link(link))]
+    fingerprint = title_fingerprint(title) if match_titles else None
+    if fingerprint is not None:
+        keys.append(('title', fingerprint))
+    return keys
+
+class DuplicateIndex:
+    """記事を1件ずつ加えながら、それまでの記事と重複するかを調べる
+
+    add() が True を返す記事は、同じ順に group_duplicates に渡したときの各グループの代表と一致する。
+    """
+
+    def __init__(self, match_titles=True):
+        self.match_titles = match_titles
+        self.seen = set()
+
+    def add(self, link, title):
+        """記事を加え、それまでに加えたどの記事とも重複しなければ True を返す"""
+        keys = _keys(link, title, self.match_titles)
+        new = not any(key in self.seen for key in keys)
+        self.seen.update(keys)
+        return new
+
+def group_duplicates(items, key=_link_and_title, match_titles=True):
+    """同じ記事ごとにまとめて、最初に現れた順に [代表, 重複, ...] のリストで返す
+
+    key は項目から (リンク, タイトル) を返す関数（既定は .link と .title）。
+    match_titles=False ではリンクだけで判定する（同じタイトルで別の発表が出るフィード向け）。
+    """
+    groups = []
+    index = {}
+    for item in items:
+        keys = _keys(*key(item), match_titles)
+        group = next((index[k] for k in keys if k in index), None)
+        if group is None:
+            group = []
+            groups.append(group)
+        group.append(item)
+        for k in keys:
+            index.setdefault(k, group)
+    return groups
+
+def dedupe(items, key=_link_and_title, match_titles=True):
+    """重複を除き、それぞれ最初に現れた項目だけを元の順序で返す"""
+    return [group[0] for group in group_duplicates(items, key, match_titles)]
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+What's New エントリのローカルアーカイブ
+
+RSS フィードには直近のエントリしか含まれないため、取得したエントリを毎回
+SQLite に upsert して蓄積する。レポート対象の期間は公開日インデックスを使った
+範囲クエリで取り出すので、フィードの範囲外になった過去の期間も生成できる。
+"""
+import os
+import sqlite3
+import time
+from collections import namedtuple
+from datetime import datetime
+
+DEFAULT_ARCHIVE_PATH = os.environ.get(
+    'AWS_UPDATES_ARCHIVE_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'archive', 'whatsnew.sqlite3')
+)
+
+# フィードから取り出したエントリ（published は UTC の naive datetime）
+FeedEntry = namedtuple('FeedEntry', ['link', 'title', 'summary', 'published'])
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    link TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    published TEXT NOT NULL,
+    published_date TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_published_date ON entries (published_date);
+"""
+
+def extract_entry(entry):
+    """feedparser のエントリから FeedEntry を作る（公開日やリンクがなければ None）"""
+    published_parsed = entry.get('published_parsed')
+    link = entry.get('link')
+    if not published_parsed or not link:
+        return None
+    return FeedEntry(
+        link=link,
+        title=entry.get('title', ''),
+        summary=entry.get('summary', ''),
+        published=datetime(*published_parsed[:6]),
+    )
+
+class EntryArchive:
+    """What's New エントリを蓄積する SQLite アーカイブ"""
+
+    def __init__(self, path=DEFAULT_ARCHIVE_PATH):
+        self.path = path
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.executescript(_SCHEMA)
+
+    def upsert(self, entries):
+        """エントリを追加・更新し、新規に追加された件数を返す"""
+        before = self.count()
+        now = time.time()
+        self._conn.executemany(
+            'INSERT INTO entries (link, title, summary, published, published_date, first_seen, last_seen) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?) '
+            'ON CONFLICT(link) DO UPDATE SET title = excluded.title, summary = excluded.summary, '
+            'published = excluded.published, published_date = excluded.published_date, '
+            'last_seen = excluded.last_seen',
+            [
+                (e.link, e.title, e.summary, e.published.isoformat(sep=' '),
+                 e.published.date().isoformat(), now, now)
+                for e in entries
+            ],
+        )
+        self._conn.commit()
+        return self.count() - before
+
+    def query_range(self, start_date, end_date):
+        """公開日が期間内のエントリを新しい順に返す（同時刻はフィードの登録順）"""
+        rows = self._conn.execute(
+            'SELECT link, title, summary, published FROM entries '
+            'WHERE published_date BETWEEN ? AND ? ORDER BY published DESC, rowid',
+            (start_date.isoformat(), end_date.isoformat()),
+        )
+        return [
+            FeedEntry(link, title, summary, datetime.fromisoformat(published))
+            for link, title, summary, published in rows
+        ]
+
+    def count(self):
+        return self._conn.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+
+    def close(self):
+        self._conn.close()
+
+def open_entry_archive(path=None):
+    """既定の場所にあるアーカイブを開く（AWS_UPDATES_ARCHIVE=0 で無効化）"""
+    if os.environ.get('AWS_UPDATES_ARCHIVE', '1') == '0':
+        return None
+    try:
+        return EntryArchive(path or DEFAULT_ARCHIVE_PATH)
+    except sqlite3.Error as e:
+        print(f"エントリアーカイブを開けませんでした: {e}")
+        return None
+
+def extract_entries(feed_entries):
+    """feedparser のエントリ一覧から FeedEntry のリストを作る（日付やリンクのないものは除く）"""
+    return [e for e in map(extract_entry, feed_entries) if e is not None]
+
+def select_range(entries, start_date, end_date, archive=None):
+    """FeedEntry のうち期間内のものを返す（アーカイブがあれば蓄積してから範囲クエリで取り出す）"""
+    if archive is None:
+        return [e for e in entries if start_date <= e.published.date() <= end_date]
+    added = archive.upsert(entries)
+    print(f"アーカイブ: {added} 件を追加 (合計 {archive.count()} 件)")
+    return archive.query_range(start_date, end_date)
+
+def entries_in_range(feed_entries, start_date, end_date, archive=None):
+    """期間内のエントリを返す（アーカイブがあれば蓄積してから範囲クエリで取り出す）"""
+    return select_range(extract_entries(feed_entries), start_date, end_date, archive)
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+RSS/Atom フィードの取得
+
+feedparser に URL を直接渡すとタイムアウトを指定できないため、
+本文を urllib で取得してから feedparser でパースする。
+タイムアウトは接続・受信ごとだけでなく本文を読み終えるまでの全体にもかけ、取得したスレッドが残らないようにする。
+取得した本文は ETag / Last-Modified と一緒にディスクへ保存し、
+次回は条件付きリクエストを送って 304 ならキャッシュを使う。
+起動を速くするため、urllib.request と feedparser は実際に取得・パースするときに読み込む。
+パースはプロセスプールでも行え、その場合はプロセス間で小さなレコード（FeedEntry）だけを受け渡す。
+"""
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+from translation_cache import DEFAULT_CACHE_DIR
+
+# フィード1件あたりのタイムアウト（秒）と同時取得数
+FEED_TIMEOUT = float(os.environ.get('AWS_UPDATES_FEED_TIMEOUT', '20'))
+FEED_CONCURRENCY = int(os.environ.get('AWS_UPDATES_FEED_CONCURRENCY', '8'))
+
+USER_AGENT = 'aws-updates-summary (+https://github.com/98lerr/aws-updates)'
+
+# 本文を読み込む単位（バイト）
+READ_CHUNK = 64 * 1024
+
+# フィードのパースに使うプロセス数の既定値（0 でプロセスを使わず取得したスレッドでパースする。
+# フィードが1本だけのときは既定では使わない）
+DEFAULT_PARSE_WORKERS = min(4, os.cpu_count() or 1)
+
+# 1 でキャッシュ済みのフィードだけを使うオフラインモード
+OFFLINE = os.environ.get('AWS_UPDATES_OFFLINE', '0') == '1'
+
+class FeedCache:
+    """フィード本文と ETag / Last-Modified を URL ごとにディスクへ保存する"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.downloads = 0
+        self.not_modified = 0
+        self.offline_hits = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _paths(self, url):
+        name = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.directory, name)
+        return base + '.xml', base + '.json'
+
+    def load(self, url):
+        """保存済みの本文とメタデータを返す（なければ (None, {})）"""
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(body_path, 'rb') as f:
+                body = f.read()
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None, {}
+        return body, meta
+
+    def save(self, url, body, etag=None, last_modified=None):
+        """本文とメタデータを保存する（途中で落ちても壊れないよう置き換えで書く）"""
+        body_path, meta_path = self._paths(url)
+        meta = {'url': url, 'etag': etag, 'last_modified': last_modified}
+        for path, data in ((body_path, body), (meta_path, json.dumps(meta).encode('utf-8'))):
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+    def count(self, attr):
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + 1)
+
+    def report_metrics(self, metrics):
+        """取得状況を計測結果に加える"""
+        metrics.count('feed_cache_downloads', self.downloads)
+        metrics.count('feed_cache_not_modified', self.not_modified)
+        metrics.count('feed_cache_offline_hits', self.offline_hits)
+
+    def summary(self):
+        """取得状況の要約文字列"""
+        return (f"フィードキャッシュ: ダウンロード {self.downloads} 件 / "
+                f"未更新(304) {self.not_modified} 件 / オフライン {self.offline_hits} 件")
+
+def open_feed_cache(cache_dir=None):
+    """既定の場所にあるフィードキャッシュを開く（AWS_UPDATES_FEED_CACHE=0 で無効化）"""
+    if os.environ.get('AWS_UPDATES_FEED_CACHE', '1') == '0':
+        return None
+    return FeedCache(os.path.join(cache_dir or DEFAULT_CACHE_DIR, 'feeds'))
+
+def _read_body(response, deadline):
+    # read() は指定したバイト数がそろうまで受信を繰り返すので、少しずつ届き続けると終わらない。
+    # read1() で届いた分ずつ読み、期限を過ぎたら打ち切る
+    chunks = []
+    while True:
+        chunk = response.read1(READ_CHUNK)
+        if not chunk:
+            return b''.join(chunks)
+        chunks.append(chunk)
+        if time.monotonic() > deadline:
+            raise TimeoutError("本文の受信が期限内に終わりませんでした")
+
+def download_feed(url, timeout=FEED_TIMEOUT, cache=None, offline=False):
+    """フィード本文をバイト列で取得する（キャッシュがあれば条件付きリクエストを送る）
+
+    timeout は接続・受信ごとのソケットのタイムアウトと、本文を読み終えるまでの期限の両方に使う。
+    """
+    import urllib.error
+    import urllib.request
+
+    body, meta = cache.load(url) if cache is not None else (None, {})
+    if offline:
+        if body is None:
+            raise FileNotFoundError(f"オフラインモードですがキャッシュがありません: {url}")
+        cache.count('offline_hits')
+        return body
+
+    headers = {'User-Agent': USER_AGENT}
+    if body is not None:
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+
+    request = urllib.request.Request(url, headers=headers)
+    deadline = time.monotonic() + timeout
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            new_body = _read_body(response, deadline)
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+    except urllib.error.HTTPError as e:
+        if e.code == 304 and body is not None:
+            cache.count('not_modified')
+            return body
+        raise
+
+    if cache is not None:
+        cache.count('downloads')
+        cache.save(url, new_body, etag, last_modified)
+    return new_body
+
+def fetch_feed(url, timeout=FEED_TIMEOUT, cache=None, offline=False, metrics=None):
+    """フィードを取得してパースする（metrics があれば取得とパースの時間・バイト数を記録する）"""
+    import feedparser
+
+    if metrics is None:
+        return feedparser.parse(download_feed(url, timeout, cache, offline))
+    with metrics.stage('feed_download'):
+        body = download_feed(url, timeout, cache, offline)
+    metrics.count('feeds')
+    metrics.count('feed_bytes', len(body))
+    with metrics.stage('feed_parse'):
+        return feedparser.parse(body)
+
+def _stage(metrics, name):
+    return nullcontext() if metrics is None else metrics.stage(name)
+
+def parse_entries(body, clean_summary=False):
+    """フィード本文をパースし、FeedEntry のリストを返す
+
+    プロセスプールで実行するので、引数と戻り値は pickle できるものだけにする。
+    clean_summary=True では概要の HTML もここでテキストにする。
+    """
+    import feedparser
+    from entry_archive import extract_entries
+
+    entries = extract_entries(feedparser.parse(body).entries)
+    if clean_summary:
+        from html_text import strip_html
+
+        entries = [entry._replace(summary=strip_html(entry.summary)) for entry in entries]
+    return entries
+
+def fetch_feed_entries(url, timeout=FEED_TIMEOUT, cache=None, offline=False, metrics=None, pool=None,
+                       clean_summary=False):
+    """フィードを取得して FeedEntry のリストを返す
+
+    pool（ProcessPoolExecutor）を渡すとパースと抽出を別プロセスで行い、呼び出し元のスレッドは
+    結果を待つだけになる（GIL を手放すので、イベントループ上の翻訳などが止まらない）。
+    """
+    with _stage(metrics, 'feed_download'):
+        body = download_feed(url, timeout, cache, offline)
+    if metrics is not None:
+        metrics.count('feeds')
+        metrics.count('feed_bytes', len(body))
+    with _stage(metrics, 'feed_parse'):
+        if pool is not None:
+            from concurrent.futures.process import BrokenProcessPool
+
+            try:
+                return pool.submit(parse_entries, body, clean_summary).result()
+            except BrokenProcessPool as e:
+                print(f"パース用のプロセスが使えないため、スレッドでパースします: {e}")
+        return parse_entries(body, clean_summary)
+
+def _parse_pool_context():
+    # 取得スレッドやイベントループが動いている中でプロセスを fork すると、ほかのスレッドが持っていたロックを
+    # 子プロセスが引き継いで止まることがあるため、fork を使わない起動方法を明示する
+    import multiprocessing
+
+    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return multiprocessing.get_context(method)
+
+@contextmanager
+def open_parse_pool(workers=None, feeds=None):
+    """フィードのパースに使うプロセスプールを開く（使わない場合は None）
+
+    workers を省略すると AWS_UPDATES_PARSE_WORKERS を使う。未設定なら CPU 数（最大 4、feeds 本まで）だが、
+    パースするフィードが1本だけ（feeds=1）のときはプロセスの起動の方が高くつくので使わない。
+    0 の場合やプロセスを作れない環境では None を返し、取得したスレッドでパースする。
+    """
+    if workers is None:
+        default = DEFAULT_PARSE_WORKERS if feeds is None else min(DEFAULT_PARSE_WORKERS, feeds)
+        if feeds == 1:
+            default = 0
+        workers = int(os.environ.get('AWS_UPDATES_PARSE_WORKERS', str(default)))
+    if workers <= 0:
+        yield None
+        return
+    from concurrent.futures import ProcessPoolExecutor
+
+    try:
+        pool = ProcessPoolExecutor(workers, mp_context=_parse_pool_context())
+    except (OSError, NotImplementedError, ValueError) as e:
+        print(f"パース用のプロセスプールを作成できませんでした: {e}")
+        yield None
+        return
+    try:
+        yield pool
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+async def gather_feeds_async(func, args_list, timeout=FEED_TIMEOUT, concurrency=FEED_CONCURRENCY,
+                             on_result=None):
+    """ブロッキングな取得関数をスレッドで並列実行する
+
+    args_list の各要素を引数に func を呼び出し、(結果, 例外) のリストを入力順で返す。
+    1件が遅い・失敗しても他のフィードの取得は止めない。
+    スレッドは外から止められないため、取得の打ち切りは download_feed 自身のタイムアウトで行い、
+    ここでの待ち時間の上限（timeout の2倍）はそれでも終わらない場合の備えとする。
+    on_result を指定すると、取得できたフィードごとに完了した順で on_result(位置, 結果) を呼び出す
+    （すべての取得を待たずに後続の処理を始められる）。
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def _run(index, args):
+        async with semaphore:
+            try:
+                result = await asyncio.wait_for(asyncio.to_thread(func, *args), timeout * 2)
+            except asyncio.TimeoutError:
+                return None, TimeoutError(f"{timeout * 2:g} 秒以内に取得できませんでした")
+            except Exception as e:
+                return None, e
+        if on_result is not None:
+            on_result(index, result)
+        return result, None
+
+    return await asyncio.gather(*(_run(index, args) for index, args in enumerate(args_list)))
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+HTML の概要からプレーンテキストを取り出す
+
+コメントと script / style の中身を除き、ブロック要素のタグは空白に、それ以外のタグは空文字に置き換えてから、
+実体参照を戻して空白をまとめる。タグの置換はコンパイル済みの正規表現で行い、Python のループを回さない。
+属性値の中の > や、タグになっていない < （"a < b" や "x<y" など）はそのまま扱える。
+閉じる > のない < はタグとみなさず、テキストとして残す。タグの照合は次の < で打ち切るので、
+閉じていない < がいくつあっても処理時間は入力の長さに比例する。
+limit を指定すると先頭から必要な分だけを変換し、捨てる部分は処理しない。
+"""
+import html
+import re
+
+# 属性から閉じる > まで（引用符の中の > を許す）。次の < までに閉じる > がなければマッチしない。
+# 引用符で始まる部分とそれ以外を交互に並べ、マッチしないときも後戻りが増えないようにしている
+_ATTRS = r'''[^<>"']*(?:(?:"[^<"]*"|'[^<']*')[^<>"']*)*>'''
+
+# 中身ごと除く要素（コメントのほかに、テキストとして表示しないもの）
+HIDDEN_TAGS = ('script', 'style', 'template')
+_HIDDEN_OPENERS = ('<!--',) + tuple('<' + tag for tag in HIDDEN_TAGS)
+_HIDDEN_OPEN_REGEX = re.compile(r'<!--|<(' + '|'.join(HIDDEN_TAGS) + r')(?=[\s/>])', re.I)
+_HIDDEN_CLOSE_REGEX = {tag: re.compile(r'</' + tag + r'\s*>', re.I) for tag in HIDDEN_TAGS}
+
+# 前後の文とつながらないよう空白に置き換えるタグ
+BLOCK_TAGS = (
+    'address', 'article', 'aside', 'blockquote', 'br', 'dd', 'div', 'dl', 'dt', 'figcaption',
+    'figure', 'footer', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hr', 'li', 'ol', 'p',
+    'pre', 'section', 'table', 'td', 'th', 'tr', 'ul',
+)
+
+def _names_regex(names):
+    """タグ名を先頭の文字ごとにまとめた正規表現にする（re.I は遅いので小文字と大文字を並べる）"""
+    groups = {}
+    for name in sorted(names) + sorted(name.upper() for name in names):
+        groups.setdefault(name[0], []).append(name[1:])
+    return '|'.join(first + '(?:' + '|'.join(sorted(rests, key=len, reverse=True)) + ')'
+                    for first, rests in groups.items())
+
+# 大文字と小文字が混ざったタグ名（<Br> など）は次の _TAG_REGEX で空文字に置き換わる
+_BLOCK_REGEX = re.compile(r'</?(?:' + _names_regex(BLOCK_TAGS) + r')(?=[\s/>])' + _ATTRS)
+
+# 残りのタグと宣言（<!DOCTYPE> や <?xml?> など）
+_TAG_REGEX = re.compile(r'<(?:/?[A-Za-z]' + _ATTRS + r'|[!?][^<>]*>)')
+
+# まとめる必要のある空白（ASCII 以外の空白文字は isascii() で別に調べる）
+_SPACES = ('  ', '\n', '\t', '\r', '\f', '\v')
+
+# limit を指定したときに最初に変換する長さ（limit の倍数）と、
+# 途中で切った実体参照（&amp; の途中など）の影響を受けうる末尾の文字数
+_WINDOW_FACTOR = 4
+_TAIL_MARGIN = 40
+
+def _drop_hidden(html_text):
+    """コメントと script などを中身ごと除く
+
+    (除いたテキスト, 閉じていない最初の開始タグの位置（なければ -1）) を返す。閉じていないものはそのまま残す。
+    閉じタグが見つからなかった種類は以降探さないので、開始タグがいくつあっても全体を一度しか読まない。
+    """
+    lowered = html_text.lower()
+    if not any(opener in lowered for opener in _HIDDEN_OPENERS):
+        return html_text, -1
+    parts = []
+    pos = 0
+    unclosed = {}
+    match = _HIDDEN_OPEN_REGEX.search(html_text)
+    while match:
+        tag = (match.group(1) or '').lower()
+        end = -1
+        if tag not in unclosed:
+            if tag:
+                close = _HIDDEN_CLOSE_REGEX[tag].search(html_text, match.end())
+                end = close.end() if close else -1
+            else:
+                end = html_text.find('-->', match.end())
+                end = end + 3 if end >= 0 else -1
+        if end < 0:
+            unclosed.setdefault(tag, match.start())
+            match = _HIDDEN_OPEN_REGEX.search(html_text, match.end())
+            continue
+        parts.append(html_text[pos:match.start()])
+        pos = end
+        match = _HIDDEN_OPEN_REGEX.search(html_text, pos)
+    parts.append(html_text[pos:])
+    return ''.join(parts), min(unclosed.values(), default=-1)
+
+def _convert(html_text):
+    """テキストにして (テキスト, 閉じていないコメントや script の最初の位置) を返す"""
+    unclosed = -1
+    if '<' in html_text:
+        html_text, unclosed = _drop_hidden(html_text)
+        html_text = _BLOCK_REGEX.sub(' ', html_text)
+        html_text = _TAG_REGEX.sub('', html_text)
+    if '&' in html_text:
+        html_text = html.unescape(html_text)
+    if not html_text.isascii() or any(space in html_text for space in _SPACES):
+        return ' '.join(html_text.split()), unclosed
+    # ASCII だけで連続する空白や改行がなければ、前後を除くだけで済む
+    return html_text.strip(), unclosed
+
+def _window_end(html_text, window):
+    """先頭 window 文字で切るとタグの途中になるなら、そのタグの手前の位置を返す"""
+    start = html_text.rfind('<', 0, window)
+    if start >= 0 and html_text.find('>', start, window) < 0:
+        return start
+    return window
+
+def strip_html(html_text, limit=None):
+    """HTML からタグを除き、実体参照を戻して空白をまとめたテキストを返す
+
+    limit を指定すると最大 limit + 1 文字までしか返さず、先頭から必要な分だけを変換する。
+    trim_summary(strip_html(text, limit), limit) は limit なしの場合と同じ結果になる。
+    """
+    if limit is None:
+        return _convert(html_text)[0]
+    window = max(256, limit * _WINDOW_FACTOR)
+    while window < len(html_text):
+        text, unclosed = _convert(html_text[:_window_end(html_text, window)])
+        if unclosed >= 0:
+            # 窓の外で閉じているかもしれないので、閉じていないコメントや script の手前までにする
+            text = _convert(html_text[:unclosed])[0]
+        # 途中で切ると末尾の数文字だけが変わりうるので、余裕をもって limit を超えていれば十分
+        if len(text) > limit + _TAIL_MARGIN:
+            return text[:limit + 1]
+        window *= _WINDOW_FACTOR
+    return _convert(html_text)[0][:limit + 1]
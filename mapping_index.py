@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+サービスマッピングのコンパイル済みインデックス
+
+service_mappings.json から作ったマッチャー用の正規表現と、カテゴリ・サービス概要の表を
+marshal 形式でキャッシュファイルに保存し、次回以降は JSON のパースとトライ木の構築を省く。
+JSON の更新日時かサイズが変わっていたら内容のハッシュを比べ、変わっていれば作り直す。
+"""
+import hashlib
+import json
+import marshal
+import os
+
+from service_matcher import ServiceMatcher, build_service_pattern
+from translation_cache import DEFAULT_CACHE_DIR
+
+# キャッシュファイルの形式が変わったら上げる
+INDEX_VERSION = 1
+
+DEFAULT_INDEX_PATH = os.environ.get(
+    'AWS_UPDATES_MAPPING_INDEX', os.path.join(DEFAULT_CACHE_DIR, 'service_mappings.index')
+)
+
+class MappingIndex:
+    """コンパイル済みのサービスマッピング（マッチャー + カテゴリ・概要の表）"""
+
+    def __init__(self, category_mappings, service_descriptions, pattern=None, from_cache=False):
+        self.category_mappings = category_mappings
+        self.service_descriptions = service_descriptions
+        self.matcher = ServiceMatcher(category_mappings, pattern=pattern)
+        # キャッシュファイルから読み込んだかどうか（ログ・テスト用）
+        self.from_cache = from_cache
+
+    def category(self, title):
+        """(カテゴリ, サービス名) を返す"""
+        return self.matcher.match(title)
+
+    def description(self, svc):
+        """サービス概要を返す（なければ空文字列）"""
+        return self.service_descriptions.get(svc, '')
+
+def _file_state(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+def _read_cache(index_path, mapping_file):
+    """キャッシュファイルを読む（形式が違う・壊れている場合は None）"""
+    try:
+        with open(index_path, 'rb') as f:
+            cached = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if not isinstance(cached, dict) or cached.get('version') != INDEX_VERSION:
+        return None
+    if cached.get('source') != os.path.abspath(mapping_file):
+        return None
+    return cached
+
+def _write_cache(index_path, record):
+    """キャッシュファイルを置き換えで書く（書けなくても処理は続ける）"""
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(index_path)), exist_ok=True)
+        tmp_path = f"{index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            marshal.dump(record, f)
+        os.replace(tmp_path, index_path)
+    except OSError:
+        pass
+
+def _from_record(record, from_cache):
+    return MappingIndex(record['category_mappings'], record['service_descriptions'],
+                        pattern=record['pattern'], from_cache=from_cache)
+
+def build_index(mapping_file, index_path=None):
+    """JSON からインデックスを作り、index_path があればキャッシュに保存する"""
+    try:
+        with open(mapping_file, 'rb') as f:
+            raw = f.read()
+        state = _file_state(mapping_file)
+        data = json.loads(raw)
+    except (OSError, ValueError):
+        # マッピングを読めない場合は空のインデックスにする（キャッシュは作らない）
+        return MappingIndex({}, {})
+    category_mappings = data.get('category_mappings', {})
+    record = {
+        'version': INDEX_VERSION,
+        'source': os.path.abspath(mapping_file),
+        'mtime_ns': state[0],
+        'size': state[1],
+        'sha256': hashlib.sha256(raw).hexdigest(),
+        'category_mappings': category_mappings,
+        'service_descriptions': data.get('service_descriptions', {}),
+        'pattern': build_service_pattern(category_mappings),
+    }
+    if index_path is not None:
+        _write_cache(index_path, record)
+    return _from_record(record, from_cache=False)
+
+def load_index(mapping_file, index_path=DEFAULT_INDEX_PATH):
+    """キャッシュが最新ならそこから、そうでなければ JSON からインデックスを作る
+
+    index_path が None、または AWS_UPDATES_MAPPING_CACHE=0 のときはキャッシュを使わない。
+    """
+    if index_path is None or os.environ.get('AWS_UPDATES_MAPPING_CACHE', '1') == '0':
+        return build_index(mapping_file)
+    cached = _read_cache(index_path, mapping_file)
+    if cached is None:
+        return build_index(mapping_file, index_path)
+    try:
+        state = _file_state(mapping_file)
+    except OSError:
+        return build_index(mapping_file)
+    if state == (cached['mtime_ns'], cached['size']):
+        return _from_record(cached, from_cache=True)
+
+    # 更新日時だけが変わった場合（チェックアウトし直した等）は内容のハッシュで判定する
+    try:
+        with open(mapping_file, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return build_index(mapping_file)
+    if digest != cached['sha256']:
+        return build_index(mapping_file, index_path)
+    cached['mtime_ns'], cached['size'] = state
+    _write_cache(index_path, cached)
+    return _from_record(cached, from_cache=True)
+
+def rebuild_index(mapping_file, index_path=DEFAULT_INDEX_PATH):
+    """キャッシュの状態に関係なくインデックスを作り直して保存する"""
+    return build_index(mapping_file, index_path)
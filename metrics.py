@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+レポート生成の計測
+
+ステージごとの所要時間と呼び出し回数、取得バイト数などのカウンター、
+翻訳レイテンシの分布（p50/p95/p99）を1回の実行ごとに集め、JSON で書き出す。
+並行して動くステージ（取得と翻訳など）は、重なっていた時間もステージとして記録できる。
+フィードの取得はスレッドで並列に行うため、記録はロックで保護する。
+"""
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+def metrics_enabled():
+    """計測結果の JSON を書き出すか（AWS_UPDATES_METRICS=0 で書き出さない、呼び出し時に読む）"""
+    return os.environ.get('AWS_UPDATES_METRICS', '1') != '0'
+
+def percentile(sorted_values, q):
+    """ソート済みの値の q パーセンタイル（最近傍順位法、空なら None）"""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * q // 100))
+    return sorted_values[int(rank) - 1]
+
+def describe(values):
+    """値の件数・平均・p50/p95/p99・最大値"""
+    values = sorted(values)
+    if not values:
+        return {'count': 0}
+    return {
+        'count': len(values),
+        'mean': sum(values) / len(values),
+        'p50': percentile(values, 50),
+        'p95': percentile(values, 95),
+        'p99': percentile(values, 99),
+        'max': values[-1],
+    }
+
+def hit_rates(counters):
+    """<名前>_hits と <名前>_misses の組からヒット率を求める（どちらも 0 なら None）"""
+    rates = {}
+    for name, hits in counters.items():
+        if not name.endswith('_hits'):
+            continue
+        base = name[:-len('_hits')]
+        total = hits + counters.get(base + '_misses', 0)
+        rates[base] = hits / total if total else None
+    return rates
+
+class RunMetrics:
+    """1回の実行の計測結果"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}
+        # ステージごとの最初の開始時刻と最後の終了時刻
+        self.spans = {}
+        self.counters = defaultdict(int)
+        self.samples = defaultdict(list)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        """with ブロックの所要時間をステージ name の時間として加算する"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            ended = time.perf_counter()
+            self.add_time(name, ended - started)
+            with self._lock:
+                first, last = self.spans.get(name, (started, ended))
+                self.spans[name] = (min(first, started), max(last, ended))
+
+    async def timed(self, name, awaitable):
+        """awaitable の完了までの時間をステージ name の時間として加算し、結果を返す"""
+        with self.stage(name):
+            return await awaitable
+
+    def add_overlap(self, name, first, second):
+        """ステージ first と second が同時に動いていた時間をステージ name の時間として記録する"""
+        with self._lock:
+            spans = [self.spans.get(first), self.spans.get(second)]
+        if None in spans:
+            seconds = 0.0
+        else:
+            seconds = max(0.0, min(spans[0][1], spans[1][1]) - max(spans[0][0], spans[1][0]))
+        self.add_time(name, seconds)
+        return seconds
+
+    def add_time(self, name, seconds, calls=1):
+        with self._lock:
+            stage = self.stages.setdefault(name, {'calls': 0, 'seconds': 0.0})
+            stage['calls'] += calls
+            stage['seconds'] += seconds
+
+    def count(self, name, value=1):
+        with self._lock:
+            self.counters[name] += value
+
+    def observe(self, name, values):
+        """分布を取る値（レイテンシなど）を追加する"""
+        with self._lock:
+            self.samples[name].extend(values)
+
+    def to_dict(self):
+        """JSON に書き出す形の辞書"""
+        with self._lock:
+            counters = dict(self.counters)
+            return {
+                'wall_seconds': time.perf_counter() - self.started,
+                'stages': {name: dict(stage) for name, stage in self.stages.items()},
+                'counters': counters,
+                'hit_rates': hit_rates(counters),
+                'distributions': {name: describe(values) for name, values in self.samples.items()},
+            }
+
+    def summary(self):
+        """ステージごとの所要時間の要約文字列"""
+        data = self.to_dict()
+        stages = ' / '.join(f"{name} {stage['seconds']:.2f}s" for name, stage in data['stages'].items())
+        return f"所要時間: 合計 {data['wall_seconds']:.2f}s ({stages})"
+
+    def write(self, path, **extra):
+        """計測結果を JSON で書き出す（extra はそのまま追加する）"""
+        document = dict(extra, **self.to_dict())
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(document, f, ensure_ascii=False, indent=2, default=str)
+            f.write('\n')
+        os.replace(tmp_path, path)
+        return path
@@ -0,0 +1,952 @@
+#!/usr/bin/env python3
+"""
+AWS 更新情報レポートの共通パイプライン
+
+取得 → 絞り込み → 分類 → 翻訳 → 出力 の各ステージを関数（翻訳はクラス）として提供する。
+週次レポート・任意期間のレポート・ブログまとめの各スクリプトは、
+ここにあるステージを組み合わせて期間を指定するだけの薄いラッパーになっている。
+"""
+import argparse
+import asyncio
+import functools
+import html
+import json
+import os
+import re
+import sys
+import time
+from collections import defaultdict, namedtuple
+from datetime import datetime, date, timedelta
+
+from date_index import DateIndex
+from dedup import dedupe
+from entry_archive import open_entry_archive, select_range
+from feed_fetcher import OFFLINE, fetch_feed_entries, open_feed_cache, open_parse_pool
+from html_text import strip_html
+from mapping_index import load_index
+from metrics import RunMetrics, metrics_enabled
+from rate_limiter import AdaptiveRateLimiter
+from translation import (
+    TRANSLATE_BATCH_CHARS, TRANSLATE_CONCURRENCY, TRANSLATE_SUMMARY_CHARS, TranslationStats, safe_translate_async,
+    translate_all_async, truncate_sentences
+)
+from translation_backends import BACKENDS, create_backend
+from translation_cache import open_translation_cache
+
+WHATS_NEW_FEED_URL = 'https://aws.amazon.com/about-aws/whats-new/recent/feed/'
+OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'output')
+# レポート書き込み時のバッファサイズ（バイト）
+WRITE_BUFFER_SIZE = 64 * 1024
+# 複数の期間のレポートを同時に書き出す数
+RENDER_CONCURRENCY = int(os.environ.get('AWS_UPDATES_RENDER_CONCURRENCY', '4'))
+# 既定で出力する形式（md / json / jsonl / html のカンマ区切り）
+DEFAULT_FORMATS = [
+    fmt.strip() for fmt in os.environ.get('AWS_UPDATES_FORMATS', 'md,json').split(',') if fmt.strip()
+]
+
+# サービスアイコンマッピング（絵文字を使用）
+SERVICE_ICONS = {
+    'コンピュート系': '💻',
+    'コンテナ系': '🐳',
+    'ネットワーク系': '🌐',
+    'DBストレージ系': '💾',
+    'アプリケーション統合': '🔄',
+    '開発環境': '👨‍💻',
+    '運用管理': '🔧',
+    'セキュリティ': '🔒',
+    'データ処理・管理・分析': '📊',
+    'AI/ML': '🤖',
+    'コンタクトセンター': '📞',
+    'IoT': '📱',
+    'メディア': '🎬',
+    '請求系': '💰',
+    '移転と転送系': '🚚',
+    'その他': '📦'
+}
+
+# カテゴリの順序
+CATEGORY_ORDER = [
+    'コンピュート系', 'コンテナ系', 'ネットワーク系', 'DBストレージ系', 'アプリケーション統合',
+    '開発環境', '運用管理', 'セキュリティ', 'データ処理・管理・分析', 'AI/ML',
+    'コンタクトセンター', 'IoT', 'メディア', '請求系', '移転と転送系', 'その他'
+]
+
+# 重要キーワード（強調表示用）
+IMPORTANT_KEYWORDS = [
+    'GA', '一般提供開始', 'プレビュー', '新機能', '新リージョン', 'リリース',
+    'サポート終了', '価格改定', 'セキュリティ', '脆弱性'
+]
+
+# 特定サービス名を英語のまま維持するための例外リスト
+EXCEPTIONAL_SERVICES = ['AWS Control Tower', 'AWS Glue', 'Amazon SageMaker', 'AWS Lambda']
+
+SERVICE_MAPPINGS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'service_mappings.json')
+
+@functools.lru_cache(maxsize=None)
+def get_mapping_index():
+    """サービスマッピングのインデックス（初回の呼び出し時に、キャッシュか JSON から一度だけ作る）"""
+    return load_index(SERVICE_MAPPINGS_FILE)
+
+def load_service_mappings():
+    """(カテゴリマッピング, サービス概要) を返す。読み込めなければどちらも空になる"""
+    index = get_mapping_index()
+    return index.category_mappings, index.service_descriptions
+
+def get_service_matcher():
+    """カテゴリマッピングからコンパイルしたマッチャー"""
+    return get_mapping_index().matcher
+
+def __getattr__(name):
+    # CATEGORY_MAPPINGS / SERVICE_DESCRIPTIONS は互換のため参照されたときに読み込む
+    if name == 'CATEGORY_MAPPINGS':
+        return load_service_mappings()[0]
+    if name == 'SERVICE_DESCRIPTIONS':
+        return load_service_mappings()[1]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# サービスごとのカテゴリマッピング
+def get_category(title):
+    return get_mapping_index().category(title)
+
+# サービス概要マッピング
+def get_service_description(svc):
+    return get_mapping_index().description(svc)
+
+# ユーティリティ関数
+def get_prev_week_range(today=None):
+    if today is None:
+        today = date.today()
+    # 0=Monday, 5=Saturday, 6=Sunday in weekday()
+    # Get the week ending on the most recent Saturday
+
+    if today.weekday() == 5:
+        # Today is Saturday - get this week
+        week_end = today
+    else:
+        # Sunday-Friday - get previous Saturday
+        if today.weekday() == 6:
+            # Sunday - yesterday was Saturday
+            week_end = today - timedelta(days=1)
+        else:
+            # Monday-Friday - get last Saturday
+            days_since_saturday = today.weekday() + 2
+            week_end = today - timedelta(days=days_since_saturday)
+
+    # Get the Sunday of that week
+    week_start = week_end - timedelta(days=6)
+    return week_start, week_end
+
+def week_range(day):
+    """day を含む週（日曜日～土曜日）を返す（get_prev_week_range と同じ区切り）"""
+    week_start = day - timedelta(days=(day.weekday() + 1) % 7)
+    return week_start, week_start + timedelta(days=6)
+
+def split_weeks(start_date, end_date):
+    """期間にかかる週（日曜日～土曜日）を古い順に返す（両端の週も丸ごと含める）"""
+    weeks = []
+    week_start, week_end = week_range(start_date)
+    while week_start <= end_date:
+        weeks.append((week_start, week_end))
+        week_start += timedelta(days=7)
+        week_end += timedelta(days=7)
+    return weeks
+
+def month_range(year, month):
+    """指定した月の初日と末日を返す"""
+    next_month = date(year + month // 12, month % 12 + 1, 1)
+    return date(year, month, 1), next_month - timedelta(days=1)
+
+def is_in_prev_week(pub_date, today=None):
+    start, end = get_prev_week_range(today)
+    return start <= pub_date <= end
+
+def trim_summary(summary_text, limit=200):
+    if len(summary_text) > limit:
+        # 文の途中で切れないように調整
+        last_period = summary_text[:limit].rfind('。')
+        if last_period > limit * 0.7:  # 70%以上の位置に句点があれば、そこで切る
+            return summary_text[:last_period+1] + '...'
+        return summary_text[:limit-3] + '...'
+    return summary_text
+
+def compile_keywords(keywords):
+    """キーワードを長い順の1つの正規表現にまとめる（英数字のキーワードは単語の途中にマッチさせない）"""
+    parts = []
+    for keyword in sorted(keywords, key=len, reverse=True):
+        pattern = re.escape(keyword)
+        if re.match(r'[A-Za-z0-9]', keyword):
+            # 境界の確認をキーワードの後ろに置き、先頭文字での高速な絞り込みを効かせる
+            pattern += r'(?<![A-Za-z0-9]' + re.escape(keyword) + ')'
+        if re.search(r'[A-Za-z0-9]$', keyword):
+            pattern += r'(?![A-Za-z0-9])'
+        parts.append(pattern)
+    return re.compile('|'.join(parts))
+
+def _keywords_overlap(keywords):
+    """キーワードのどれかが他のキーワードを含む、または末尾と先頭が重なるか"""
+    for a in keywords:
+        for b in keywords:
+            if a != b and (a in b or any(a.endswith(b[:i]) for i in range(1, len(b)))):
+                return True
+    return False
+
+# 重要キーワードの検出用と、既存の太字部分を飛ばして強調するための正規表現
+_KEYWORD_REGEX = compile_keywords(IMPORTANT_KEYWORDS)
+_HIGHLIGHT_REGEX = re.compile(r'(\*\*.+?\*\*)|(' + _KEYWORD_REGEX.pattern + ')')
+
+# 英数字で始まる・終わるキーワード（GA など）は部分一致しても単語の途中かもしれないので正規表現で確かめ、
+# それ以外は部分一致（str.__contains__）だけで判定する
+_WORD_KEYWORDS = tuple(k for k in IMPORTANT_KEYWORDS if re.search(r'^[A-Za-z0-9]|[A-Za-z0-9]$', k))
+_PLAIN_KEYWORDS = tuple(k for k in IMPORTANT_KEYWORDS if k not in _WORD_KEYWORDS)
+_WORD_KEYWORD_REGEX = compile_keywords(_WORD_KEYWORDS)
+# 重なり合うキーワードがなければ、キーワードごとの str.replace でも正規表現と同じ結果になる
+_PLAIN_REPLACE_OK = not _keywords_overlap(IMPORTANT_KEYWORDS)
+
+def _bold_keyword(match):
+    if match.group(1):
+        return match.group(1)
+    return f'**{match.group(2)}**'
+
+def highlight_keywords(text):
+    """重要キーワードを強調表示する（1回の走査で置換し、** を入れ子にしない）"""
+    found = [keyword for keyword in _PLAIN_KEYWORDS if keyword in text]
+    words = [keyword for keyword in _WORD_KEYWORDS if keyword in text]
+    if words and _WORD_KEYWORD_REGEX.search(text) is None:
+        # GAME の GA のように単語の途中にしかないものは強調しない
+        words = []
+    if not found and not words:
+        return text
+    if '**' in text:
+        # 強調済みの箇所は飛ばす
+        return _HIGHLIGHT_REGEX.sub(_bold_keyword, text)
+    if words or not _PLAIN_REPLACE_OK:
+        return _KEYWORD_REGEX.sub(r'**\g<0>**', text)
+    for keyword in found:
+        text = text.replace(keyword, f'**{keyword}**')
+    return text
+
+def is_important_update(title, summary):
+    """重要な更新かどうかを判定"""
+    for keyword in _PLAIN_KEYWORDS:
+        if keyword in title or keyword in summary:
+            return True
+    for keyword in _WORD_KEYWORDS:
+        if keyword in title or keyword in summary:
+            search = _WORD_KEYWORD_REGEX.search
+            return search(title) is not None or search(summary) is not None
+    return False
+
+def generate_toc(categories):
+    """目次を生成"""
+    toc = ["## 目次\n"]
+    for i, cat in enumerate(categories):
+        if cat in SERVICE_ICONS:
+            toc.append(f"{i+1}. [{SERVICE_ICONS[cat]} {cat}](#{cat.replace(' ', '-').replace('/', '').lower()})")
+    return "\n".join(toc) + "\n\n"
+
+# ---- 取得ステージ ----
+
+def fetch_entries(feed_url=WHATS_NEW_FEED_URL, offline=OFFLINE, metrics=None, pool=None):
+    """フィードを取得し、必要な項目だけを取り出した FeedEntry のリストを返す
+
+    パース結果（FeedParserDict）はここで手放し、以降のステージには残さない。公開日やリンクのないエントリは除く。
+    pool（パース用のプロセスプール）を渡すと、パースと抽出を別プロセスで行う（渡さなければこのスレッドで行う）。
+    """
+    feed_cache = open_feed_cache()
+    entries = fetch_feed_entries(feed_url, cache=feed_cache, offline=offline, metrics=metrics, pool=pool)
+    if feed_cache is not None:
+        print(feed_cache.summary())
+        if metrics is not None:
+            feed_cache.report_metrics(metrics)
+    return entries
+
+# ---- 絞り込みステージ ----
+
+def filter_entries(entries, start_date, end_date):
+    """取得したエントリをアーカイブに蓄積し、期間内のエントリを範囲クエリで取り出す
+
+    トラッキング用パラメータだけが違うリンクは同じエントリとして1件にまとめる。
+    What's New は同じタイトルで別の発表（リージョン追加など）が出るため、タイトルでは判定しない。
+    """
+    archive = open_entry_archive()
+    try:
+        selected = select_range(entries, start_date, end_date, archive)
+    finally:
+        if archive is not None:
+            archive.close()
+    unique = dedupe(selected, match_titles=False)
+    if len(unique) < len(selected):
+        print(f"重複したエントリを {len(selected) - len(unique)} 件除外しました")
+    return unique
+
+# ---- 分類ステージ ----
+
+# 分類済みの更新項目（published は公開日の date、service は該当なしなら None）
+UpdateItem = namedtuple('UpdateItem', [
+    'title', 'link', 'summary', 'service', 'category', 'important', 'published'
+])
+
+def classify_items(entries):
+    """エントリを分類して UpdateItem のリストを入力順で返す
+
+    同じ文字列が項目の数だけ複製されないよう、カテゴリ名とサービス名は intern する。
+    """
+    items = []
+    for entry in entries:
+        title = entry.title
+        summary = strip_html(entry.summary)
+        category, svc = get_category(title)
+        category = sys.intern(category)
+        if svc:
+            svc = sys.intern(svc)
+        items.append(UpdateItem(
+            title=title,
+            link=entry.link,
+            summary=summary,
+            service=svc,
+            category=category,
+            # 重要度の判定
+            important=is_important_update(title, summary),
+            published=entry.published.date(),
+        ))
+    return items
+
+def group_items(items):
+    """UpdateItem をカテゴリごとにまとめ、(カテゴリ→UpdateItem のリスト, サービス別件数) を返す"""
+    grouped = defaultdict(list)
+    service_count = defaultdict(int)
+    for item in items:
+        if item.service:
+            service_count[item.service] += 1
+        grouped[item.category].append(item)
+    return grouped, service_count
+
+def classify_entries(entries):
+    """エントリをカテゴリごとにまとめ、(カテゴリ→UpdateItem のリスト, サービス別件数) を返す"""
+    return group_items(classify_items(entries))
+
+# ---- 翻訳ステージ ----
+
+class TranslationStage:
+    """翻訳バックエンド・キャッシュ・レート制限・統計をまとめた翻訳ステージ
+
+    translator が None の場合は翻訳せず原文をそのまま返す。
+    概要は summary_chars 文字程度に文の区切りで切り詰めてから翻訳する（0 で切り詰めない）。
+    同時実行数の上限（TRANSLATE_CONCURRENCY）は translate_all の呼び出しすべてで共有する。
+    """
+
+    def __init__(self, translator=None, cache=None, summary_chars=TRANSLATE_SUMMARY_CHARS,
+                 batch_chars=TRANSLATE_BATCH_CHARS):
+        self.translator = translator
+        self.cache = cache
+        self.limiter = AdaptiveRateLimiter(burst=TRANSLATE_CONCURRENCY)
+        self.stats = TranslationStats()
+        self.exceptions_map = {}
+        self.summary_chars = summary_chars
+        self.batch_chars = batch_chars
+        # 切り詰めで翻訳に送らずに済んだ原文の文字数（キャッシュから返した分は含めない）
+        self.saved_chars = 0
+        # Python 3.9 の asyncio.Semaphore は作成時のイベントループに結び付くので、最初の翻訳時に作る
+        self._semaphore = None
+        # queue() で受け付けたテキスト、まだ送っていないテキスト（と概要・文字数）、送信中のタスク
+        self._queued = set()
+        self._waiting = []
+        self._waiting_summaries = set()
+        self._waiting_chars = 0
+        self._tasks = []
+
+    async def check(self):
+        """テスト翻訳を行い、失敗したら翻訳なしに切り替える"""
+        if self.translator is None:
+            return
+        try:
+            test_result = await safe_translate_async(self.translator, "test",
+                                                     limiter=self.limiter, stats=self.stats)
+            print(f"翻訳テスト結果: {test_result}")
+        except Exception as e:
+            print(f"翻訳サービス初期化エラー: {e}")
+            self.translator = None
+
+    async def translate_all(self, texts, summaries=frozenset()):
+        """テキストをまとめて並列翻訳し、原文→訳文の辞書を返す
+
+        texts のうち summaries に含まれるもの（概要）は、表示する長さに足りる分だけを
+        文の区切りで切り詰めて翻訳する。辞書のキーは切り詰める前の原文のまま。
+        """
+        if self.translator is None:
+            return {text: text for text in texts}
+        sources = {}
+        saved = {}
+        for text in texts:
+            if text in summaries and text not in sources:
+                source = sources[text] = truncate_sentences(text, self.summary_chars)
+                saved[source] = saved.get(source, 0) + len(text) - len(source)
+
+        def _count_saved(pending):
+            # キャッシュから返した概要は元々翻訳しないので、実際に送ったものだけを数える
+            self.saved_chars += sum(saved.get(source, 0) for source in pending)
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(max(1, TRANSLATE_CONCURRENCY))
+        translations = await translate_all_async(self.translator, [sources.get(text, text) for text in texts],
+                                                 cache=self.cache, batch_chars=self.batch_chars,
+                                                 limiter=self.limiter, stats=self.stats,
+                                                 on_pending=_count_saved, semaphore=self._semaphore)
+        return {text: translations[sources.get(text, text)] for text in texts}
+
+    def queue(self, texts, summaries=frozenset(), metrics=None):
+        """テキストを翻訳待ちに加え、1リクエスト分（batch_chars 文字）たまるごとに翻訳を始める
+
+        少しずつ届くテキストを、届いた単位ごとではなく共通のバッチに詰めて送る。
+        一度受け付けたテキストは flush() まで受け付けない。metrics があれば翻訳の時間を記録する。
+        """
+        for text in texts:
+            if text in self._queued:
+                continue
+            self._queued.add(text)
+            source = truncate_sentences(text, self.summary_chars) if text in summaries else text
+            size = len(source) + 8  # pack_batches と同じくマーカーと改行の分を足す
+            if self._waiting and self._waiting_chars + size > self.batch_chars:
+                self._start(metrics)
+            self._waiting.append(text)
+            if text in summaries:
+                self._waiting_summaries.add(text)
+            self._waiting_chars += size
+
+    def _start(self, metrics=None):
+        translating = self.translate_all(self._waiting, self._waiting_summaries)
+        if metrics is not None:
+            translating = metrics.timed('translate', translating)
+        self._tasks.append(asyncio.create_task(translating))
+        self._waiting = []
+        self._waiting_summaries = set()
+        self._waiting_chars = 0
+
+    async def flush(self, metrics=None):
+        """翻訳待ちの残りを送り、queue() で受け付けたテキストの原文→訳文の辞書を返す"""
+        if self._waiting:
+            self._start(metrics)
+        tasks, self._tasks = self._tasks, []
+        self._queued = set()
+        translations = {}
+        for result in await asyncio.gather(*tasks):
+            translations.update(result)
+        return translations
+
+    async def prepare_exceptions(self, services=EXCEPTIONAL_SERVICES):
+        """例外サービス名の訳語を調べ、訳文中で英語表記に戻せるようにする"""
+        if self.translator is None:
+            return
+        translations = await self.translate_all(services)
+        for svc in services:
+            self.exceptions_map[translations[svc]] = svc
+
+    def restore_exceptions(self, text):
+        """翻訳後に例外サービス名を元の英語表記に戻す"""
+        for jp, orig in self.exceptions_map.items():
+            text = text.replace(jp, orig)
+        return text
+
+    def report_metrics(self, metrics):
+        """翻訳リクエスト・レイテンシ・キャッシュのヒット率を計測結果に加える"""
+        stats = self.stats
+        for name in ('requests', 'retries', 'throttles', 'errors', 'batch_fallbacks', 'fallbacks'):
+            metrics.count(f'translate_{name}', getattr(stats, name))
+        metrics.observe('translate_latency_seconds', stats.latencies)
+        metrics.count('translate_chars_saved', self.saved_chars)
+        if self.cache is not None:
+            metrics.count('translation_cache_hits', self.cache.hits)
+            metrics.count('translation_cache_misses', self.cache.misses)
+
+    def close(self):
+        """統計を表示してキャッシュを閉じる"""
+        print(self.stats.summary())
+        if self.saved_chars:
+            print(f"翻訳前の切り詰めで {self.saved_chars} 文字の翻訳を省きました。")
+        if self.stats.fallbacks:
+            print(f"⚠️ {self.stats.fallbacks} 件のテキストは翻訳できず、原文のまま出力しました。")
+        if self.cache is not None:
+            print(self.cache.summary())
+            self.cache.close()
+            self.cache = None
+
+async def open_translation_stage(translator_name=None, check=True):
+    """翻訳バックエンドとキャッシュを準備する（初期化に失敗したら翻訳なし）"""
+    print("翻訳サービスを初期化中...")
+    try:
+        translator = create_backend(translator_name)
+        print(f"翻訳バックエンド: {translator.name}")
+    except Exception as e:
+        print(f"翻訳サービス初期化エラー: {e}")
+        translator = None
+    stage = TranslationStage(translator)
+    if check:
+        await stage.check()
+    if stage.translator is not None:
+        stage.cache = open_translation_cache(stage.translator.name)
+    return stage
+
+# ---- 出力ステージ ----
+
+# レポート全体の情報（categories は出力するカテゴリ、total は出力する項目数、
+# markdown_links は Markdown のリンクを [URL](URL) の形式で出力するか）
+ReportInfo = namedtuple('ReportInfo', [
+    'start_date', 'end_date', 'intro', 'categories', 'service_count', 'total', 'markdown_links'
+], defaults=(False,))
+
+def report_path(prefix, start_date, end_date, output_dir=None, ext='.md'):
+    """出力ファイルのパスを返す（出力ディレクトリは必要なら作成する）"""
+    output_dir = output_dir or OUTPUT_DIR
+    os.makedirs(output_dir, exist_ok=True)
+    return os.path.join(output_dir, f"{prefix}_{start_date:%Y-%m-%d}_{end_date:%Y-%m-%d}{ext}")
+
+def collect_texts(grouped):
+    """翻訳対象のタイトルと概要を出力順に集める"""
+    texts = []
+    for items in grouped.values():
+        for item in items:
+            texts.append(item.title)
+            texts.append(item.summary)
+    return texts
+
+def build_report_info(start_date, end_date, grouped, service_count,
+                      intro="先週の AWS サービスアップデート情報をまとめています。", markdown_links=False):
+    """分類結果からレポート全体の情報を作る"""
+    categories = [cat for cat in CATEGORY_ORDER if cat in grouped and grouped[cat]]
+    total = sum(len(grouped[cat]) for cat in categories)
+    return ReportInfo(start_date, end_date, intro, categories, dict(service_count), total, markdown_links)
+
+def iter_report_items(grouped, translations, restore=None):
+    """出力順（カテゴリ順・カテゴリ内はサービスごと）に項目の構造化データを返す
+
+    各形式の出力はすべてこのデータから作る。訳文は例外サービス名を戻した後、
+    強調や切り詰めをする前のもの。
+    """
+    if restore is None:
+        restore = lambda text: text
+    for cat in CATEGORY_ORDER:
+        if cat not in grouped or not grouped[cat]:
+            continue
+
+        # サービスごとにグループ化
+        service_items = defaultdict(list)
+        for item in grouped[cat]:
+            service_items[item.service or '未分類'].append(item)
+
+        for items in service_items.values():
+            for item in items:
+                yield {
+                    'category': cat,
+                    'service': item.service,
+                    'title': item.title,
+                    'title_ja': restore(translations.get(item.title, item.title)),
+                    'link': item.link,
+                    'date': item.published.isoformat(),
+                    'important': item.important,
+                    'summary': item.summary,
+                    'summary_ja': restore(translations.get(item.summary, item.summary)),
+                }
+
+def write_atomic(filepath, chunks, buffer_size=WRITE_BUFFER_SIZE):
+    """文字列のチャンクをバッファ付きで一時ファイルに書き、完了したら置き換える
+
+    途中で失敗しても書きかけのファイルが filepath に残らない。
+    チャンクは順に書き出すので、全体を一度にメモリへ載せる必要はない。
+    """
+    tmp_path = f"{filepath}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8', buffering=buffer_size) as f:
+            f.writelines(chunks)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def _report_title(info):
+    return f"AWS 更新情報 ({info.start_date:%Y-%m-%d} ～ {info.end_date:%Y-%m-%d})"
+
+def _top_services(service_count, limit=10):
+    return sorted(service_count.items(), key=lambda x: x[1], reverse=True)[:limit]
+
+def render_markdown_report(filepath, info, items):
+    """レポートを Markdown のチャンクとして順に返す"""
+    # ファイルパスコメントとヘッダーを出力
+    yield f"<!-- filepath: {filepath} -->\n# {_report_title(info)}\n\n{info.intro}\n\n"
+
+    # 目次を生成
+    yield generate_toc(info.categories) + "\n"
+
+    current_cat = current_service = None
+    for item in items:
+        if item['category'] != current_cat:
+            # カテゴリ見出し（アイコン付き）
+            current_cat = item['category']
+            current_service = None
+            yield f"## {SERVICE_ICONS.get(current_cat, '')} {current_cat}\n\n"
+
+        service = item['service'] or '未分類'
+        if service != current_service:
+            # サービス名と説明を出力
+            current_service = service
+            service_desc = get_service_description(service)
+            if service_desc:
+                yield f"### {service} - {service_desc}\n\n"
+            else:
+                yield f"### {service}\n\n"
+
+        # 重要な更新には目立つマーカーを追加し、重要キーワードを強調
+        importance_marker = "🔥 " if item['important'] else ""
+        title_ja = highlight_keywords(item['title_ja'])
+        summary_ja = highlight_keywords(trim_summary(item['summary_ja']))
+        link = f"[{item['link']}]({item['link']})" if info.markdown_links else item['link']
+
+        # 項目の詳細をリストで出力し、区切り線を追加
+        yield (f"#### {importance_marker}{title_ja}\n"
+               f"- **日付**: {item['date']}\n"
+               f"- **リンク**: {link}\n"
+               f"- **概要**: {summary_ja}\n\n"
+               "---\n\n")
+
+    # 統計情報
+    yield f"## 📊 統計情報\n\n- **合計**: {info.total} 件のアップデート\n"
+
+    # サービス別の更新数
+    if info.service_count:
+        yield "- **サービス別更新数**:\n"
+        for svc, count in _top_services(info.service_count):
+            yield f"  - {svc}: {count} 件\n"
+
+    # フッター
+    yield f"\n---\n*このレポートは {datetime.now():%Y-%m-%d} に自動生成されました*\n"
+
+def render_json_document(meta, items):
+    """メタ情報と項目の配列を持つ JSON 文書をチャンクとして順に返す"""
+    head = json.dumps(meta, ensure_ascii=False)
+    yield head[:-1] + (', ' if meta else '') + '"items": ['
+    separator = '\n'
+    for item in items:
+        yield separator + json.dumps(item, ensure_ascii=False)
+        separator = ',\n'
+    yield '\n]}\n'
+
+def render_jsonl(items):
+    """項目を1行1件の JSON Lines としてチャンクごとに返す"""
+    for item in items:
+        yield json.dumps(item, ensure_ascii=False) + '\n'
+
+def _report_meta(info):
+    return {
+        'title': _report_title(info),
+        'start_date': info.start_date.isoformat(),
+        'end_date': info.end_date.isoformat(),
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'total': info.total,
+        'service_counts': dict(_top_services(info.service_count, None)),
+    }
+
+def render_json_report(filepath, info, items):
+    """レポートを JSON（メタ情報 + items 配列）のチャンクとして順に返す"""
+    return render_json_document(_report_meta(info), items)
+
+def render_jsonl_report(filepath, info, items):
+    """レポートの項目を JSON Lines のチャンクとして順に返す"""
+    return render_jsonl(items)
+
+def _html_text(text):
+    """HTML エスケープしてから重要キーワードを <strong> で強調する"""
+    return _KEYWORD_REGEX.sub(r'<strong>\g<0></strong>', html.escape(text))
+
+def _anchor(cat):
+    return cat.replace(' ', '-').replace('/', '').lower()
+
+def render_html_report(filepath, info, items):
+    """レポートを単体で表示できる HTML のチャンクとして順に返す"""
+    title = html.escape(_report_title(info))
+    yield (f'<!DOCTYPE html>\n<html lang="ja">\n<head>\n<meta charset="utf-8">\n'
+           f'<title>{title}</title>\n</head>\n<body>\n'
+           f'<h1>{title}</h1>\n<p>{html.escape(info.intro)}</p>\n')
+
+    # 目次
+    yield '<nav class="toc">\n<h2>目次</h2>\n<ol>\n'
+    for cat in info.categories:
+        yield (f'<li><a href="#{html.escape(_anchor(cat))}">'
+               f'{SERVICE_ICONS.get(cat, "")} {html.escape(cat)}</a></li>\n')
+    yield '</ol>\n</nav>\n'
+
+    current_cat = current_service = None
+    for item in items:
+        if item['category'] != current_cat:
+            if current_cat is not None:
+                yield '</section>\n'
+            current_cat = item['category']
+            current_service = None
+            yield (f'<section id="{html.escape(_anchor(current_cat))}">\n'
+                   f'<h2>{SERVICE_ICONS.get(current_cat, "")} {html.escape(current_cat)}</h2>\n')
+
+        service = item['service'] or '未分類'
+        if service != current_service:
+            current_service = service
+            service_desc = get_service_description(service)
+            heading = f"{service} - {service_desc}" if service_desc else service
+            yield f'<h3>{html.escape(heading)}</h3>\n'
+
+        css_class = ' class="important"' if item['important'] else ''
+        importance_marker = "🔥 " if item['important'] else ""
+        link = html.escape(item['link'])
+        yield (f'<article{css_class}>\n'
+               f'<h4>{importance_marker}{_html_text(item["title_ja"])}</h4>\n<ul>\n'
+               f'<li>日付: {html.escape(item["date"])}</li>\n'
+               f'<li>リンク: <a href="{link}">{link}</a></li>\n'
+               f'<li>概要: {_html_text(trim_summary(item["summary_ja"]))}</li>\n'
+               '</ul>\n</article>\n')
+    if current_cat is not None:
+        yield '</section>\n'
+
+    # 統計情報とフッター
+    yield (f'<section class="stats">\n<h2>📊 統計情報</h2>\n<ul>\n'
+           f'<li>合計: {info.total} 件のアップデート</li>\n')
+    if info.service_count:
+        yield '<li>サービス別更新数:\n<ul>\n'
+        for svc, count in _top_services(info.service_count):
+            yield f'<li>{html.escape(svc)}: {count} 件</li>\n'
+        yield '</ul>\n</li>\n'
+    yield (f'</ul>\n</section>\n<footer>このレポートは {datetime.now():%Y-%m-%d} '
+           'に自動生成されました</footer>\n</body>\n</html>\n')
+
+# 出力形式 → (拡張子, レンダラー)
+REPORT_FORMATS = {
+    'md': ('.md', render_markdown_report),
+    'json': ('.json', render_json_report),
+    'jsonl': ('.jsonl', render_jsonl_report),
+    'html': ('.html', render_html_report),
+}
+
+def write_reports(prefix, info, make_items, formats=DEFAULT_FORMATS, output_dir=None):
+    """指定した形式ごとにレポートを書き出し、出力したパスのリストを返す
+
+    make_items は項目のイテレータを返す関数で、形式ごとに呼び出す。
+    """
+    paths = []
+    for fmt in formats:
+        if fmt not in REPORT_FORMATS:
+            raise ValueError(f"未知の出力形式: {fmt} (選択肢: {', '.join(REPORT_FORMATS)})")
+        ext, render = REPORT_FORMATS[fmt]
+        filepath = report_path(prefix, info.start_date, info.end_date, output_dir, ext)
+        write_atomic(filepath, render(filepath, info, make_items()))
+        paths.append(filepath)
+    return paths
+
+# ---- パイプライン全体 ----
+
+async def run_whats_new_reports(ranges, translator_name=None, offline=OFFLINE,
+                                intro="先週の AWS サービスアップデート情報をまとめています。",
+                                formats=DEFAULT_FORMATS, feed_url=WHATS_NEW_FEED_URL, markdown_links=False):
+    """What's New フィードを一度だけ取得・分類し、期間ごとのレポートを生成する
+
+    ranges は (開始日, 終了日) のリスト。各期間の項目は公開日の索引から bisect で取り出し、
+    翻訳はすべての期間のテキストをまとめて一度に行う。出力したファイルのパスのリストを返す。
+    markdown_links=True では Markdown のリンクを [URL](URL) の形式で出力する。
+    ステージごとの計測結果は出力ディレクトリの metrics/ に JSON で書き出す。
+    フィードの取得・パースは翻訳の準備と並行して行う。
+    """
+    metrics = RunMetrics()
+    print("AWS更新情報の取得を開始します...")
+
+    async def _setup():
+        stage = await open_translation_stage(translator_name)
+        await stage.prepare_exceptions()
+        return stage
+
+    # フィードの取得・パースと、翻訳の準備（テスト翻訳・例外サービス名の翻訳）を並行して行い、
+    # 重なっていた時間を translate_overlap として記録する
+    # （フィードは1本なので、AWS_UPDATES_PARSE_WORKERS を指定したときだけプロセスプールでパースする）
+    with open_parse_pool(feeds=1) as pool:
+        feed_entries, stage = await asyncio.gather(
+            metrics.timed('fetch', asyncio.to_thread(fetch_entries, feed_url, offline, metrics, pool)),
+            metrics.timed('translator_setup', _setup()),
+        )
+    metrics.add_overlap('translate_overlap', 'fetch', 'translator_setup')
+    for start_date, end_date in ranges:
+        print(f"Week range: {start_date} to {end_date}")
+
+    # すべての期間を含む範囲を一度だけ絞り込み・分類する
+    # （取得・絞り込み後のエントリは分類が済んだら不要なので、参照を残さない）
+    span_start = min(start_date for start_date, _ in ranges)
+    span_end = max(end_date for _, end_date in ranges)
+    metrics.count('feed_entries', len(feed_entries))
+    with metrics.stage('filter'):
+        entries = filter_entries(feed_entries, span_start, span_end)
+    del feed_entries
+    with metrics.stage('classify'):
+        index = DateIndex(classify_items(entries))
+        selections = [(start_date, end_date, group_items(index.between(start_date, end_date)))
+                      for start_date, end_date in ranges]
+    metrics.count('items', len(index))
+    del entries
+
+    # 描画前にタイトルと概要をまとめて並列翻訳しておく
+    texts = [text for _, _, (grouped, _) in selections for text in collect_texts(grouped)]
+    summaries = {item.summary for _, _, (grouped, _) in selections
+                 for items in grouped.values() for item in items}
+    if stage.translator is not None:
+        print(f"{len(set(texts))} 件のテキストを翻訳中...")
+    metrics.count('translate_texts', len(set(texts)))
+    with metrics.stage('translate'):
+        translations = await stage.translate_all(texts, summaries)
+    del texts, summaries
+
+    with metrics.stage('render'):
+        paths = await render_reports_async(selections, translations, stage.restore_exceptions, intro,
+                                           formats, metrics=metrics, markdown_links=markdown_links)
+    metrics.count('reports', len(paths))
+    stage.report_metrics(metrics)
+    stage.close()
+    write_run_metrics(metrics, 'awsupdates', span_start, span_end, ranges=ranges, formats=formats)
+    return paths
+
+def write_run_metrics(metrics, prefix, start_date, end_date, output_dir=None, **extra):
+    """計測結果の要約を表示し、metrics/ に JSON で書き出す（AWS_UPDATES_METRICS=0 で書き出さない）"""
+    print(metrics.summary())
+    if not metrics_enabled():
+        return None
+    path = os.path.join(output_dir or OUTPUT_DIR, 'metrics', f"{prefix}_{start_date}_{end_date}.json")
+    metrics.write(path, start_date=start_date, end_date=end_date, **extra)
+    print(f"計測結果を {path} に出力しました。")
+    return path
+
+async def render_reports_async(selections, translations, restore, intro, formats=DEFAULT_FORMATS,
+                               concurrency=RENDER_CONCURRENCY, metrics=None, markdown_links=False):
+    """期間ごとのレポートをスレッドで並列に書き出し、出力したパスのリストを期間の順で返す
+
+    selections は (開始日, 終了日, (カテゴリ→UpdateItem のリスト, サービス別件数)) のリスト。
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    def _write(start_date, end_date, grouped, service_count):
+        started = time.perf_counter()
+        info = build_report_info(start_date, end_date, grouped, service_count, intro, markdown_links)
+        paths = write_reports('awsupdates', info,
+                              lambda: iter_report_items(grouped, translations, restore), formats)
+        if metrics is not None:
+            metrics.add_time('write_report', time.perf_counter() - started)
+        return paths
+
+    async def _run(start_date, end_date, grouped, service_count):
+        async with semaphore:
+            return await asyncio.to_thread(_write, start_date, end_date, grouped, service_count)
+
+    results = await asyncio.gather(*(
+        _run(start_date, end_date, grouped, service_count)
+        for start_date, end_date, (grouped, service_count) in selections
+    ))
+    paths = []
+    for filepaths in results:
+        for filepath in filepaths:
+            print(f"更新情報を {filepath} に出力しました。")
+            paths.append(filepath)
+    return paths
+
+async def run_whats_new_report(start_date, end_date, translator_name=None, offline=OFFLINE,
+                               intro="先週の AWS サービスアップデート情報をまとめています。",
+                               formats=DEFAULT_FORMATS, feed_url=WHATS_NEW_FEED_URL, markdown_links=False):
+    """What's New フィードから期間内のレポートを生成し、出力したファイルのパスのリストを返す"""
+    return await run_whats_new_reports([(start_date, end_date)], translator_name=translator_name,
+                                       offline=offline, intro=intro, formats=formats, feed_url=feed_url,
+                                       markdown_links=markdown_links)
+
+# ---- コマンドライン ----
+
+def parse_date(text):
+    """YYYY-MM-DD 形式の日付を解析する（argparse の type 用）"""
+    try:
+        return date.fromisoformat(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"日付は YYYY-MM-DD 形式で指定してください: {text}")
+
+def parse_range(text):
+    """START:END 形式の期間を (開始日, 終了日) に解析する（argparse の type 用）"""
+    start_text, sep, end_text = text.partition(':')
+    if not sep:
+        raise argparse.ArgumentTypeError(f"期間は YYYY-MM-DD:YYYY-MM-DD 形式で指定してください: {text}")
+    start_date, end_date = parse_date(start_text), parse_date(end_text)
+    if start_date > end_date:
+        raise argparse.ArgumentTypeError(f"開始日 {start_date} が終了日 {end_date} より後になっています")
+    return start_date, end_date
+
+def parse_month(text):
+    """YYYY-MM 形式の月を (初日, 末日) に解析する（argparse の type 用）"""
+    try:
+        year, month = (int(part) for part in text.split('-'))
+        return month_range(year, month)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"月は YYYY-MM 形式で指定してください: {text}")
+
+def parse_formats(text, choices=tuple(REPORT_FORMATS)):
+    """カンマ区切りの出力形式を解析する（重複は除き、指定順を保つ）"""
+    formats = []
+    for fmt in text.split(','):
+        fmt = fmt.strip().lower()
+        if not fmt:
+            continue
+        if fmt not in choices:
+            raise argparse.ArgumentTypeError(
+                f"未知の出力形式: {fmt} (選択肢: {', '.join(choices)})"
+            )
+        if fmt not in formats:
+            formats.append(fmt)
+    if not formats:
+        raise argparse.ArgumentTypeError("出力形式を1つ以上指定してください")
+    return formats
+
+def build_arg_parser(description, require_range=False, formats=tuple(REPORT_FORMATS),
+                     range_note='（省略時は前週の日曜日～土曜日）'):
+    """各エントリポイント共通の引数（期間・出力形式・翻訳バックエンド・オフライン）を持つパーサーを作る"""
+    parser = argparse.ArgumentParser(description=description)
+    range_help = '' if require_range else range_note
+    parser.add_argument('--start', type=parse_date, required=require_range,
+                        help=f'期間の開始日 YYYY-MM-DD{range_help}')
+    parser.add_argument('--end', type=parse_date, required=require_range,
+                        help=f'期間の終了日 YYYY-MM-DD{range_help}')
+    default_formats = [fmt for fmt in DEFAULT_FORMATS if fmt in formats] or [formats[0]]
+    parser.add_argument('--format', dest='formats', default=','.join(default_formats),
+                        type=lambda text: parse_formats(text, formats),
+                        help=f'出力形式をカンマ区切りで指定（選択肢: {", ".join(formats)}、'
+                             f'既定: 環境変数 AWS_UPDATES_FORMATS、未設定なら md,json）')
+    parser.add_argument('--translator', choices=sorted(BACKENDS),
+                        help='翻訳バックエンド（既定: 環境変数 AWS_UPDATES_TRANSLATOR、未設定なら googletrans）')
+    parser.add_argument('--offline', action='store_true', default=OFFLINE,
+                        help='ネットワークに接続せず、キャッシュ済みのフィードだけで生成する')
+    parser.add_argument('--profile', nargs='?', const=os.path.join(OUTPUT_DIR, 'profile.pstats'),
+                        metavar='PATH',
+                        help='cProfile で計測して統計を PATH に書き出す（既定: output/profile.pstats）')
+    return parser
+
+def run_async(main, profile=None):
+    """asyncio.run でコルーチンを実行する
+
+    profile にパスを渡すと実行全体を cProfile で計測し、統計をそのパスに書き出して上位を表示する。
+    """
+    if profile is None:
+        return asyncio.run(main)
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(asyncio.run, main)
+    finally:
+        os.makedirs(os.path.dirname(os.path.abspath(profile)), exist_ok=True)
+        profiler.dump_stats(profile)
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(20)
+        print(f"プロファイルを {profile} に出力しました。")
+
+def check_date_range(parser, args):
+    """--start/--end の組み合わせと前後関係を検証する（省略時は各スクリプトの既定の期間）"""
+    if (args.start is None) != (args.end is None):
+        parser.error("--start と --end は両方指定してください")
+    if args.start is not None and args.start > args.end:
+        parser.error(f"開始日 {args.start} が終了日 {args.end} より後になっています")
+    return args
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+翻訳リクエスト用のレート制限
+
+トークンバケットで送信間隔を制御し、スロットリング（429 など）やエラーが出たら
+送信レートを半減、成功が続けば少しずつ戻す（AIMD）。
+リトライ間隔はジッター付きの指数バックオフで決める。
+エラーが続いたら（サービス停止など）、成功するまで以降のリクエストを送らない。
+"""
+import asyncio
+import os
+import random
+import time
+
+# 既定の送信レート（リクエスト/秒）と上下限
+DEFAULT_RATE = float(os.environ.get('AWS_UPDATES_TRANSLATE_RATE', '5'))
+MIN_RATE = 0.2
+MAX_RATE = float(os.environ.get('AWS_UPDATES_TRANSLATE_MAX_RATE', '20'))
+# 連続でこの回数エラーになったらリクエストを送るのをやめる（0 で無効）
+MAX_FAILURES = int(os.environ.get('AWS_UPDATES_TRANSLATE_MAX_FAILURES', '20'))
+
+# スロットリングとみなすエラーメッセージの断片
+_THROTTLE_MARKERS = ('429', 'too many requests', 'throttl', 'rate exceeded', 'limitexceeded')
+
+def is_throttle_error(exc):
+    """例外がスロットリング（レート超過）によるものか判定する"""
+    text = f"{type(exc).__name__} {exc}".lower()
+    return any(marker in text for marker in _THROTTLE_MARKERS)
+
+def backoff_delay(attempt, base=1.0, cap=30.0):
+    """attempt 回目のリトライまでの待ち時間（フルジッター付き指数バックオフ）"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+class AdaptiveRateLimiter:
+    """AIMD で送信レートを調整するトークンバケット"""
+
+    def __init__(self, rate=DEFAULT_RATE, burst=None, min_rate=MIN_RATE, max_rate=MAX_RATE,
+                 increase=0.5, decrease=0.5, max_failures=MAX_FAILURES):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.min_rate = min_rate
+        self.max_rate = max(max_rate, rate)
+        self.increase = increase
+        self.decrease = decrease
+        self.max_failures = max_failures
+        # 最後に成功してから続いているエラーの回数
+        self.failures = 0
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        # Python 3.9 の asyncio.Lock は作成時にイベントループを取得するため、ループ内で最初に使うときに作る
+        self._lock = None
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        """トークンを1つ取得する（足りなければ補充されるまで待つ）"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def on_success(self):
+        """成功したら送信レートを少し上げる（加算増加）"""
+        self.rate = min(self.max_rate, self.rate + self.increase / max(self.rate, 1.0))
+        self.failures = 0
+
+    def on_error(self, throttled=False):
+        """スロットリングやエラーが出たら送信レートを下げる（乗算減少）"""
+        factor = self.decrease if throttled else (1 + self.decrease) / 2
+        self.rate = max(self.min_rate, self.rate * factor)
+        self._tokens = min(self._tokens, 0.0)
+        self.failures += 1
+
+    def stopped(self):
+        """エラーが max_failures 回続き、リクエストを送るのをやめているか"""
+        return self.max_failures > 0 and self.failures >= self.max_failures
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+タイトルからサービス名を検出するマッチャー
+
+サービス名をトライ木にまとめた正規表現を1つだけコンパイルしておき、
+タイトルを1回走査するだけで最初に現れるサービス名を見つける。
+同じ位置から始まる候補は長いもの（より具体的なサービス名）を優先し、
+英数字の途中ではマッチしない（例: "ECS" は "SPECS" にマッチしない）。
+"""
+import re
+
+# サービス名の前後に英数字が続く場合はマッチさせない（複数形の s は許可する）
+_BOUNDARY_BEFORE = r'(?<![A-Za-z0-9])'
+_BOUNDARY_AFTER = r"(?:'s|s)?(?![A-Za-z0-9])"
+
+def build_trie_pattern(words):
+    """単語リストから、長い候補を優先するトライ木形式の正規表現を作る"""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def _pattern(node):
+        terminal = '' in node
+        children = [re.escape(char) + _pattern(child)
+                    for char, child in sorted(node.items()) if char]
+        if not children:
+            return ''
+        body = children[0] if len(children) == 1 else '(?:' + '|'.join(children) + ')'
+        # 貪欲な ? により、続きがあれば長い候補を先に試す
+        if terminal:
+            return '(?:' + body + ')?'
+        return body
+
+    return _pattern(trie)
+
+def build_service_pattern(services):
+    """サービス名のリストからマッチャー用の正規表現の文字列を作る（空なら None）"""
+    services = [svc for svc in services if svc]
+    if not services:
+        return None
+    return _BOUNDARY_BEFORE + '(?P<svc>' + build_trie_pattern(services) + ')' + _BOUNDARY_AFTER
+
+class ServiceMatcher:
+    """サービス名→カテゴリのマッピングから作る、1回の走査で判定するマッチャー
+
+    pattern に build_service_pattern で作っておいた正規表現を渡すと、トライ木の構築を省く。
+    """
+
+    def __init__(self, category_mappings, default_category='その他', pattern=None):
+        self.category_mappings = dict(category_mappings)
+        self.default_category = default_category
+        if pattern is None:
+            pattern = build_service_pattern(self.category_mappings)
+        self.pattern = pattern
+        self._regex = re.compile(pattern) if pattern is not None else None
+
+    def find(self, title):
+        """タイトル中で最初に現れるサービス名を返す（なければ None）"""
+        if self._regex is None:
+            return None
+        match = self._regex.search(title)
+        return match.group('svc') if match else None
+
+    def match(self, title):
+        """(カテゴリ, サービス名) を返す（該当なしは (default_category, None)）"""
+        svc = self.find(title)
+        if svc is None:
+            return self.default_category, None
+        return self.category_mappings[svc], svc
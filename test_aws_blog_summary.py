@@ -1,12 +1,18 @@
 #!/usr/bin/env python3
 import unittest
 import json
+import os
 import asyncio
+import time
 from datetime import datetime, timedelta, date
 from pathlib import Path
 from unittest.mock import Mock, patch, MagicMock
+import feedparser
 import aws_blog_summary
+from translation_backends import LocalBackend
 
+@patch.dict(os.environ, {'AWS_UPDATES_FEED_CACHE': '0', 'AWS_UPDATES_PARSE_WORKERS': '0',
+                         'AWS_UPDATES_TRANSLATION_CACHE': '0'})
 class TestBlogSummary(unittest.TestCase):
     
     def test_load_blog_sources(self):
@@ -131,21 +137,25 @@ class TestBlogSummary(unittest.TestCase):
     def test_generate_markdown_async(self):
         """Markdown生成のテスト"""
         async def run_test():
-            mock_translator = Mock()
             mock_result = Mock()
             mock_result.text = "翻訳済み"
-            mock_translator.translate = Mock(return_value=mock_result)
+
+            async def mock_translate(*args, **kwargs):
+                return mock_result
+
+            mock_translator = Mock(spec=['translate'])
+            mock_translator.translate = mock_translate
             
             blog_data = [
                 {
                     'name': 'テストブログ',
                     'posts': [
-                        {
-                            'title': 'Test Title',
-                            'link': 'https://example.com',
-                            'date': '2025-11-20',
-                            'summary': 'Test summary'
-                        }
+                        aws_blog_summary.BlogPost(
+                            title='Test Title',
+                            link='https://example.com',
+                            published=date(2025, 11, 20),
+                            summary='Test summary'
+                        )
                     ]
                 }
             ]
@@ -161,6 +171,7 @@ class TestBlogSummary(unittest.TestCase):
             self.assertIn('テストブログ', markdown)
             self.assertIn('https://example.com', markdown)
             self.assertIn('2025-11-20', markdown)
+            self.assertIn('### 翻訳済み', markdown)
         
         asyncio.run(run_test())
     
@@ -187,11 +198,183 @@ class TestBlogSummary(unittest.TestCase):
         
         asyncio.run(run_test())
     
+    @patch('feed_fetcher.download_feed')
+    def test_fetch_blog_posts_returns_blog_posts(self, mock_download):
+        """期間内の記事が公開日の新しい順に BlogPost で返され、概要の HTML は除かれる（公開日のない記事は除く）"""
+        def item(title, day):
+            published = f'<pubDate>{day} Nov 2025 09:00:00 GMT</pubDate>' if day else ''
+            return (f'<item><title>{title}</title><link>https://example.com/{day}</link>'
+                    f'<description>&lt;p&gt;{title} &amp;amp; more&lt;/p&gt;</description>{published}</item>')
+
+        mock_download.return_value = (
+            '<?xml version="1.0"?><rss version="2.0"><channel><title>Blog</title>'
+            + item('Old', 10) + item('First', 18) + item('Undated', None) + item('Second', 20)
+            + '</channel></rss>'
+        ).encode()
+        posts = aws_blog_summary.fetch_blog_posts(
+            'https://example.com/feed/', date(2025, 11, 16), date(2025, 11, 22)
+        )
+        self.assertEqual(posts, [
+            aws_blog_summary.BlogPost('Second', 'https://example.com/20', date(2025, 11, 20), 'Second & more'),
+            aws_blog_summary.BlogPost('First', 'https://example.com/18', date(2025, 11, 18), 'First & more'),
+        ])
+
+    def test_render_blog_report_json(self):
+        """JSON 形式では記事ごとに原文と訳文が出力される"""
+        blog_data = [{'name': 'テストブログ', 'posts': [aws_blog_summary.BlogPost(
+            'Title', 'https://example.com/post', date(2025, 11, 20), 'Summary & more'
+        )]}]
+        translations = {'Title': 'タイトル', 'Summary & more': '概要'}
+        document = json.loads(''.join(aws_blog_summary.render_blog_report(
+            'json', blog_data, '2025-11-16', '2025-11-22', translations
+        )))
+        self.assertEqual(document['total'], 1)
+        self.assertEqual(document['items'], [{
+            'blog': 'テストブログ', 'sources': ['テストブログ'], 'title': 'Title', 'title_ja': 'タイトル',
+            'link': 'https://example.com/post', 'date': '2025-11-20',
+            'summary': 'Summary & more', 'summary_ja': '概要',
+        }])
+
+    def test_merge_duplicate_posts(self):
+        """複数のブログに載った同じ記事は最初のブログの1件にまとめられ、掲載元が記録される"""
+        post = aws_blog_summary.BlogPost(
+            'Introducing a new feature for Amazon EC2', 'https://aws.amazon.com/blogs/aws/new-feature/',
+            date(2025, 11, 20), 'Summary'
+        )
+        blog_data = [
+            {'name': 'AWS公式ブログ', 'posts': [post]},
+            {'name': 'コンピュート', 'posts': [
+                post._replace(link='https://aws.amazon.com/blogs/aws/new-feature?sc_channel=rss'),
+                aws_blog_summary.BlogPost('Another post about Lambda', 'https://example.com/other',
+                                          date(2025, 11, 19), 'Other'),
+            ]},
+        ]
+        merged, removed = aws_blog_summary.merge_duplicate_posts(blog_data)
+        self.assertEqual(removed, 1)
+        self.assertEqual(merged[0]['posts'], [post._replace(sources=('AWS公式ブログ', 'コンピュート'))])
+        self.assertEqual([p.title for p in merged[1]['posts']], ['Another post about Lambda'])
+        self.assertEqual(aws_blog_summary.collect_blog_texts(merged),
+                         [post.title, 'Summary', 'Another post about Lambda', 'Other'])
+
+        markdown = aws_blog_summary.render_blog_markdown(merged, '2025-11-16', '2025-11-22', {})
+        self.assertEqual(markdown.count('### Introducing a new feature for Amazon EC2'), 1)
+        self.assertIn('- **掲載ブログ**: AWS公式ブログ / コンピュート', markdown)
+        self.assertEqual(markdown.count('掲載ブログ'), 1)
+
+    @patch('aws_blog_summary.write_run_metrics')
+    @patch('aws_blog_summary.fetch_blog_posts')
+    @patch('aws_blog_summary.load_blog_sources')
+    @patch('pathlib.Path.mkdir')
+    @patch('aws_blog_summary.write_atomic')
+    def test_main_async_isolates_failed_feeds(self, mock_write, mock_mkdir, mock_load, mock_fetch,
+                                              mock_metrics):
+        """取得に失敗したフィードがあっても他のフィードは出力される"""
+        async def run_test():
+            mock_load.return_value = [
+                {'name': '壊れたブログ', 'url': 'https://example.com/broken/'},
+                {'name': 'テストブログ', 'url': 'https://example.com/feed/'},
+            ]
+
+            def fetch(url, start_date, end_date, **kwargs):
+                if 'broken' in url:
+                    raise OSError("connection refused")
+                return [aws_blog_summary.BlogPost('Post', 'https://example.com/post',
+                                                  date(2025, 11, 20), '')]
+
+            mock_fetch.side_effect = fetch
+            written = []
+            mock_write.side_effect = lambda path, chunks: written.append(''.join(chunks))
+
+            await aws_blog_summary.main_async(translator_name='local', formats=['md'])
+
+            self.assertEqual(mock_fetch.call_count, 2)
+            self.assertIn('テストブログ', written[0])
+            self.assertNotIn('壊れたブログ', written[0])
+
+        asyncio.run(run_test())
+
+    @patch('aws_blog_summary.write_run_metrics')
+    @patch('aws_blog_summary.fetch_blog_posts')
+    @patch('aws_blog_summary.load_blog_sources')
+    @patch('pathlib.Path.mkdir')
+    @patch('aws_blog_summary.write_atomic')
+    def test_translation_starts_while_feeds_are_fetched(self, mock_write, mock_mkdir, mock_load, mock_fetch,
+                                                         mock_metrics):
+        """取得できたフィードの記事は、遅いフィードの取得を待たずにバッチ1つ分ずつ翻訳が始まる"""
+        async def run_test():
+            mock_load.return_value = [
+                {'name': 'テストブログ', 'url': 'https://example.com/feed/'},
+                {'name': '遅いブログ', 'url': 'https://example.com/slow/'},
+            ]
+
+            def fetch(url, start_date, end_date, **kwargs):
+                if 'slow' in url:
+                    time.sleep(0.2)
+                    return [aws_blog_summary.BlogPost(f'Post {url}', url, date(2025, 11, 20), 'Summary')]
+                # 1リクエストの文字数予算（既定 4500 文字）を超える分の記事
+                return [aws_blog_summary.BlogPost(f'Post {i}', f'{url}{i}', date(2025, 11, 20),
+                                                  f'Summary {i}. ' + 'Sentence. ' * 30)
+                        for i in range(20)]
+
+            mock_fetch.side_effect = fetch
+            written = []
+            mock_write.side_effect = lambda path, chunks: written.append(''.join(chunks))
+
+            await aws_blog_summary.main_async(translator_name='local', formats=['md'])
+
+            metrics = mock_metrics.call_args.args[0]
+            self.assertLess(metrics.spans['translate'][0], metrics.spans['fetch'][1])
+            # 取得中に満杯になったバッチと、取得後の残り（遅いブログの記事を含む）の2回
+            self.assertEqual(metrics.stages['translate']['calls'], 2)
+            self.assertIn('translate_overlap', metrics.stages)
+            self.assertIn('Post https://example.com/slow/', written[0])
+
+        asyncio.run(run_test())
+
+    @patch('aws_blog_summary.write_run_metrics')
+    @patch('aws_blog_summary.fetch_blog_posts')
+    @patch('aws_blog_summary.load_blog_sources')
+    @patch('pathlib.Path.mkdir')
+    @patch('aws_blog_summary.write_atomic')
+    @patch('pipeline.create_backend')
+    def test_merged_duplicates_are_not_translated(self, mock_backend, mock_write, mock_mkdir, mock_load,
+                                                  mock_fetch, mock_metrics):
+        """後ろのブログにある重複記事は、先に取得できても翻訳に送らない"""
+        sent = []
+
+        class RecordingBackend(LocalBackend):
+            async def translate_batch(self, texts, dest='ja'):
+                sent.extend(texts)
+                return await super().translate_batch(texts, dest)
+
+        async def run_test():
+            mock_backend.side_effect = lambda name=None: RecordingBackend()
+            mock_load.return_value = [
+                {'name': 'AWS公式ブログ', 'url': 'https://example.com/slow/'},
+                {'name': 'コンピュート', 'url': 'https://example.com/compute/'},
+            ]
+
+            def fetch(url, start_date, end_date, **kwargs):
+                if 'slow' in url:
+                    time.sleep(0.2)
+                return [aws_blog_summary.BlogPost('Introducing a new feature for Amazon EC2',
+                                                  'https://example.com/ec2', date(2025, 11, 20),
+                                                  f'Summary from {url}.')]
+
+            mock_fetch.side_effect = fetch
+            await aws_blog_summary.main_async(translator_name='local', formats=['md'])
+
+            self.assertIn('Summary from https://example.com/slow/.', sent)
+            self.assertNotIn('Summary from https://example.com/compute/.', sent)
+
+        asyncio.run(run_test())
+
+    @patch('aws_blog_summary.write_run_metrics')
     @patch('aws_blog_summary.fetch_blog_posts')
     @patch('aws_blog_summary.load_blog_sources')
     @patch('pathlib.Path.mkdir')
-    @patch('builtins.open', create=True)
-    def test_main_async(self, mock_open, mock_mkdir, mock_load, mock_fetch):
+    @patch('aws_blog_summary.write_atomic')
+    def test_main_async(self, mock_write, mock_mkdir, mock_load, mock_fetch, mock_metrics):
         """メイン処理のテスト"""
         async def run_test():
             mock_load.return_value = [
@@ -199,15 +382,13 @@ class TestBlogSummary(unittest.TestCase):
             ]
             mock_fetch.return_value = []
             
-            mock_file = MagicMock()
-            mock_open.return_value.__enter__.return_value = mock_file
-            
-            await aws_blog_summary.main_async()
+            await aws_blog_summary.main_async(translator_name='local', formats=['md'])
             
             mock_load.assert_called_once()
             mock_fetch.assert_called_once()
             mock_mkdir.assert_called_once()
-            mock_open.assert_called_once()
+            mock_write.assert_called_once()
+            mock_metrics.assert_called_once()
         
         asyncio.run(run_test())
 
@@ -4,15 +4,17 @@ from unittest.mock import patch, MagicMock, mock_open
 from datetime import date, datetime
 import os
 import sys
+import asyncio
 
 # テスト対象のモジュールをインポート
 sys.path.insert(0, os.path.dirname(__file__))
 from aws_updates_summary_improved import (
     get_category, get_service_description, strip_html, get_prev_week_range,
     is_in_prev_week, trim_summary, highlight_keywords, is_important_update,
-    generate_toc
+    generate_toc, safe_translate_async, translate_all_async
 )
 
+@patch.dict(os.environ, {'AWS_UPDATES_MAPPING_CACHE': '0'})
 class TestAWSUpdatesSummaryImproved(unittest.TestCase):
 
     def setUp(self):
@@ -185,16 +187,14 @@ class TestAWSUpdatesSummaryImproved(unittest.TestCase):
         self.assertIn('💾 DBストレージ系', result)
         self.assertIn('🤖 AI/ML', result)
 
-    @patch('aws_updates_summary_improved.feedparser.parse')
-    @patch('aws_updates_summary_improved.open', new_callable=mock_open)
-    @patch('aws_updates_summary_improved.os.makedirs')
-    @patch('aws_updates_summary_improved.Translator')
+    @patch('pipeline.fetch_feed_entries')
+    @patch('pipeline.open', new_callable=mock_open)
+    @patch('pipeline.os.makedirs')
+    @patch('pipeline.create_backend')
     def test_main_function_structure(self, mock_translator, mock_makedirs, mock_file, mock_feedparser):
         """main関数の基本構造テスト"""
         # モックの設定
-        mock_feed = MagicMock()
-        mock_feed.entries = []
-        mock_feedparser.return_value = mock_feed
+        mock_feedparser.return_value = []
         
         mock_translator_instance = MagicMock()
         mock_translator_instance.translate.return_value.text = "翻訳されたテキスト"
@@ -244,5 +244,50 @@ class TestUtilityFunctions(unittest.TestCase):
         # 結果が制限内に収まっているか、または...で終わっているか
         self.assertTrue(len(result) <= 30 or result.endswith('...'))
 
+class TestConcurrentTranslation(unittest.TestCase):
+    """並列翻訳処理のテスト"""
+
+    class FakeTranslator:
+        def __init__(self, delay=0.01):
+            self.delay = delay
+            self.calls = []
+            self.active = 0
+            self.max_active = 0
+
+        async def translate(self, text, dest='ja'):
+            self.calls.append(text)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            try:
+                await asyncio.sleep(self.delay)
+            finally:
+                self.active -= 1
+            result = MagicMock()
+            result.text = f"訳:{text}"
+            return result
+
+    def test_translate_all_async_returns_mapping(self):
+        """原文→訳文の辞書が返り、重複テキストは1回だけ翻訳される"""
+        translator = self.FakeTranslator()
+        result = asyncio.run(translate_all_async(translator, ['a', 'b', 'a', ''], batch_chars=0))
+        self.assertEqual(result, {'a': '訳:a', 'b': '訳:b', '': ''})
+        self.assertEqual(sorted(translator.calls), ['a', 'b'])
+
+    def test_translate_all_async_respects_concurrency(self):
+        """同時実行数の上限を超えて翻訳しない"""
+        translator = self.FakeTranslator()
+        texts = [f"text {i}" for i in range(10)]
+        asyncio.run(translate_all_async(translator, texts, concurrency=3, batch_chars=0))
+        self.assertEqual(len(translator.calls), 10)
+        self.assertLessEqual(translator.max_active, 3)
+        self.assertGreater(translator.max_active, 1)
+
+    def test_safe_translate_async_timeout_falls_back_to_original(self):
+        """タイムアウトした場合は元のテキストを返す"""
+        translator = self.FakeTranslator(delay=1)
+        with patch('rate_limiter.random.uniform', return_value=0):
+            result = asyncio.run(safe_translate_async(translator, "slow", timeout=0.01))
+        self.assertEqual(result, "slow")
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -16,6 +16,7 @@ from aws_updates_summary_improved import (
     generate_toc
 )
 
+@patch.dict(os.environ, {'AWS_UPDATES_MAPPING_CACHE': '0'})
 class TestServiceCategoryMapping(unittest.TestCase):
     """サービスカテゴリマッピングの仕様"""
 
@@ -37,6 +38,7 @@ class TestServiceCategoryMapping(unittest.TestCase):
         category, service = get_category("EC2 and Lambda integration")
         self.assertIsNotNone(category)
 
+@patch.dict(os.environ, {'AWS_UPDATES_MAPPING_CACHE': '0'})
 class TestServiceDescriptionRetrieval(unittest.TestCase):
     """サービス説明取得の仕様"""
 
@@ -179,6 +181,26 @@ class TestKeywordHighlighting(unittest.TestCase):
         result = highlight_keywords(text)
         self.assertEqual(result, text)
 
+    def test_英単語の一部に含まれるキーワードは強調されない(self):
+        """GAME の中の GA のように単語の途中にあるキーワードは強調されない"""
+        self.assertEqual(highlight_keywords("GAME DAY イベント"), "GAME DAY イベント")
+
+    def test_強調済みのキーワードは二重に囲まれない(self):
+        """既に ** で囲まれた部分は入れ子にならない"""
+        result = highlight_keywords("**GA** と新機能")
+        self.assertEqual(result, "**GA** と**新機能**")
+        self.assertEqual(highlight_keywords(result), result)
+
+    def test_同じキーワードが複数回現れてもすべて強調される(self):
+        """同じキーワードの出現箇所はすべて強調される"""
+        result = highlight_keywords("リリースされたリリース")
+        self.assertEqual(result, "**リリース**された**リリース**")
+
+    def test_単語の途中のGAと他のキーワードが混在しても正しく強調される(self):
+        """GAME の GA は強調せず、同じテキスト内の他のキーワードと単独の GA は強調する"""
+        self.assertEqual(highlight_keywords("GAME の新機能"), "GAME の**新機能**")
+        self.assertEqual(highlight_keywords("GAME の新機能が GA に"), "GAME の**新機能**が **GA** に")
+
 class TestImportanceDetection(unittest.TestCase):
     """重要度判定の仕様"""
 
@@ -197,6 +219,11 @@ class TestImportanceDetection(unittest.TestCase):
         result = is_important_update("通常の更新", "通常の更新内容です")
         self.assertFalse(result)
 
+    def test_英単語の一部に含まれるキーワードでは重要と判定しない(self):
+        """GAME の中の GA のような単語の一部は重要キーワードとみなさない"""
+        self.assertFalse(is_important_update("New GAME engine support", ""))
+        self.assertTrue(is_important_update("New GAME engine support", "Now GA."))
+
 class TestTableOfContentsGeneration(unittest.TestCase):
     """目次生成の仕様"""
 
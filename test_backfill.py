@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+import unittest
+import asyncio
+import io
+import os
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from datetime import date
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(__file__))
+from backfill import backfill_async
+from pipeline import get_prev_week_range, split_weeks
+from test_pipeline import FEED_XML
+
+class TestSplitWeeks(unittest.TestCase):
+    """週への分割のテスト"""
+
+    def test_span_is_split_into_sunday_to_saturday_weeks(self):
+        """両端の週を丸ごと含む日曜日～土曜日の週に分ける"""
+        self.assertEqual(split_weeks(date(2025, 11, 12), date(2025, 11, 24)), [
+            (date(2025, 11, 9), date(2025, 11, 15)),
+            (date(2025, 11, 16), date(2025, 11, 22)),
+            (date(2025, 11, 23), date(2025, 11, 29)),
+        ])
+
+    def test_weeks_match_weekly_report(self):
+        """週の区切りは週次レポート（get_prev_week_range）と同じ"""
+        self.assertEqual(split_weeks(date(2025, 11, 29), date(2025, 11, 29)),
+                         [get_prev_week_range(date(2025, 12, 1))])
+        self.assertEqual(split_weeks(date(2025, 11, 23), date(2025, 11, 23)),
+                         [get_prev_week_range(date(2025, 11, 29))])
+
+@patch.dict(os.environ, {'AWS_UPDATES_ARCHIVE': '0', 'AWS_UPDATES_FEED_CACHE': '0',
+                         'AWS_UPDATES_MAPPING_CACHE': '0', 'AWS_UPDATES_PARSE_WORKERS': '0',
+                         'AWS_UPDATES_TRANSLATION_CACHE': '0'})
+class TestBackfill(unittest.TestCase):
+    """まとめて生成するモードのテスト"""
+
+    def test_one_report_per_week_from_a_single_fetch(self):
+        """フィードは1回だけ取得し、週ごとのレポートを古い順に出力する"""
+        with tempfile.TemporaryDirectory() as tmp, \
+                patch('pipeline.OUTPUT_DIR', tmp), \
+                patch('feed_fetcher.download_feed', return_value=FEED_XML.encode()) as fetch, \
+                redirect_stdout(io.StringIO()):
+            paths = asyncio.run(backfill_async(date(2025, 11, 10), date(2025, 11, 25),
+                                               translator_name='local', formats=['md']))
+            reports = []
+            for path in paths:
+                with open(path, encoding='utf-8') as f:
+                    reports.append((os.path.basename(path), f.read()))
+        fetch.assert_called_once()
+        self.assertEqual([name for name, _ in reports], [
+            'awsupdates_2025-11-09_2025-11-15.md',
+            'awsupdates_2025-11-16_2025-11-22.md',
+            'awsupdates_2025-11-23_2025-11-29.md',
+        ])
+        self.assertIn('https://example.com/s3', reports[0][1])
+        self.assertIn('- **合計**: 0 件のアップデート', reports[1][1])
+        self.assertIn('https://example.com/lambda', reports[2][1])
+        self.assertNotIn('https://example.com/s3', reports[2][1])
+
+if __name__ == '__main__':
+    unittest.main()
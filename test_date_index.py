@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+import unittest
+import os
+import sys
+from collections import namedtuple
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.dirname(__file__))
+from date_index import DateIndex
+
+Item = namedtuple('Item', ['name', 'published'])
+
+class TestDateIndex(unittest.TestCase):
+    """公開日の索引のテスト"""
+
+    def setUp(self):
+        # フィードと同じく新しい順に並んだ項目
+        self.items = [
+            Item('c', datetime(2025, 11, 25, 9)),
+            Item('b2', datetime(2025, 11, 24, 18)),
+            Item('b1', datetime(2025, 11, 24, 8)),
+            Item('a', datetime(2025, 11, 10, 12)),
+        ]
+        self.index = DateIndex(self.items)
+
+    def test_range_keeps_original_order(self):
+        """期間内の項目を、索引に渡したときの順序のまま返す"""
+        self.assertEqual([i.name for i in self.index.between(date(2025, 11, 23), date(2025, 11, 29))],
+                         ['c', 'b2', 'b1'])
+
+    def test_range_includes_both_ends(self):
+        """開始日・終了日ちょうどの項目も含む"""
+        self.assertEqual([i.name for i in self.index.between(date(2025, 11, 10), date(2025, 11, 24))],
+                         ['b2', 'b1', 'a'])
+        self.assertEqual(self.index.count(date(2025, 11, 24), date(2025, 11, 24)), 2)
+
+    def test_empty_ranges(self):
+        """該当なし・逆順の期間・空の索引では空になる"""
+        self.assertEqual(self.index.between(date(2025, 11, 11), date(2025, 11, 23)), [])
+        self.assertEqual(self.index.count(date(2025, 11, 29), date(2025, 11, 23)), 0)
+        self.assertEqual(DateIndex([]).between(date(2025, 1, 1), date(2025, 12, 31)), [])
+        self.assertEqual(DateIndex([]).bounds(), (None, None))
+
+    def test_bounds_and_date_values(self):
+        """bounds は最古と最新の公開日を返し、date の項目もそのまま扱える"""
+        self.assertEqual(self.index.bounds(), (date(2025, 11, 10), date(2025, 11, 25)))
+        self.assertEqual(len(self.index), 4)
+        index = DateIndex([Item('x', date(2025, 11, 24))])
+        self.assertEqual(index.count(date(2025, 11, 24), date(2025, 11, 24)), 1)
+
+if __name__ == '__main__':
+    unittest.main()
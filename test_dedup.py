@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+import unittest
+import os
+import sys
+from collections import namedtuple
+
+sys.path.insert(0, os.path.dirname(__file__))
+from dedup import DuplicateIndex, dedupe, group_duplicates, normalize_link, title_fingerprint
+
+Post = namedtuple('Post', ['link', 'title'])
+
+class TestNormalizeLink(unittest.TestCase):
+    """リンクの正規化のテスト"""
+
+    def test_tracking_params_are_removed(self):
+        """トラッキング用パラメータ・フラグメント・末尾のスラッシュは比較に使わない"""
+        self.assertEqual(
+            normalize_link('http://AWS.amazon.com/blogs/aws/post/?trk=abc&utm_source=rss&sc_channel=el#top'),
+            'https://aws.amazon.com/blogs/aws/post'
+        )
+
+    def test_other_params_are_kept_in_order(self):
+        """それ以外のパラメータは並び順をそろえて残す"""
+        self.assertEqual(normalize_link('https://example.com/p?b=2&a=1&utm_medium=x'),
+                         'https://example.com/p?a=1&b=2')
+        self.assertNotEqual(normalize_link('https://example.com/p?id=1'),
+                            normalize_link('https://example.com/p?id=2'))
+
+class TestTitleFingerprint(unittest.TestCase):
+    """タイトルの指紋のテスト"""
+
+    def test_case_width_and_punctuation_are_ignored(self):
+        """大文字小文字・全角半角・記号の違いは無視する"""
+        self.assertEqual(title_fingerprint('Amazon EC2: New Instances!'),
+                         title_fingerprint('ａｍａｚｏｎ ＥＣ２ - new instances'))
+
+    def test_short_titles_have_no_fingerprint(self):
+        """短いタイトルは指紋を作らない"""
+        self.assertIsNone(title_fingerprint('Weekly'))
+
+class TestGroupDuplicates(unittest.TestCase):
+    """重複のまとめ方のテスト"""
+
+    def test_duplicates_by_link_or_title(self):
+        """リンクかタイトルのどちらかが一致すれば同じ記事になり、最初に現れた順を保つ"""
+        posts = [
+            Post('https://example.com/a?trk=1', 'Introducing feature A'),
+            Post('https://example.com/b', 'Introducing feature B'),
+            Post('https://example.com/a/', 'A different headline'),
+            Post('https://example.com/c', 'introducing FEATURE a'),
+        ]
+        self.assertEqual(group_duplicates(posts), [[posts[0], posts[2], posts[3]], [posts[1]]])
+        self.assertEqual(dedupe(posts), [posts[0], posts[1]])
+
+    def test_titles_can_be_ignored(self):
+        """match_titles=False ではリンクだけで判定する"""
+        posts = [
+            Post('https://example.com/1', 'Amazon EC2 instances now in additional regions'),
+            Post('https://example.com/2', 'Amazon EC2 instances now in additional regions'),
+        ]
+        self.assertEqual(dedupe(posts, match_titles=False), posts)
+        self.assertEqual(dedupe(posts), posts[:1])
+
+    def test_custom_key(self):
+        """key で (リンク, タイトル) の取り出し方を指定できる"""
+        pairs = [('blog1', Post('https://example.com/a', 'Title one for test')),
+                 ('blog2', Post('https://example.com/a', 'Title one for test'))]
+        groups = group_duplicates(pairs, key=lambda pair: (pair[1].link, pair[1].title))
+        self.assertEqual(groups, [pairs])
+
+    def test_index_matches_group_leaders(self):
+        """DuplicateIndex.add は group_duplicates の各グループの代表にだけ True を返す"""
+        posts = [
+            Post('https://example.com/a?trk=1', 'Introducing feature A'),
+            Post('https://example.com/b', 'Introducing feature B'),
+            Post('https://example.com/a/', 'A different headline'),
+            Post('https://example.com/c', 'introducing FEATURE a'),
+            Post('https://example.com/d', 'A different headline'),
+        ]
+        index = DuplicateIndex()
+        self.assertEqual([post for post in posts if index.add(post.link, post.title)], dedupe(posts))
+
+if __name__ == '__main__':
+    unittest.main()
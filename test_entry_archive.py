@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+import unittest
+import os
+import sys
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.dirname(__file__))
+from entry_archive import EntryArchive, FeedEntry, entries_in_range, extract_entry
+
+def _feed_entry(link, title, published):
+    """feedparser のエントリ相当の辞書を作る"""
+    return {
+        'link': link,
+        'title': title,
+        'summary': f'<p>{title}</p>',
+        'published_parsed': published.timetuple(),
+    }
+
+class TestExtractEntry(unittest.TestCase):
+    """エントリ抽出のテスト"""
+
+    def test_extract_entry(self):
+        """リンク・タイトル・概要・公開日時が取り出される"""
+        entry = extract_entry(_feed_entry('https://example.com/1', 'Hello', datetime(2025, 11, 20, 9, 30)))
+        self.assertEqual(entry, FeedEntry('https://example.com/1', 'Hello', '<p>Hello</p>',
+                                          datetime(2025, 11, 20, 9, 30)))
+
+    def test_entry_without_date_is_skipped(self):
+        """公開日のないエントリは None になる"""
+        self.assertIsNone(extract_entry({'link': 'https://example.com/1', 'title': 'Hello'}))
+
+class TestEntryArchive(unittest.TestCase):
+    """エントリアーカイブのテスト"""
+
+    def setUp(self):
+        self.archive = EntryArchive(':memory:')
+
+    def tearDown(self):
+        self.archive.close()
+
+    def test_upsert_counts_only_new_entries(self):
+        """同じリンクは更新扱いになり、新規件数に含まれない"""
+        first = [extract_entry(_feed_entry('https://example.com/1', 'Old title', datetime(2025, 11, 20)))]
+        self.assertEqual(self.archive.upsert(first), 1)
+        second = [
+            extract_entry(_feed_entry('https://example.com/1', 'New title', datetime(2025, 11, 20))),
+            extract_entry(_feed_entry('https://example.com/2', 'Other', datetime(2025, 11, 21))),
+        ]
+        self.assertEqual(self.archive.upsert(second), 1)
+        self.assertEqual(self.archive.count(), 2)
+        titles = [e.title for e in self.archive.query_range(date(2025, 11, 1), date(2025, 11, 30))]
+        self.assertEqual(titles, ['Other', 'New title'])
+
+    def test_query_range_includes_boundaries_newest_first(self):
+        """期間の開始日・終了日を含み、新しい順に返される"""
+        entries = [
+            extract_entry(_feed_entry(f'https://example.com/{d}', f'day {d}', datetime(2025, 11, d, 12)))
+            for d in range(15, 25)
+        ]
+        self.archive.upsert(entries)
+        result = self.archive.query_range(date(2025, 11, 16), date(2025, 11, 22))
+        self.assertEqual([e.published.day for e in result], [22, 21, 20, 19, 18, 17, 16])
+
+    def test_entries_outside_feed_window_remain_queryable(self):
+        """フィードから消えた過去のエントリも範囲クエリで取り出せる"""
+        old_feed = [_feed_entry('https://example.com/old', 'Old', datetime(2025, 10, 1))]
+        new_feed = [_feed_entry('https://example.com/new', 'New', datetime(2025, 11, 20))]
+        entries_in_range(old_feed, date(2025, 10, 1), date(2025, 10, 1), self.archive)
+        result = entries_in_range(new_feed, date(2025, 9, 28), date(2025, 10, 4), self.archive)
+        self.assertEqual([e.title for e in result], ['Old'])
+
+    def test_entries_in_range_without_archive(self):
+        """アーカイブなしではフィード内のエントリを期間で絞り込む"""
+        feed = [
+            _feed_entry('https://example.com/1', 'In', datetime(2025, 11, 20)),
+            _feed_entry('https://example.com/2', 'Out', datetime(2025, 11, 30)),
+        ]
+        result = entries_in_range(feed, date(2025, 11, 16), date(2025, 11, 22))
+        self.assertEqual([e.title for e in result], ['In'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+import unittest
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer, ThreadingHTTPServer
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(__file__))
+from feed_fetcher import (
+    FeedCache, download_feed, fetch_feed, fetch_feed_entries, gather_feeds_async, open_parse_pool, parse_entries
+)
+
+FEED_BODY = (b'<?xml version="1.0"?><rss version="2.0"><channel><title>t</title>'
+             b'<item><title>Hello</title><link>https://example.com/1</link></item>'
+             b'</channel></rss>')
+
+# 日付と概要のあるエントリ（FeedEntry に取り出せるもの）
+DATED_FEED_BODY = FEED_BODY.replace(
+    b'</link>', b'</link><description>&lt;p&gt;A &amp;amp; B&lt;/p&gt;</description>'
+                b'<pubDate>Mon, 24 Nov 2025 10:00:00 GMT</pubDate>')
+
+class _ConditionalHandler(BaseHTTPRequestHandler):
+    """ETag が一致すれば 304 を返すテスト用サーバー"""
+    requests = []
+
+    def do_GET(self):
+        type(self).requests.append(dict(self.headers))
+        if self.headers.get('If-None-Match') == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('ETag', '"v1"')
+        self.send_header('Last-Modified', 'Sun, 23 Nov 2025 00:00:00 GMT')
+        self.end_headers()
+        self.wfile.write(FEED_BODY)
+
+    def log_message(self, *args):
+        pass
+
+class _TrickleHandler(BaseHTTPRequestHandler):
+    """本文を少しずつ送り続けるテスト用サーバー（受信ごとのタイムアウトにはかからない）"""
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Length', '100000')
+        self.end_headers()
+        try:
+            for _ in range(1000):
+                self.wfile.write(b' ')
+                self.wfile.flush()
+                time.sleep(0.02)
+        except OSError:
+            pass
+
+    def log_message(self, *args):
+        pass
+
+class TestGatherFeeds(unittest.TestCase):
+    """フィード並列取得のテスト"""
+
+    def test_results_keep_input_order(self):
+        """結果は入力順に (結果, 例外) の組で返される"""
+        def fetch(url, delay):
+            time.sleep(delay)
+            return url
+
+        results = asyncio.run(gather_feeds_async(fetch, [('a', 0.05), ('b', 0.0), ('c', 0.01)]))
+        self.assertEqual(results, [('a', None), ('b', None), ('c', None)])
+
+    def test_feeds_are_fetched_concurrently(self):
+        """複数フィードの待ち時間は合計ではなく最大値程度になる"""
+        def fetch(url):
+            time.sleep(0.1)
+            return url
+
+        start = time.monotonic()
+        asyncio.run(gather_feeds_async(fetch, [(str(i),) for i in range(5)], concurrency=5))
+        self.assertLess(time.monotonic() - start, 0.4)
+
+    def test_slow_and_broken_feeds_are_isolated(self):
+        """遅いフィードはタイムアウト、壊れたフィードは例外として個別に報告される"""
+        def fetch(url):
+            if url == 'slow':
+                time.sleep(0.5)
+            if url == 'broken':
+                raise OSError("connection refused")
+            return url
+
+        results = asyncio.run(gather_feeds_async(fetch, [('slow',), ('broken',), ('ok',)], timeout=0.1))
+        self.assertIsInstance(results[0][1], TimeoutError)
+        self.assertIsInstance(results[1][1], OSError)
+        self.assertEqual(results[2], ('ok', None))
+
+    def test_on_result_is_called_as_feeds_complete(self):
+        """取得できたフィードごとに完了した順で on_result が呼ばれる"""
+        def fetch(url, delay):
+            time.sleep(delay)
+            if url == 'broken':
+                raise OSError("connection refused")
+            return url
+
+        done = []
+        asyncio.run(gather_feeds_async(fetch, [('a', 0.1), ('b', 0.0), ('broken', 0.0)],
+                                       on_result=lambda index, result: done.append((index, result))))
+        self.assertEqual(done, [(1, 'b'), (0, 'a')])
+
+class TestParseEntries(unittest.TestCase):
+    """フィードのパースのテスト"""
+
+    def test_parse_entries(self):
+        """必要な項目だけを取り出し、clean_summary=True では概要をテキストにする"""
+        entry, = parse_entries(DATED_FEED_BODY)
+        self.assertEqual((entry.link, entry.title, entry.summary), ('https://example.com/1', 'Hello', '<p>A &amp; B</p>'))
+        self.assertEqual(parse_entries(DATED_FEED_BODY, clean_summary=True)[0].summary, 'A & B')
+
+    def test_fetch_feed_entries_in_process_pool(self):
+        """プロセスプールでパースしても同じ結果になる"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'feed.xml')
+            with open(path, 'wb') as f:
+                f.write(DATED_FEED_BODY)
+            url = 'file://' + path
+            with open_parse_pool(1) as pool:
+                self.assertIsNotNone(pool)
+                entries = fetch_feed_entries(url, pool=pool)
+            self.assertEqual(entries, fetch_feed_entries(url))
+            self.assertEqual([entry.title for entry in entries], ['Hello'])
+
+    def test_parse_pool_can_be_disabled(self):
+        """AWS_UPDATES_PARSE_WORKERS=0 ではプロセスプールを作らない"""
+        with patch.dict(os.environ, {'AWS_UPDATES_PARSE_WORKERS': '0'}), open_parse_pool() as pool:
+            self.assertIsNone(pool)
+
+    def test_single_feed_uses_no_pool_by_default(self):
+        """フィードが1本だけのときは、指定しなければプロセスプールを作らない"""
+        with patch.dict(os.environ):
+            os.environ.pop('AWS_UPDATES_PARSE_WORKERS', None)
+            with open_parse_pool(feeds=1) as pool:
+                self.assertIsNone(pool)
+        with patch.dict(os.environ, {'AWS_UPDATES_PARSE_WORKERS': '1'}), open_parse_pool(feeds=1) as pool:
+            self.assertIsNotNone(pool)
+
+    def test_pool_does_not_fork(self):
+        """スレッドが動いている中で fork しないよう、forkserver か spawn でプロセスを起動する"""
+        with open_parse_pool(1) as pool:
+            self.assertIn(pool._mp_context.get_start_method(), ('forkserver', 'spawn'))
+
+class TestFeedCache(unittest.TestCase):
+    """条件付きリクエストとフィードキャッシュのテスト"""
+
+    def setUp(self):
+        _ConditionalHandler.requests = []
+        self.server = HTTPServer(('127.0.0.1', 0), _ConditionalHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/feed"
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = FeedCache(self.tmpdir.name)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmpdir.cleanup()
+
+    def test_second_request_is_conditional(self):
+        """2回目は If-None-Match / If-Modified-Since を送り、304 ならキャッシュを使う"""
+        self.assertEqual(download_feed(self.url, cache=self.cache), FEED_BODY)
+        self.assertEqual(download_feed(self.url, cache=self.cache), FEED_BODY)
+        self.assertNotIn('If-None-Match', _ConditionalHandler.requests[0])
+        self.assertEqual(_ConditionalHandler.requests[1]['If-None-Match'], '"v1"')
+        self.assertEqual(_ConditionalHandler.requests[1]['If-Modified-Since'], 'Sun, 23 Nov 2025 00:00:00 GMT')
+        self.assertEqual((self.cache.downloads, self.cache.not_modified), (1, 1))
+
+    def test_offline_mode_uses_cache_only(self):
+        """オフラインモードではネットワークに接続せずキャッシュから読む"""
+        download_feed(self.url, cache=self.cache)
+        feed = fetch_feed(self.url, cache=self.cache, offline=True)
+        self.assertEqual(feed.entries[0].title, 'Hello')
+        self.assertEqual(len(_ConditionalHandler.requests), 1)
+
+    def test_timeout_bounds_the_whole_download(self):
+        """本文が少しずつ届き続けても、timeout を過ぎたら取得を打ち切る"""
+        server = ThreadingHTTPServer(('127.0.0.1', 0), _TrickleHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            start = time.monotonic()
+            with self.assertRaises(TimeoutError):
+                download_feed(f"http://127.0.0.1:{server.server_port}/feed", timeout=0.3)
+            self.assertLess(time.monotonic() - start, 1.0)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_offline_mode_without_cache_raises(self):
+        """オフラインモードでキャッシュがなければエラーになる"""
+        with self.assertRaises(FileNotFoundError):
+            download_feed(self.url, cache=self.cache, offline=True)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+import unittest
+import asyncio
+import io
+import os
+import subprocess
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from datetime import date
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(__file__))
+import get_custom_range
+from test_pipeline import FEED_XML
+
+class TestCustomRangeArguments(unittest.TestCase):
+    """期間指定の引数のテスト"""
+
+    def _ranges(self, argv):
+        parser = get_custom_range.build_parser()
+        with redirect_stdout(io.StringIO()), patch('sys.stderr', io.StringIO()):
+            return get_custom_range.collect_ranges(parser.parse_args(argv))
+
+    def test_ranges_weeks_and_months(self):
+        """--start/--end・--range・--week・--month を指定順に集め、重複は除く"""
+        self.assertEqual(self._ranges([
+            '--start', '2025-11-23', '--end', '2025-11-29',
+            '--range', '2025-11-01:2025-11-03',
+            '--week', '2025-11-26', '--week', '2025-11-05',
+            '--month', '2025-10',
+        ]), [
+            (date(2025, 11, 23), date(2025, 11, 29)),
+            (date(2025, 11, 1), date(2025, 11, 3)),
+            (date(2025, 11, 2), date(2025, 11, 8)),
+            (date(2025, 10, 1), date(2025, 10, 31)),
+        ])
+
+    def test_invalid_values_are_rejected(self):
+        """不正な形式や逆順の期間はエラーになる"""
+        for argv in (['--range', '2025-11-03'], ['--range', '2025-11-03:2025-11-01'],
+                     ['--month', '2025-13'], ['--week', '2025/11/05']):
+            with self.subTest(argv=argv), self.assertRaises(SystemExit):
+                self._ranges(argv)
+
+    def test_range_is_required(self):
+        """期間を1つも指定しないとエラーになる"""
+        with patch('sys.stderr', io.StringIO()), self.assertRaises(SystemExit):
+            get_custom_range.main([])
+
+    def test_offline_default_follows_environment(self):
+        """offline を省略すると、ほかのエントリポイントと同じく AWS_UPDATES_OFFLINE に従う"""
+        code = ('import inspect, get_custom_range; '
+                'print([inspect.signature(func).parameters["offline"].default for func in '
+                '(get_custom_range.custom_range_async, get_custom_range.custom_ranges_async)])')
+        result = subprocess.run(
+            [sys.executable, '-c', code], cwd=os.path.dirname(os.path.abspath(__file__)),
+            env={**os.environ, 'AWS_UPDATES_OFFLINE': '1'}, capture_output=True, text=True, check=True
+        )
+        self.assertEqual(result.stdout.strip(), '[True, True]')
+
+@patch.dict(os.environ, {'AWS_UPDATES_ARCHIVE': '0', 'AWS_UPDATES_FEED_CACHE': '0',
+                         'AWS_UPDATES_MAPPING_CACHE': '0', 'AWS_UPDATES_PARSE_WORKERS': '0',
+                         'AWS_UPDATES_TRANSLATION_CACHE': '0'})
+class TestCustomRangeReport(unittest.TestCase):
+    """期間指定のレポート出力のテスト"""
+
+    def test_links_keep_markdown_format(self):
+        """リンクは以前と同じ [URL](URL) の形式で出力される"""
+        with tempfile.TemporaryDirectory() as tmp, \
+                patch('pipeline.OUTPUT_DIR', tmp), \
+                patch('feed_fetcher.download_feed', return_value=FEED_XML.encode()), \
+                redirect_stdout(io.StringIO()):
+            path, = asyncio.run(get_custom_range.custom_range_async(
+                date(2025, 11, 23), date(2025, 11, 29), translator_name='local', formats=['md']))
+            with open(path, encoding='utf-8') as f:
+                report = f.read()
+        self.assertIn('- **リンク**: [https://example.com/ec2](https://example.com/ec2)\n', report)
+
+if __name__ == '__main__':
+    unittest.main()
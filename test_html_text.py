@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+import unittest
+import os
+import random
+import time
+import sys
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(__file__))
+import html_text
+from html_text import strip_html
+from pipeline import trim_summary
+
+class TestStripHtml(unittest.TestCase):
+    """HTML からのテキスト抽出のテスト"""
+
+    def test_entities_are_decoded_and_whitespace_collapsed(self):
+        """実体参照を戻し、改行や連続する空白を1つの空白にまとめる"""
+        self.assertEqual(strip_html('<p>Amazon S3 &amp; AWS&nbsp;Glue\n\n  now &#x2014; GA</p>'),
+                         'Amazon S3 & AWS Glue now — GA')
+        self.assertEqual(strip_html('  plain\ttext  '), 'plain text')
+
+    def test_block_tags_separate_words(self):
+        """ブロック要素の境界では単語がつながらず、インライン要素の境界ではつながる"""
+        self.assertEqual(strip_html('<p>one</p><p>two</p><br/>three'), 'one two three')
+        self.assertEqual(strip_html('Hel<b>lo</b> wor<i>ld</i>'), 'Hello world')
+
+    def test_angle_brackets_outside_tags(self):
+        """属性値の中の > やタグでない < で文字が消えない"""
+        self.assertEqual(strip_html('<a href="/x?a>b" title=\'1 > 0\'>link</a> if a < b'), 'link if a < b')
+        self.assertEqual(strip_html('x &lt;b&gt; y'), 'x <b> y')
+
+    def test_comments_and_scripts_are_dropped(self):
+        """コメントと script / style の中身は出力しない"""
+        self.assertEqual(strip_html('a<!-- <p>hidden</p> -->b<SCRIPT>if (a<b) {}</SCRIPT>c<style>p{}</style>'),
+                         'abc')
+
+    def test_unclosed_angle_bracket_keeps_following_text(self):
+        """閉じる > のない < 以降のテキストは消えない"""
+        self.assertEqual(strip_html('Use x<y to compare values. More text here.'),
+                         'Use x<y to compare values. More text here.')
+        self.assertEqual(strip_html('<p>a<b and b<c</p>'), 'a<b and b<c')
+        self.assertEqual(strip_html("if a<b's value, <!-- not closed"), "if a<b's value, <!-- not closed")
+        self.assertEqual(strip_html('Use <template> literals <b>now</b>'), 'Use literals now')
+
+    def test_pathological_input_is_linear(self):
+        """閉じる > のない < やコメントが大量にあっても、処理時間が入力の長さに比例する"""
+        texts = ['x<y and ' * 20000, '<a ' * 20000, '<!--' * 20000, '<script>' * 20000, '<!x' * 20000,
+                 '<p title=\'' * 20000, 'x<y ' + 'a "b" ' * 20000]
+        for text in texts:
+            with self.subTest(text=text[:20]):
+                start = time.perf_counter()
+                strip_html(text)
+                self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertEqual(strip_html('x<y and ' * 3), 'x<y and x<y and x<y and')
+
+    def test_limit_keeps_trim_summary_result(self):
+        """limit を指定しても trim_summary の結果は変わらない"""
+        rng = random.Random(0)
+        pieces = ['<p>', '</p>', '<a href="u?a=1&amp;b=2">', '</a>', '&amp;', '&#12354;', ' ', '\n  ',
+                  'word', '文です。', '<br/>', '<!-- c -->', 'a < b', 'x<y', '<!--', '-->', '<script>', '</script>',
+                  '<P CLASS="x">']
+        for _ in range(300):
+            text = ''.join(rng.choice(pieces) for _ in range(rng.randint(0, 400)))
+            limit = rng.choice([5, 50, 200])
+            with self.subTest(text=text, limit=limit):
+                self.assertEqual(strip_html(text, limit), strip_html(text)[:limit + 1])
+                self.assertEqual(trim_summary(strip_html(text, limit), limit),
+                                 trim_summary(strip_html(text), limit))
+
+    def test_limit_stops_early(self):
+        """limit を指定すると長い入力の先頭だけを変換する"""
+        text = '<p>' + 'word ' * 200000 + '</p>'
+        with patch('html_text._convert', wraps=html_text._convert) as convert:
+            self.assertEqual(strip_html(text, 200), ('word ' * 41)[:201])
+        self.assertLessEqual(max(len(call.args[0]) for call in convert.call_args_list), 800)
+
+if __name__ == '__main__':
+    unittest.main()
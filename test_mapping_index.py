@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+import unittest
+import json
+import os
+import sys
+import tempfile
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(__file__))
+import mapping_index
+from mapping_index import load_index, rebuild_index
+
+MAPPINGS = {
+    'category_mappings': {'EC2': 'コンピュート系', 'ECS': 'コンテナ系'},
+    'service_descriptions': {'EC2': '仮想サーバー'},
+}
+
+class TestMappingIndex(unittest.TestCase):
+    """サービスマッピングのインデックスとキャッシュのテスト"""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.mapping_file = os.path.join(self._tmp.name, 'service_mappings.json')
+        self.index_path = os.path.join(self._tmp.name, 'cache', 'service_mappings.index')
+        self._write(MAPPINGS)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _write(self, data, mtime_ns=None):
+        with open(self.mapping_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        if mtime_ns is not None:
+            os.utime(self.mapping_file, ns=(mtime_ns, mtime_ns))
+
+    def test_index_is_built_then_loaded_from_cache(self):
+        """初回は JSON から作ってキャッシュし、2回目はトライ木を作らずキャッシュから読む"""
+        index = load_index(self.mapping_file, self.index_path)
+        self.assertFalse(index.from_cache)
+        self.assertTrue(os.path.exists(self.index_path))
+
+        with patch('mapping_index.build_service_pattern') as build:
+            cached = load_index(self.mapping_file, self.index_path)
+        build.assert_not_called()
+        self.assertTrue(cached.from_cache)
+        self.assertEqual(cached.category('Amazon EC2 adds GA feature'), ('コンピュート系', 'EC2'))
+        self.assertEqual(cached.description('EC2'), '仮想サーバー')
+        self.assertEqual(cached.description('ECS'), '')
+
+    def test_changed_mappings_rebuild_the_index(self):
+        """JSON の内容が変わったら作り直す"""
+        load_index(self.mapping_file, self.index_path)
+        self._write({'category_mappings': {'Lambda': 'コンピュート系'}}, mtime_ns=1)
+        index = load_index(self.mapping_file, self.index_path)
+        self.assertFalse(index.from_cache)
+        self.assertEqual(index.category('AWS Lambda update'), ('コンピュート系', 'Lambda'))
+        self.assertEqual(index.category('Amazon EC2 update'), ('その他', None))
+        self.assertTrue(load_index(self.mapping_file, self.index_path).from_cache)
+
+    def test_touched_file_with_same_content_uses_cache(self):
+        """更新日時だけが変わった場合はハッシュが同じなのでキャッシュを使う"""
+        load_index(self.mapping_file, self.index_path)
+        self._write(MAPPINGS, mtime_ns=1)
+        self.assertTrue(load_index(self.mapping_file, self.index_path).from_cache)
+
+    def test_broken_cache_is_rebuilt(self):
+        """壊れたキャッシュや古い形式のキャッシュは作り直す"""
+        load_index(self.mapping_file, self.index_path)
+        for content in (b'broken', b''):
+            with self.subTest(content=content):
+                with open(self.index_path, 'wb') as f:
+                    f.write(content)
+                self.assertFalse(load_index(self.mapping_file, self.index_path).from_cache)
+        with patch('mapping_index.INDEX_VERSION', mapping_index.INDEX_VERSION + 1):
+            self.assertFalse(load_index(self.mapping_file, self.index_path).from_cache)
+
+    def test_rebuild_index_ignores_cache(self):
+        """rebuild_index は常に JSON から作り直す"""
+        load_index(self.mapping_file, self.index_path)
+        self.assertFalse(rebuild_index(self.mapping_file, self.index_path).from_cache)
+
+    def test_missing_mappings_give_empty_index(self):
+        """JSON が読めなければ空のインデックスになる"""
+        index = load_index(os.path.join(self._tmp.name, 'missing.json'), self.index_path)
+        self.assertEqual(index.category('Amazon EC2'), ('その他', None))
+        self.assertEqual(index.category_mappings, {})
+
+    def test_cache_can_be_disabled(self):
+        """AWS_UPDATES_MAPPING_CACHE=0 ではキャッシュを作らない"""
+        with patch.dict(os.environ, {'AWS_UPDATES_MAPPING_CACHE': '0'}):
+            self.assertFalse(load_index(self.mapping_file, self.index_path).from_cache)
+        self.assertFalse(os.path.exists(self.index_path))
+
+if __name__ == '__main__':
+    unittest.main()
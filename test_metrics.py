@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+import unittest
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(__file__))
+from metrics import RunMetrics, describe, hit_rates, metrics_enabled, percentile
+
+class TestStatistics(unittest.TestCase):
+    """分布の集計のテスト"""
+
+    def test_percentiles_use_nearest_rank(self):
+        """パーセンタイルは最近傍順位法で求める"""
+        values = list(range(1, 101))
+        self.assertEqual((percentile(values, 50), percentile(values, 95), percentile(values, 99)),
+                         (50, 95, 99))
+        self.assertEqual(percentile([7], 99), 7)
+        self.assertIsNone(percentile([], 50))
+
+    def test_describe(self):
+        """件数・平均・最大値を含み、空なら件数だけになる"""
+        self.assertEqual(describe([3, 1, 2]),
+                         {'count': 3, 'mean': 2, 'p50': 2, 'p95': 3, 'p99': 3, 'max': 3})
+        self.assertEqual(describe([]), {'count': 0})
+
+    def test_hit_rates(self):
+        """_hits と _misses の組からヒット率を求める"""
+        self.assertEqual(hit_rates({'cache_hits': 3, 'cache_misses': 1, 'other_hits': 0, 'x': 5}),
+                         {'cache': 0.75, 'other': None})
+
+class TestRunMetrics(unittest.TestCase):
+    """1回の実行の計測のテスト"""
+
+    def test_stages_and_counters(self):
+        """ステージの時間と回数、カウンターが加算される"""
+        metrics = RunMetrics()
+        for _ in range(2):
+            with metrics.stage('parse'):
+                pass
+        metrics.count('feed_bytes', 100)
+        metrics.count('feed_bytes', 20)
+        metrics.observe('latency', [0.2, 0.1])
+        data = metrics.to_dict()
+        self.assertEqual(data['stages']['parse']['calls'], 2)
+        self.assertEqual(data['counters'], {'feed_bytes': 120})
+        self.assertEqual(data['distributions']['latency']['p50'], 0.1)
+        self.assertIn('parse', metrics.summary())
+
+    def test_failed_stage_is_still_timed(self):
+        """例外で抜けたステージも時間を記録する"""
+        metrics = RunMetrics()
+        with self.assertRaises(ValueError), metrics.stage('render'):
+            raise ValueError("boom")
+        self.assertEqual(metrics.to_dict()['stages']['render']['calls'], 1)
+
+    def test_overlap_of_concurrent_stages(self):
+        """並行して動いたステージの重なりを記録し、重ならなければ 0 になる"""
+        metrics = RunMetrics()
+
+        async def wait(seconds):
+            await asyncio.sleep(seconds)
+            return seconds
+
+        async def run():
+            return await asyncio.gather(metrics.timed('fetch', wait(0.1)), metrics.timed('translate', wait(0.05)))
+
+        self.assertEqual(asyncio.run(run()), [0.1, 0.05])
+        self.assertGreater(metrics.add_overlap('overlap', 'fetch', 'translate'), 0.03)
+        with metrics.stage('render'):
+            pass
+        self.assertEqual(metrics.add_overlap('render_overlap', 'fetch', 'render'), 0.0)
+        self.assertEqual(metrics.add_overlap('missing', 'fetch', 'unknown'), 0.0)
+        self.assertIn('overlap', metrics.to_dict()['stages'])
+
+    def test_counters_are_thread_safe(self):
+        """複数のスレッドから記録しても取りこぼさない"""
+        metrics = RunMetrics()
+
+        def work():
+            for _ in range(1000):
+                metrics.count('feeds')
+                metrics.add_time('fetch', 0.001)
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(metrics.to_dict()['counters']['feeds'], 4000)
+        self.assertEqual(metrics.to_dict()['stages']['fetch']['calls'], 4000)
+
+    def test_write_json(self):
+        """追加の情報と一緒に JSON で書き出す"""
+        metrics = RunMetrics()
+        metrics.count('items', 2)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = metrics.write(os.path.join(tmp, 'metrics', 'run.json'), formats=['md'])
+            with open(path, encoding='utf-8') as f:
+                document = json.load(f)
+            self.assertEqual(os.listdir(os.path.join(tmp, 'metrics')), ['run.json'])
+        self.assertEqual(document['formats'], ['md'])
+        self.assertEqual(document['counters'], {'items': 2})
+        self.assertIn('wall_seconds', document)
+
+    def test_enabled_flag_is_read_at_call_time(self):
+        """AWS_UPDATES_METRICS はインポート後に変更しても反映される"""
+        with patch.dict(os.environ, {'AWS_UPDATES_METRICS': '0'}):
+            self.assertFalse(metrics_enabled())
+        with patch.dict(os.environ, {'AWS_UPDATES_METRICS': '1'}):
+            self.assertTrue(metrics_enabled())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+import unittest
+import argparse
+import asyncio
+import io
+import json
+import os
+import pathlib
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from datetime import date, datetime
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(__file__))
+import pipeline
+from entry_archive import FeedEntry
+from translation_backends import LocalBackend
+from translation_cache import TranslationCache
+from pipeline import (
+    ReportInfo, TranslationStage, UpdateItem, build_arg_parser, check_date_range, classify_entries, filter_entries, parse_formats,
+    render_html_report, render_json_document, run_whats_new_report, run_whats_new_reports, write_atomic
+)
+
+FEED_XML = """<?xml version="1.0"?><rss version="2.0"><channel><title>What's New</title>
+<item><title>Amazon EC2 adds new instances</title><link>https://example.com/ec2</link>
+<description>&lt;p&gt;New instances are GA.&lt;/p&gt;</description>
+<pubDate>Mon, 24 Nov 2025 10:00:00 GMT</pubDate></item>
+<item><title>AWS Lambda supports a new runtime</title><link>https://example.com/lambda</link>
+<description>Runtime update.</description>
+<pubDate>Tue, 25 Nov 2025 10:00:00 GMT</pubDate></item>
+<item><title>Amazon S3 old update</title><link>https://example.com/s3</link>
+<description>Old.</description>
+<pubDate>Mon, 10 Nov 2025 10:00:00 GMT</pubDate></item>
+</channel></rss>"""
+
+@patch.dict(os.environ, {'AWS_UPDATES_MAPPING_CACHE': '0'})
+class TestClassifyEntries(unittest.TestCase):
+    """分類ステージのテスト"""
+
+    def test_entries_are_grouped_by_category(self):
+        """カテゴリごとにまとめられ、サービス別の件数が数えられる"""
+        entries = [
+            FeedEntry('https://example.com/1', 'Amazon EC2 adds GA feature', '<p>Now GA.</p>',
+                      datetime(2025, 11, 24, 10)),
+            FeedEntry('https://example.com/2', 'Something unrelated', 'text',
+                      datetime(2025, 11, 25, 10)),
+        ]
+        grouped, service_count = classify_entries(entries)
+        self.assertEqual(grouped['コンピュート系'], [
+            UpdateItem('Amazon EC2 adds GA feature', 'https://example.com/1', 'Now GA.', 'EC2',
+                       'コンピュート系', True, date(2025, 11, 24))
+        ])
+        self.assertIsNone(grouped['その他'][0].service)
+        self.assertEqual(grouped['その他'][0].published, date(2025, 11, 25))
+        self.assertEqual(dict(service_count), {'EC2': 1})
+
+    def test_category_and_service_names_are_shared(self):
+        """同じカテゴリ名・サービス名は項目間で同じ文字列オブジェクトを共有する"""
+        entries = [
+            FeedEntry(f'https://example.com/{i}', f'Amazon EC2 update {i}', '', datetime(2025, 11, 24))
+            for i in range(3)
+        ]
+        items = classify_entries(entries)[0]['コンピュート系']
+        self.assertTrue(all(item.service is items[0].service for item in items))
+        self.assertTrue(all(item.category is items[0].category for item in items))
+
+@patch.dict(os.environ, {'AWS_UPDATES_ARCHIVE': '0'})
+class TestFilterEntries(unittest.TestCase):
+    """絞り込みステージのテスト"""
+
+    def test_links_differing_only_in_tracking_params_are_merged(self):
+        """トラッキング用パラメータだけが違うリンクは1件になるが、同じタイトルの別の発表は残る"""
+        title = 'Amazon EC2 instances now available in additional regions'
+        entries = [
+            FeedEntry('https://example.com/1?trk=a', title, '', datetime(2025, 11, 24)),
+            FeedEntry('https://example.com/1?trk=b', title, '', datetime(2025, 11, 24)),
+            FeedEntry('https://example.com/2', title, '', datetime(2025, 11, 25)),
+        ]
+        with redirect_stdout(io.StringIO()):
+            selected = filter_entries(entries, date(2025, 11, 23), date(2025, 11, 29))
+        self.assertEqual(selected, [entries[0], entries[2]])
+
+class TestTranslationStage(unittest.TestCase):
+    """翻訳ステージのテスト"""
+
+    def test_summaries_are_truncated_before_translation(self):
+        """概要だけを文の区切りで切り詰めて翻訳し、省いた文字数を数える"""
+        summary = 'First sentence is here. Second sentence is here.'
+        stage = TranslationStage(LocalBackend(dictionary={'First sentence is here.': '最初の文です。'}),
+                                 summary_chars=20)
+        result = asyncio.run(stage.translate_all(['First sentence is here.', summary], {summary}))
+        self.assertEqual(result, {'First sentence is here.': '最初の文です。', summary: '最初の文です。'})
+        self.assertEqual(stage.saved_chars, len(' Second sentence is here.'))
+
+    def test_cached_summaries_are_not_counted_as_saved(self):
+        """キャッシュから返した概要は、省いた文字数に数えない"""
+        cached = 'Cached sentence is here. Second sentence is here.'
+        summary = 'First sentence is here. Second sentence is here.'
+        cache = TranslationCache(':memory:', backend='local')
+        cache.set('Cached sentence is here.', 'ja', 'キャッシュ済みの文です。')
+        stage = TranslationStage(LocalBackend(dictionary={}), cache=cache, summary_chars=20)
+        result = asyncio.run(stage.translate_all([cached, summary], {cached, summary}))
+        self.assertEqual(result[cached], 'キャッシュ済みの文です。')
+        self.assertEqual(stage.saved_chars, len(' Second sentence is here.'))
+
+    def test_no_translator_keeps_full_summaries(self):
+        """翻訳しない場合は概要を切り詰めない"""
+        summary = 'First sentence is here. Second sentence is here.'
+        stage = TranslationStage(None, summary_chars=20)
+        self.assertEqual(asyncio.run(stage.translate_all([summary], {summary})), {summary: summary})
+        self.assertEqual(stage.saved_chars, 0)
+
+    def test_concurrency_is_shared_between_calls(self):
+        """同時に呼んだ translate_all 全体で同時実行数の上限を守る"""
+        class SlowBackend(LocalBackend):
+            running = 0
+            peak = 0
+
+            async def translate(self, text, dest='ja'):
+                SlowBackend.running += 1
+                SlowBackend.peak = max(SlowBackend.peak, SlowBackend.running)
+                await asyncio.sleep(0.01)
+                SlowBackend.running -= 1
+                return await super().translate(text, dest)
+
+        stage = TranslationStage(SlowBackend(dictionary={}), batch_chars=0)
+
+        async def run():
+            return await asyncio.gather(*(stage.translate_all([f'text {i}-{j}' for j in range(4)])
+                                          for i in range(3)))
+
+        with patch('pipeline.TRANSLATE_CONCURRENCY', 2):
+            asyncio.run(run())
+        self.assertEqual(SlowBackend.peak, 2)
+
+    def test_queued_texts_share_batches(self):
+        """queue() で少しずつ加えたテキストは、文字数予算ごとのバッチにまとめて送る"""
+        backend = LocalBackend(dictionary={'a': 'あ'})
+        stage = TranslationStage(backend, batch_chars=40)
+
+        async def run():
+            for i in range(6):
+                stage.queue([f'text {i}', 'a'])
+            return await stage.flush()
+
+        result = asyncio.run(run())
+        self.assertEqual(result, dict({f'text {i}': f'text {i}' for i in range(6)}, a='あ'))
+        # マーカーの分を含めて 'text 0' は 14 文字、'a' は 9 文字なので、
+        # [text 0, a, text 1]・[text 2, text 3]・[text 4, text 5] の3リクエストになる
+        self.assertEqual(backend.requests, 3)
+
+class TestWriteAtomic(unittest.TestCase):
+    """一時ファイル経由の書き込みのテスト"""
+
+    def test_chunks_are_written_in_order(self):
+        """チャンクが順に書き込まれる"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'report.md')
+            write_atomic(path, (f"line {i}\n" for i in range(3)))
+            with open(path, encoding='utf-8') as f:
+                self.assertEqual(f.read(), "line 0\nline 1\nline 2\n")
+            self.assertEqual(os.listdir(tmp), ['report.md'])
+
+    def test_failure_keeps_previous_file(self):
+        """途中で失敗しても既存のファイルは書きかけにならず、一時ファイルも残らない"""
+        def chunks():
+            yield "new content\n"
+            raise RuntimeError("render failed")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'report.md')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write("old content\n")
+            with self.assertRaises(RuntimeError):
+                write_atomic(path, chunks())
+            with open(path, encoding='utf-8') as f:
+                self.assertEqual(f.read(), "old content\n")
+            self.assertEqual(os.listdir(tmp), ['report.md'])
+
+class TestDateRangeArguments(unittest.TestCase):
+    """--start/--end 引数のテスト"""
+
+    def _parse(self, argv, require_range=False):
+        parser = build_arg_parser('test', require_range=require_range)
+        with redirect_stdout(io.StringIO()), patch('sys.stderr', io.StringIO()):
+            return check_date_range(parser, parser.parse_args(argv))
+
+    def test_range_is_parsed(self):
+        """YYYY-MM-DD 形式の期間が日付として解析される"""
+        args = self._parse(['--start', '2025-11-23', '--end', '2025-11-25'])
+        self.assertEqual((args.start, args.end), (date(2025, 11, 23), date(2025, 11, 25)))
+
+    def test_range_is_optional_by_default(self):
+        """省略時は None になり、各スクリプトの既定の期間が使われる"""
+        args = self._parse([])
+        self.assertIsNone(args.start)
+        self.assertIsNone(args.end)
+
+    def test_invalid_ranges_are_rejected(self):
+        """片方だけの指定・逆順・不正な形式・必須の省略はエラーになる"""
+        for argv, require_range in [
+            (['--start', '2025-11-23'], False),
+            (['--start', '2025-11-25', '--end', '2025-11-23'], False),
+            (['--start', '2025/11/23', '--end', '2025-11-25'], False),
+            ([], True),
+        ]:
+            with self.subTest(argv=argv), self.assertRaises(SystemExit):
+                self._parse(argv, require_range)
+
+@patch.dict(os.environ, {'AWS_UPDATES_ARCHIVE': '0', 'AWS_UPDATES_FEED_CACHE': '0',
+                         'AWS_UPDATES_MAPPING_CACHE': '0', 'AWS_UPDATES_PARSE_WORKERS': '0',
+                         'AWS_UPDATES_TRANSLATION_CACHE': '0'})
+class TestRunWhatsNewReport(unittest.TestCase):
+    """パイプライン全体のテスト"""
+
+    def _run(self, formats):
+        with tempfile.TemporaryDirectory() as tmp, \
+                patch('pipeline.OUTPUT_DIR', tmp), \
+                patch('feed_fetcher.download_feed', return_value=FEED_XML.encode()), \
+                redirect_stdout(io.StringIO()):
+            paths = asyncio.run(run_whats_new_report(
+                date(2025, 11, 23), date(2025, 11, 29), translator_name='local', intro='テスト',
+                formats=formats
+            ))
+            contents = {}
+            for path in paths:
+                with open(path, encoding='utf-8') as f:
+                    contents[os.path.basename(path)] = f.read()
+        return contents
+
+    def test_report_contains_only_entries_in_range(self):
+        """指定した期間のエントリだけがレポートに出力される"""
+        report = self._run(['md'])['awsupdates_2025-11-23_2025-11-29.md']
+        self.assertIn('# AWS 更新情報 (2025-11-23 ～ 2025-11-29)', report)
+        self.assertIn('テスト', report)
+        self.assertIn('- **リンク**: https://example.com/ec2\n', report)
+        self.assertIn('https://example.com/lambda', report)
+        self.assertNotIn('https://example.com/s3', report)
+        self.assertIn('- **合計**: 2 件のアップデート', report)
+
+    def test_feed_url_can_point_to_a_local_file(self):
+        """feed_url に file:// の URL を渡すとネットワークに出ずにレポートを生成できる"""
+        with tempfile.TemporaryDirectory() as tmp, \
+                patch('pipeline.OUTPUT_DIR', tmp), \
+                redirect_stdout(io.StringIO()):
+            feed_path = os.path.join(tmp, 'feed.xml')
+            with open(feed_path, 'w', encoding='utf-8') as f:
+                f.write(FEED_XML)
+            paths = asyncio.run(run_whats_new_report(
+                date(2025, 11, 23), date(2025, 11, 29), translator_name='local', formats=['json'],
+                feed_url=pathlib.Path(feed_path).as_uri()
+            ))
+            with open(paths[0], encoding='utf-8') as f:
+                self.assertEqual(json.load(f)['total'], 2)
+
+    def test_feed_is_parsed_in_a_process_pool(self):
+        """プロセスプールでパースしても同じレポートになり、翻訳の準備と重なった時間が記録される"""
+        with tempfile.TemporaryDirectory() as tmp, \
+                patch.dict(os.environ, {'AWS_UPDATES_PARSE_WORKERS': '1'}), \
+                patch('pipeline.OUTPUT_DIR', tmp), \
+                redirect_stdout(io.StringIO()):
+            feed_path = os.path.join(tmp, 'feed.xml')
+            with open(feed_path, 'w', encoding='utf-8') as f:
+                f.write(FEED_XML)
+            paths = asyncio.run(run_whats_new_report(
+                date(2025, 11, 23), date(2025, 11, 29), translator_name='local', formats=['json'],
+                feed_url=pathlib.Path(feed_path).as_uri()
+            ))
+            with open(paths[0], encoding='utf-8') as f:
+                document = json.load(f)
+            with open(os.path.join(tmp, 'metrics', 'awsupdates_2025-11-23_2025-11-29.json'),
+                      encoding='utf-8') as f:
+                stages = json.load(f)['stages']
+        self.assertEqual(document['total'], 2)
+        self.assertEqual(document['items'][0]['summary'], 'New instances are GA.')
+        for name in ('feed_download', 'feed_parse', 'translate_overlap'):
+            self.assertIn(name, stages)
+
+    def test_run_metrics_are_written(self):
+        """ステージごとの時間とカウンターが metrics/ に JSON で書き出される"""
+        with tempfile.TemporaryDirectory() as tmp, \
+                patch('pipeline.OUTPUT_DIR', tmp), \
+                patch('feed_fetcher.download_feed', return_value=FEED_XML.encode()), \
+                redirect_stdout(io.StringIO()):
+            asyncio.run(run_whats_new_report(date(2025, 11, 23), date(2025, 11, 29),
+                                             translator_name='local', formats=['md']))
+            with open(os.path.join(tmp, 'metrics', 'awsupdates_2025-11-23_2025-11-29.json'),
+                      encoding='utf-8') as f:
+                document = json.load(f)
+        self.assertEqual(document['start_date'], '2025-11-23')
+        for name in ('fetch', 'translator_setup', 'filter', 'classify', 'translate', 'render', 'write_report'):
+            self.assertIn(name, document['stages'])
+        self.assertEqual(document['counters']['feed_entries'], 3)
+        self.assertEqual(document['counters']['items'], 2)
+        self.assertEqual(document['counters']['reports'], 1)
+        self.assertIn('translate_chars_saved', document['counters'])
+        self.assertIn('translate_latency_seconds', document['distributions'])
+
+    def test_profile_is_written(self):
+        """--profile を指定すると cProfile の統計が書き出される"""
+        async def work():
+            return 42
+
+        with tempfile.TemporaryDirectory() as tmp, redirect_stdout(io.StringIO()):
+            path = os.path.join(tmp, 'profile.pstats')
+            self.assertEqual(pipeline.run_async(work(), path), 42)
+            self.assertTrue(os.path.getsize(path) > 0)
+        self.assertEqual(pipeline.run_async(work()), 42)
+
+    def test_structured_outputs_share_the_same_items(self):
+        """JSON / JSONL / HTML が Markdown と同じ項目から出力される"""
+        contents = self._run(['md', 'json', 'jsonl', 'html'])
+        self.assertEqual(sorted(contents), [
+            'awsupdates_2025-11-23_2025-11-29.html', 'awsupdates_2025-11-23_2025-11-29.json',
+            'awsupdates_2025-11-23_2025-11-29.jsonl', 'awsupdates_2025-11-23_2025-11-29.md',
+        ])
+
+        document = json.loads(contents['awsupdates_2025-11-23_2025-11-29.json'])
+        self.assertEqual(document['start_date'], '2025-11-23')
+        self.assertEqual(document['total'], 2)
+        self.assertEqual([item['link'] for item in document['items']],
+                         ['https://example.com/ec2', 'https://example.com/lambda'])
+        ec2 = document['items'][0]
+        self.assertEqual((ec2['category'], ec2['service'], ec2['important']), ('コンピュート系', 'EC2', True))
+        self.assertEqual(ec2['summary'], 'New instances are GA.')
+
+        lines = contents['awsupdates_2025-11-23_2025-11-29.jsonl'].splitlines()
+        self.assertEqual([json.loads(line) for line in lines], document['items'])
+
+        page = contents['awsupdates_2025-11-23_2025-11-29.html']
+        self.assertTrue(page.startswith('<!DOCTYPE html>'))
+        self.assertIn('<a href="https://example.com/ec2">', page)
+        self.assertIn('<strong>GA</strong>', page)
+        self.assertIn('合計: 2 件のアップデート', page)
+
+    def test_multiple_ranges_share_one_fetch(self):
+        """複数の期間のレポートを1回の取得・分類から出力する"""
+        with tempfile.TemporaryDirectory() as tmp, \
+                patch('pipeline.OUTPUT_DIR', tmp), \
+                patch('feed_fetcher.download_feed', return_value=FEED_XML.encode()) as fetch, \
+                patch('pipeline.classify_items', wraps=pipeline.classify_items) as classify, \
+                redirect_stdout(io.StringIO()):
+            paths = asyncio.run(run_whats_new_reports(
+                [(date(2025, 11, 9), date(2025, 11, 15)), (date(2025, 11, 23), date(2025, 11, 29)),
+                 (date(2025, 11, 1), date(2025, 11, 30))],
+                translator_name='local', formats=['json']
+            ))
+            totals = {}
+            for path in paths:
+                with open(path, encoding='utf-8') as f:
+                    totals[os.path.basename(path)] = json.load(f)['total']
+        fetch.assert_called_once()
+        classify.assert_called_once()
+        self.assertEqual(fetch.call_args.args[0], pipeline.WHATS_NEW_FEED_URL)
+        self.assertEqual(totals, {
+            'awsupdates_2025-11-09_2025-11-15.json': 1,
+            'awsupdates_2025-11-23_2025-11-29.json': 2,
+            'awsupdates_2025-11-01_2025-11-30.json': 3,
+        })
+
+@patch.dict(os.environ, {'AWS_UPDATES_MAPPING_CACHE': '0'})
+class TestRenderers(unittest.TestCase):
+    """出力形式ごとのレンダラーのテスト"""
+
+    def test_html_escapes_text(self):
+        """タイトルや概要の HTML 特殊文字はエスケープされる"""
+        info = ReportInfo(date(2025, 11, 23), date(2025, 11, 29), 'intro', ['その他'], {}, 1)
+        item = {'category': 'その他', 'service': None, 'title': 't', 'title_ja': '<script>x</script>',
+                'link': 'https://example.com/?a=1&b=2', 'date': '2025-11-24', 'important': False,
+                'summary': 's', 'summary_ja': 'a & b'}
+        page = ''.join(render_html_report('report.html', info, [item]))
+        self.assertIn('&lt;script&gt;x&lt;/script&gt;', page)
+        self.assertIn('https://example.com/?a=1&amp;b=2', page)
+        self.assertIn('a &amp; b', page)
+        self.assertNotIn('<script>', page)
+
+    def test_json_document_without_items(self):
+        """項目が0件でも正しい JSON になる"""
+        self.assertEqual(json.loads(''.join(render_json_document({'total': 0}, []))),
+                         {'total': 0, 'items': []})
+        self.assertEqual(json.loads(''.join(render_json_document({}, [{'a': 1}]))),
+                         {'items': [{'a': 1}]})
+
+    def test_unknown_format_is_rejected(self):
+        """未知の出力形式はエラーになる"""
+        with self.assertRaises(argparse.ArgumentTypeError):
+            parse_formats('md,pdf')
+        self.assertEqual(parse_formats('json, md,json'), ['json', 'md'])
+
+if __name__ == '__main__':
+    unittest.main()
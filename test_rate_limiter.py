@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+import unittest
+import asyncio
+import os
+import sys
+import time
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.dirname(__file__))
+from rate_limiter import AdaptiveRateLimiter, backoff_delay, is_throttle_error
+from translation import TranslationStats, safe_translate_async
+
+class TestThrottleDetection(unittest.TestCase):
+    """スロットリング判定とバックオフのテスト"""
+
+    def test_is_throttle_error(self):
+        """429 やスロットリング系の例外を判定できる"""
+        self.assertTrue(is_throttle_error(RuntimeError("HTTP 429 Too Many Requests")))
+        self.assertTrue(is_throttle_error(Exception("ThrottlingException: Rate exceeded")))
+        self.assertFalse(is_throttle_error(ValueError("invalid json")))
+
+    def test_backoff_delay_grows_exponentially_with_cap(self):
+        """待ち時間の上限は試行ごとに倍になり、cap で頭打ちになる"""
+        with patch('rate_limiter.random.uniform', side_effect=lambda low, high: high):
+            self.assertEqual(backoff_delay(0), 1.0)
+            self.assertEqual(backoff_delay(3), 8.0)
+            self.assertEqual(backoff_delay(10, cap=30.0), 30.0)
+
+class TestAdaptiveRateLimiter(unittest.TestCase):
+    """トークンバケットと AIMD のテスト"""
+
+    def test_acquire_paces_requests(self):
+        """バーストを使い切った後は送信レートに合わせて待たされる"""
+        limiter = AdaptiveRateLimiter(rate=50, burst=1)
+
+        async def run():
+            start = time.monotonic()
+            for _ in range(4):
+                await limiter.acquire()
+            return time.monotonic() - start
+
+        elapsed = asyncio.run(run())
+        self.assertGreaterEqual(elapsed, 0.05)
+
+    def test_aimd_adjusts_rate(self):
+        """スロットリングで半減し、成功で少しずつ戻り、上下限を超えない"""
+        limiter = AdaptiveRateLimiter(rate=4, min_rate=1, max_rate=5)
+        limiter.on_error(throttled=True)
+        self.assertEqual(limiter.rate, 2)
+        limiter.on_success()
+        self.assertGreater(limiter.rate, 2)
+        for _ in range(10):
+            limiter.on_error(throttled=True)
+        self.assertEqual(limiter.rate, 1)
+        for _ in range(1000):
+            limiter.on_success()
+        self.assertEqual(limiter.rate, 5)
+
+    def test_stops_after_consecutive_failures(self):
+        """エラーが max_failures 回続くと止まり、途中で成功すれば数え直す"""
+        limiter = AdaptiveRateLimiter(max_failures=3)
+        limiter.on_error()
+        limiter.on_error()
+        limiter.on_success()
+        limiter.on_error()
+        limiter.on_error()
+        self.assertFalse(limiter.stopped())
+        limiter.on_error(throttled=True)
+        self.assertTrue(limiter.stopped())
+        self.assertFalse(AdaptiveRateLimiter(max_failures=0).stopped())
+
+class TestTranslationStats(unittest.TestCase):
+    """翻訳統計のテスト"""
+
+    def test_counts_retries_throttles_and_fallbacks(self):
+        """リトライ・スロットリング・原文フォールバックが数えられる"""
+        translator = MagicMock()
+
+        async def translate(text, dest='ja'):
+            raise RuntimeError("429 Too Many Requests")
+
+        translator.translate = translate
+        stats = TranslationStats()
+        limiter = AdaptiveRateLimiter(rate=1000)
+        with patch('rate_limiter.random.uniform', return_value=0):
+            result = asyncio.run(safe_translate_async(
+                translator, "Hello", max_retries=3, limiter=limiter, stats=stats
+            ))
+        self.assertEqual(result, "Hello")
+        self.assertEqual(stats.requests, 3)
+        self.assertEqual(stats.retries, 2)
+        self.assertEqual(stats.throttles, 3)
+        self.assertEqual(stats.fallbacks, 1)
+        self.assertLess(limiter.rate, 1000)
+        self.assertIn('原文のまま 1 件', stats.summary())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+from service_matcher import ServiceMatcher, build_service_pattern
+
+MAPPINGS = {
+    'EC2': 'コンピュート系',
+    'EC2 Image Builder': '運用管理',
+    'ECS': 'コンテナ系',
+    'CloudWatch': '運用管理',
+    'VPC': 'ネットワーク系',
+    'Amazon Q Developer': 'AI/ML',
+}
+
+class TestServiceMatcher(unittest.TestCase):
+    """サービス名マッチャーの仕様"""
+
+    def setUp(self):
+        self.matcher = ServiceMatcher(MAPPINGS)
+
+    def test_同じ位置では長いサービス名が優先される(self):
+        """EC2 より EC2 Image Builder が優先される"""
+        self.assertEqual(self.matcher.match("Amazon EC2 Image Builder adds new recipes"),
+                         ('運用管理', 'EC2 Image Builder'))
+
+    def test_タイトル中で最初に現れるサービス名が選ばれる(self):
+        """マッピングの順序ではなく、タイトル中の出現位置で判定される"""
+        self.assertEqual(self.matcher.match("Amazon CloudWatch adds EC2 metrics"),
+                         ('運用管理', 'CloudWatch'))
+        self.assertEqual(self.matcher.match("Amazon ECS now supports EC2 capacity"),
+                         ('コンテナ系', 'ECS'))
+
+    def test_英数字の途中ではマッチしない(self):
+        """単語の一部（SPECS の ECS など）はサービス名として扱わない"""
+        self.assertEqual(self.matcher.match("New SPECS published"), ('その他', None))
+        self.assertEqual(self.matcher.match("EC2X preview"), ('その他', None))
+
+    def test_長い候補が境界で失敗したら短い候補にフォールバックする(self):
+        """EC2 Image Builderx のような場合は EC2 にマッチする"""
+        self.assertEqual(self.matcher.find("EC2 Image Builderx"), 'EC2')
+
+    def test_複数形や所有格でもマッチする(self):
+        """VPCs や EC2's のような表記でもマッチする"""
+        self.assertEqual(self.matcher.find("Share VPCs across accounts"), 'VPC')
+        self.assertEqual(self.matcher.find("EC2's new feature"), 'EC2')
+
+    def test_空白や記号を含むサービス名(self):
+        """空白を含むサービス名や記号で区切られたサービス名にマッチする"""
+        self.assertEqual(self.matcher.find("Amazon Q Developer: new agent"), 'Amazon Q Developer')
+        self.assertEqual(self.matcher.find("(ECS) update"), 'ECS')
+
+    def test_空のマッピングでは常にその他になる(self):
+        """マッピングが空でもエラーにならない"""
+        self.assertEqual(ServiceMatcher({}).match("Amazon EC2"), ('その他', None))
+
+    def test_作成済みの正規表現を渡せる(self):
+        """build_service_pattern の結果を渡すと同じ判定になる"""
+        matcher = ServiceMatcher(MAPPINGS, pattern=build_service_pattern(MAPPINGS))
+        self.assertEqual(matcher.pattern, self.matcher.pattern)
+        self.assertEqual(matcher.match("Amazon EC2 Image Builder adds new recipes"),
+                         ('運用管理', 'EC2 Image Builder'))
+        self.assertIsNone(build_service_pattern({}))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+import unittest
+import os
+import subprocess
+import sys
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(__file__))
+import aws_updates_summary_improved
+import pipeline
+
+# エントリポイントの import にかけてよい時間（ミリ秒、-X importtime の累積値）
+IMPORT_BUDGET_MS = int(os.environ.get('AWS_UPDATES_IMPORT_BUDGET_MS', '400'))
+
+ENTRY_POINTS = ['aws_updates_summary_improved', 'get_custom_range', 'backfill', 'aws_updates_summary',
+                'aws_blog_summary']
+
+# 起動時には読み込まず、実際に使うステージで読み込むモジュール
+LAZY_MODULES = ['feedparser', 'yaml', 'googletrans', 'boto3', 'httpx', 'urllib.request']
+
+def import_profile(module):
+    """別プロセスで module を import し、{モジュール名: 累積時間(マイクロ秒)} を返す"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, check=True
+    )
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        profile[name.strip()] = int(cumulative)
+    return profile
+
+class TestStartup(unittest.TestCase):
+    """エントリポイントの起動時間のテスト"""
+
+    def test_heavy_dependencies_are_imported_lazily(self):
+        """フィードのパースや翻訳の依存モジュールは import 時に読み込まれない"""
+        for module in ENTRY_POINTS:
+            with self.subTest(module=module):
+                profile = import_profile(module)
+                self.assertIn(module, profile)
+                self.assertEqual([name for name in LAZY_MODULES if name in profile], [])
+
+    def test_import_time_is_within_budget(self):
+        """エントリポイントの import が予算内に収まる（2回計測して速い方で判定する）"""
+        for module in ENTRY_POINTS:
+            with self.subTest(module=module):
+                elapsed_ms = min(import_profile(module)[module] for _ in range(2)) / 1000
+                self.assertLess(elapsed_ms, IMPORT_BUDGET_MS,
+                                f"{module} の import に {elapsed_ms:.0f} ms かかりました")
+
+@patch.dict(os.environ, {'AWS_UPDATES_MAPPING_CACHE': '0'})
+class TestLazyMappings(unittest.TestCase):
+    """サービスマッピングの遅延読み込みのテスト"""
+
+    def test_mappings_are_loaded_once(self):
+        """マッピングとマッチャーは初回に一度だけ作られ、以後は同じものが使われる"""
+        self.assertEqual(pipeline.get_category('Amazon EC2 adds GA feature'), ('コンピュート系', 'EC2'))
+        self.assertIs(pipeline.get_service_matcher(), pipeline.get_service_matcher())
+        self.assertIs(pipeline.CATEGORY_MAPPINGS, pipeline.load_service_mappings()[0])
+
+    def test_compat_attributes_are_available(self):
+        """従来のモジュール変数もそのまま参照できる"""
+        self.assertIs(aws_updates_summary_improved.CATEGORY_MAPPINGS, pipeline.CATEGORY_MAPPINGS)
+        self.assertIs(aws_updates_summary_improved.SERVICE_DESCRIPTIONS, pipeline.SERVICE_DESCRIPTIONS)
+        self.assertIn('EC2', pipeline.CATEGORY_MAPPINGS)
+        with self.assertRaises(AttributeError):
+            pipeline.NO_SUCH_ATTRIBUTE
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+import unittest
+import asyncio
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.dirname(__file__))
+from rate_limiter import AdaptiveRateLimiter
+from translation import (
+    TranslationStats, pack_batches, join_batch, split_batch, translate_batch_async, translate_all_async,
+    TRANSLATE_MAX_RETRIES, truncate_sentences
+)
+
+def _result(text):
+    result = MagicMock()
+    result.text = text
+    return result
+
+class MarkerPreservingTranslator:
+    """マーカーを保ったまま各セグメントを翻訳する偽の翻訳器"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def translate(self, text, dest='ja'):
+        self.calls.append(text)
+        lines = []
+        for line in text.split('\n'):
+            marker, _, body = line.partition('] ')
+            lines.append(f"{marker}] 訳:{body}" if body else f"訳:{line}")
+        return _result('\n'.join(lines))
+
+class TestBatchProtocol(unittest.TestCase):
+    """バッチ翻訳のマーカー連結・分割のテスト"""
+
+    def test_pack_batches_respects_budget(self):
+        """文字数予算ごとにバッチが分けられ、順序は保たれる"""
+        texts = ['a' * 10, 'b' * 10, 'c' * 10, 'd' * 100]
+        batches = pack_batches(texts, max_chars=40)
+        self.assertEqual(batches, [['a' * 10, 'b' * 10], ['c' * 10], ['d' * 100]])
+
+    def test_join_and_split_round_trip(self):
+        """連結したテキストは元のセグメントに分割できる"""
+        texts = ['Hello', 'Multi\nline', 'World']
+        self.assertEqual(split_batch(join_batch(texts), 3), texts)
+
+    def test_split_tolerates_spaces_in_markers(self):
+        """翻訳でマーカー内に空白が入っても分割できる"""
+        self.assertEqual(split_batch('[[ 0 ]] こんにちは\n[[1]]世界', 2), ['こんにちは', '世界'])
+
+    def test_split_rejects_malformed_batches(self):
+        """マーカーの欠落・順序違い・前置きテキストは不正として扱う"""
+        self.assertIsNone(split_batch('[[0]] a', 2))
+        self.assertIsNone(split_batch('[[1]] a\n[[0]] b', 2))
+        self.assertIsNone(split_batch('前置き [[0]] a\n[[1]] b', 2))
+        self.assertIsNone(split_batch('[[0]]\n[[1]] b', 2))
+
+class TestBatchTranslation(unittest.TestCase):
+    """バッチ翻訳のテスト"""
+
+    def test_batch_is_sent_as_single_request(self):
+        """複数テキストが1リクエストで翻訳される"""
+        translator = MarkerPreservingTranslator()
+        result = asyncio.run(translate_batch_async(translator, ['Hello', 'World']))
+        self.assertEqual(result, ['訳:Hello', '訳:World'])
+        self.assertEqual(len(translator.calls), 1)
+
+    def test_successful_requests_record_latency(self):
+        """成功したリクエストごとに所要時間が記録される"""
+        stats = TranslationStats()
+        asyncio.run(translate_batch_async(MarkerPreservingTranslator(), ['Hello', 'World'], stats=stats))
+        self.assertEqual(stats.requests, 1)
+        self.assertEqual(len(stats.latencies), 1)
+        self.assertGreaterEqual(stats.latencies[0], 0)
+
+    def test_malformed_batch_falls_back_to_per_item(self):
+        """分割できない結果が返った場合は個別翻訳にフォールバックする"""
+        translator = MagicMock()
+        calls = []
+
+        async def translate(text, dest='ja'):
+            calls.append(text)
+            return _result('壊れた結果' if '[[' in text else f"訳:{text}")
+
+        translator.translate = translate
+        result = asyncio.run(translate_batch_async(translator, ['Hello', 'World']))
+        self.assertEqual(result, ['訳:Hello', '訳:World'])
+        self.assertEqual(calls[1:], ['Hello', 'World'])
+
+    def test_failed_items_keep_original_text(self):
+        """翻訳に失敗したテキストは元のまま返される"""
+        translator = MagicMock()
+
+        async def translate(text, dest='ja'):
+            raise RuntimeError("429 Too Many Requests")
+
+        translator.translate = translate
+        with patch('rate_limiter.random.uniform', return_value=0):
+            result = asyncio.run(translate_batch_async(translator, ['Hello', 'World']))
+        self.assertEqual(result, ['Hello', 'World'])
+
+    def test_failed_batch_is_not_retried_per_item(self):
+        """リトライしても失敗したバッチは個別翻訳せず、原文のまま返す"""
+        calls = []
+
+        async def translate(text, dest='ja'):
+            calls.append(text)
+            raise RuntimeError("503 Service Unavailable")
+
+        translator = MagicMock()
+        translator.translate = translate
+        stats = TranslationStats()
+        with patch('rate_limiter.random.uniform', return_value=0):
+            result = asyncio.run(translate_batch_async(translator, ['Hello', 'World'], stats=stats))
+        self.assertEqual(result, ['Hello', 'World'])
+        self.assertEqual(len(calls), TRANSLATE_MAX_RETRIES)
+        self.assertEqual(stats.batch_fallbacks, 0)
+        self.assertEqual(stats.fallbacks, 2)
+
+    def test_consecutive_failures_stop_requests(self):
+        """エラーが max_failures 回続いたら、残りのテキストはリクエストを送らずに原文を使う"""
+        calls = []
+
+        async def translate(text, dest='ja'):
+            calls.append(text)
+            raise RuntimeError("503 Service Unavailable")
+
+        translator = MagicMock()
+        translator.translate = translate
+        limiter = AdaptiveRateLimiter(rate=1000, max_failures=3)
+        texts = [f"Update {i}" for i in range(10)]
+        with patch('rate_limiter.random.uniform', return_value=0):
+            result = asyncio.run(translate_all_async(translator, texts, concurrency=1, batch_chars=0,
+                                                     limiter=limiter))
+        self.assertEqual(result, {text: text for text in texts})
+        self.assertEqual(len(calls), 3)
+
+    def test_translate_all_async_reduces_round_trips(self):
+        """バッチ有効時はリクエスト数がテキスト数より大幅に少ない"""
+        translator = MarkerPreservingTranslator()
+        texts = [f"Update {i}" for i in range(50)]
+        result = asyncio.run(translate_all_async(translator, texts, batch_chars=4500))
+        self.assertEqual(result['Update 7'], '訳:Update 7')
+        self.assertEqual(len(translator.calls), 1)
+
+class TestTruncateSentences(unittest.TestCase):
+    """翻訳前の切り詰めのテスト"""
+
+    def test_cut_at_end_of_sentence_after_limit(self):
+        """limit 文字目を含む文の終わりで切る"""
+        text = 'First sentence here. Second one (v2.0) ends "quoted." Third sentence follows.'
+        self.assertEqual(truncate_sentences(text, 40), 'First sentence here. Second one (v2.0) ends "quoted."')
+        self.assertEqual(truncate_sentences(text, 20), 'First sentence here.')
+
+    def test_long_sentence_is_cut_at_a_space(self):
+        """文が長すぎる場合は limit 文字目以降の最初の空白で切り、空白がなければ limit 文字で切る"""
+        self.assertEqual(truncate_sentences('word ' * 40, 12), 'word word word')
+        self.assertEqual(truncate_sentences('a' * 100, 10), 'a' * 10)
+
+    def test_short_text_or_zero_limit_is_unchanged(self):
+        """limit 以下のテキストと limit=0 はそのまま"""
+        self.assertEqual(truncate_sentences('Short. Text.', 100), 'Short. Text.')
+        self.assertEqual(truncate_sentences('x' * 1000, 0), 'x' * 1000)
+
+if __name__ == '__main__':
+    unittest.main()
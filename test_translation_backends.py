@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+import unittest
+import asyncio
+import json
+import os
+import sys
+import tempfile
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.dirname(__file__))
+from translation import translate_all_async
+from translation_backends import (
+    AmazonTranslateBackend, GoogleTransBackend, LocalBackend, TranslationResult,
+    create_backend, load_dictionary
+)
+
+class TestLocalBackend(unittest.TestCase):
+    """ローカル翻訳バックエンドのテスト"""
+
+    def test_translate_uses_dictionary_or_echoes(self):
+        """辞書にある原文は訳語に、ない原文はそのまま返される"""
+        backend = LocalBackend(dictionary={'Hello': 'こんにちは'})
+        self.assertEqual(asyncio.run(backend.translate('Hello')).text, 'こんにちは')
+        self.assertEqual(asyncio.run(backend.translate('World')).text, 'World')
+
+    def test_translate_batch_is_one_request(self):
+        """バッチ翻訳は1リクエストとして数えられる"""
+        backend = LocalBackend(dictionary={'Hello': 'こんにちは'})
+        result = asyncio.run(backend.translate_batch(['Hello', 'World']))
+        self.assertEqual(result, ['こんにちは', 'World'])
+        self.assertEqual(backend.requests, 1)
+
+    def test_latency_from_environment(self):
+        """待ち時間の既定値は環境変数から読み込まれる"""
+        with patch.dict(os.environ, {'AWS_UPDATES_LOCAL_LATENCY': '0.25'}):
+            self.assertEqual(LocalBackend(dictionary={}).latency, 0.25)
+            self.assertEqual(LocalBackend(dictionary={}, latency=0).latency, 0)
+
+    def test_translate_all_async_uses_backend_batch(self):
+        """並列翻訳はバックエンドのバッチAPIを使う"""
+        backend = LocalBackend(dictionary={})
+        texts = [f"Update {i}" for i in range(20)]
+        result = asyncio.run(translate_all_async(backend, texts))
+        self.assertEqual(result['Update 3'], 'Update 3')
+        self.assertEqual(backend.requests, 1)
+
+    def test_load_dictionary(self):
+        """JSON 辞書ファイルを読み込める"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'dict.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({'Hello': 'こんにちは'}, f)
+            self.assertEqual(load_dictionary(path), {'Hello': 'こんにちは'})
+        self.assertEqual(load_dictionary(None), {})
+
+class TestRemoteBackends(unittest.TestCase):
+    """外部サービスを使う翻訳バックエンドのテスト（クライアントはモック）"""
+
+    def test_amazon_translate_backend(self):
+        """Amazon Translate の TranslateText を呼び出す"""
+        client = MagicMock()
+        client.translate_text.return_value = {'TranslatedText': 'こんにちは'}
+        backend = AmazonTranslateBackend(client=client, source_language='en')
+        result = asyncio.run(backend.translate('Hello', dest='ja'))
+        self.assertEqual(result.text, 'こんにちは')
+        client.translate_text.assert_called_once_with(
+            Text='Hello', SourceLanguageCode='en', TargetLanguageCode='ja'
+        )
+
+    def test_amazon_translate_backend_batches_with_markers(self):
+        """Amazon Translate のバッチはマーカー連結の1リクエストになる"""
+        client = MagicMock()
+        client.translate_text.side_effect = lambda Text, **kwargs: {
+            'TranslatedText': Text.replace('Hello', 'こんにちは').replace('World', '世界')
+        }
+        backend = AmazonTranslateBackend(client=client)
+        result = asyncio.run(backend.translate_batch(['Hello', 'World']))
+        self.assertEqual(result, ['こんにちは', '世界'])
+        self.assertEqual(client.translate_text.call_count, 1)
+
+    def test_googletrans_backend_wraps_translator(self):
+        """googletrans の Translator をそのまま呼び出す"""
+        translator = MagicMock()
+
+        async def translate(text, dest='ja'):
+            return TranslationResult(f"訳:{text}")
+
+        translator.translate = translate
+        backend = GoogleTransBackend(translator=translator)
+        self.assertEqual(asyncio.run(backend.translate('Hello')).text, '訳:Hello')
+
+class TestCreateBackend(unittest.TestCase):
+    """バックエンド選択のテスト"""
+
+    def test_create_backend_by_name(self):
+        """名前でバックエンドを選択できる"""
+        self.assertIsInstance(create_backend('local'), LocalBackend)
+
+    def test_create_backend_from_environment(self):
+        """環境変数でバックエンドを選択できる"""
+        with patch.dict(os.environ, {'AWS_UPDATES_TRANSLATOR': 'local'}):
+            self.assertIsInstance(create_backend(), LocalBackend)
+
+    def test_unknown_backend_raises(self):
+        """未知のバックエンド名は ValueError になる"""
+        with self.assertRaises(ValueError):
+            create_backend('unknown')
+
+if __name__ == '__main__':
+    unittest.main()
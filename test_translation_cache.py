@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+import unittest
+import asyncio
+import os
+import sys
+import tempfile
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.dirname(__file__))
+from translation_cache import TranslationCache, make_key, open_translation_cache
+from aws_updates_summary_improved import safe_translate_async
+
+class TestTranslationCache(unittest.TestCase):
+    """翻訳キャッシュのテスト"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'translations.sqlite3')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_set_and_get(self):
+        """保存した訳文が取得でき、ヒット/ミスが数えられる"""
+        cache = TranslationCache(self.path)
+        self.assertIsNone(cache.get("Hello", 'ja'))
+        cache.set("Hello", 'ja', "こんにちは")
+        self.assertEqual(cache.get("Hello", 'ja'), "こんにちは")
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertIn('ヒット 1 件', cache.summary())
+        cache.close()
+
+    def test_persists_across_instances(self):
+        """別インスタンス（次回実行）でも訳文が再利用される"""
+        cache = TranslationCache(self.path)
+        cache.set("Hello", 'ja', "こんにちは")
+        cache.close()
+        cache = TranslationCache(self.path)
+        self.assertEqual(cache.get("Hello", 'ja'), "こんにちは")
+        cache.close()
+
+    def test_key_includes_dest_and_backend(self):
+        """翻訳先言語とバックエンドが異なればキャッシュは共有されない"""
+        self.assertNotEqual(make_key("Hello", 'ja', 'googletrans'), make_key("Hello", 'en', 'googletrans'))
+        cache = TranslationCache(self.path, backend='googletrans')
+        cache.set("Hello", 'ja', "こんにちは")
+        cache.close()
+        other = TranslationCache(self.path, backend='aws')
+        self.assertIsNone(other.get("Hello", 'ja'))
+        other.close()
+
+    def test_expired_entries_are_misses(self):
+        """有効期限切れのエントリはミス扱いになる"""
+        cache = TranslationCache(self.path, ttl=10)
+        with patch('translation_cache.time.time', return_value=1000.0):
+            cache.set("Hello", 'ja', "こんにちは")
+        with patch('translation_cache.time.time', return_value=1011.0):
+            self.assertIsNone(cache.get("Hello", 'ja'))
+        cache.close()
+
+    def test_evict_removes_least_recently_used(self):
+        """サイズ上限を超えると最終参照が古いものから削除される"""
+        cache = TranslationCache(self.path, ttl=0, max_bytes=20)
+        with patch('translation_cache.time.time', return_value=1.0):
+            cache.set("aaaa", 'ja', "AAAA")
+        with patch('translation_cache.time.time', return_value=2.0):
+            cache.set("bbbb", 'ja', "BBBB")
+        with patch('translation_cache.time.time', return_value=3.0):
+            cache.set("cccc", 'ja', "CCCC")
+        self.assertEqual(cache.evict(), 1)
+        self.assertLessEqual(cache.total_bytes(), 20)
+        self.assertIsNone(cache.get("aaaa", 'ja'))
+        self.assertEqual(cache.get("cccc", 'ja'), "CCCC")
+        cache.close()
+
+    def test_open_translation_cache_can_be_disabled(self):
+        """環境変数でキャッシュを無効化できる"""
+        with patch.dict(os.environ, {'AWS_UPDATES_TRANSLATION_CACHE': '0'}):
+            self.assertIsNone(open_translation_cache(cache_dir=self.tmpdir.name))
+        cache = open_translation_cache(cache_dir=self.tmpdir.name)
+        self.assertIsNotNone(cache)
+        cache.close()
+
+    def test_safe_translate_async_uses_cache(self):
+        """キャッシュにある訳文は翻訳APIを呼ばずに返される"""
+        cache = TranslationCache(self.path)
+        translator = MagicMock()
+        calls = []
+
+        async def translate(text, dest='ja'):
+            calls.append(text)
+            result = MagicMock()
+            result.text = "こんにちは"
+            return result
+
+        translator.translate = translate
+        first = asyncio.run(safe_translate_async(translator, "Hello", cache=cache))
+        second = asyncio.run(safe_translate_async(translator, "Hello", cache=cache))
+        self.assertEqual((first, second), ("こんにちは", "こんにちは"))
+        self.assertEqual(calls, ["Hello"])
+        cache.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+import unittest
+import json
+import os
+import sys
+import tempfile
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(__file__))
+from update_service_mappings import list_reports, scan_reports
+
+def write_report(directory, name, services, mtime_ns=None):
+    path = os.path.join(directory, name)
+    items = [{'service': svc, 'title': f'{svc} update'} for svc in services]
+    with open(path, 'w', encoding='utf-8') as f:
+        if name.endswith('.jsonl'):
+            f.writelines(json.dumps(item) + '\n' for item in items)
+        else:
+            json.dump({'items': items}, f)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+    return path
+
+class TestScanReports(unittest.TestCase):
+    """出力ファイルの差分スキャンのテスト"""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_only_new_or_changed_reports_are_scanned(self):
+        """2回目以降は新しいファイルと変更されたファイルだけを読む"""
+        write_report(self.dir, 'awsupdates_a.json', ['EC2'])
+        write_report(self.dir, 'awsupdates_b.json', ['S3', None])
+        services, manifest, scanned, skipped = scan_reports(self.dir, {})
+        self.assertEqual((services, scanned, skipped), ({'EC2', 'S3'}, 2, 0))
+
+        write_report(self.dir, 'awsupdates_c.json', ['Lambda'])
+        with patch('update_service_mappings.iter_report_items',
+                   side_effect=lambda path: iter([{'service': 'Lambda'}])) as read:
+            services, manifest, scanned, skipped = scan_reports(self.dir, manifest)
+        self.assertEqual([os.path.basename(call.args[0]) for call in read.call_args_list],
+                         ['awsupdates_c.json'])
+        self.assertEqual((services, scanned, skipped), ({'EC2', 'S3', 'Lambda'}, 1, 2))
+
+        write_report(self.dir, 'awsupdates_a.json', ['ECS'], mtime_ns=1)
+        services, manifest, scanned, skipped = scan_reports(self.dir, manifest)
+        self.assertEqual((services, scanned, skipped), ({'ECS', 'S3', 'Lambda'}, 1, 2))
+
+    def test_removed_reports_are_dropped(self):
+        """削除されたファイルはマニフェストから消える"""
+        path = write_report(self.dir, 'awsupdates_a.json', ['EC2'])
+        manifest = scan_reports(self.dir, {})[1]
+        os.remove(path)
+        services, manifest, scanned, skipped = scan_reports(self.dir, manifest)
+        self.assertEqual((services, manifest, scanned, skipped), (set(), {}, 0, 0))
+
+    def test_jsonl_is_preferred_over_json_of_the_same_run(self):
+        """同じ実行の JSON と JSONL がある場合は JSONL だけを読む"""
+        write_report(self.dir, 'awsupdates_a.json', ['EC2'])
+        write_report(self.dir, 'awsupdates_a.jsonl', ['EC2'])
+        write_report(self.dir, 'awsupdates_b.json', ['S3'])
+        self.assertEqual([os.path.basename(path) for path in list_reports(self.dir)],
+                         ['awsupdates_a.jsonl', 'awsupdates_b.json'])
+
+    def test_unreadable_report_is_retried_later(self):
+        """壊れたファイルはマニフェストに記録せず、次回また読む"""
+        with open(os.path.join(self.dir, 'broken.json'), 'w', encoding='utf-8') as f:
+            f.write('{')
+        with patch('builtins.print'):
+            services, manifest, scanned, skipped = scan_reports(self.dir, {})
+        self.assertEqual((services, manifest, scanned, skipped), (set(), {}, 0, 0))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+翻訳処理の共通部品
+
+リトライ付きの単発翻訳、同時実行数を制限した並列翻訳、
+複数テキストを1リクエストにまとめるバッチ翻訳を提供する。
+"""
+import asyncio
+import os
+import re
+import time
+
+from rate_limiter import backoff_delay, is_throttle_error
+
+# 翻訳の同時実行数と1リクエストあたりのタイムアウト（秒）
+TRANSLATE_CONCURRENCY = int(os.environ.get('AWS_UPDATES_TRANSLATE_CONCURRENCY', '8'))
+TRANSLATE_TIMEOUT = float(os.environ.get('AWS_UPDATES_TRANSLATE_TIMEOUT', '30'))
+# 1テキストあたりの最大試行回数
+TRANSLATE_MAX_RETRIES = int(os.environ.get('AWS_UPDATES_TRANSLATE_MAX_RETRIES', '4'))
+# 1リクエストにまとめる最大文字数（0 でバッチ翻訳を無効化）
+TRANSLATE_BATCH_CHARS = int(os.environ.get('AWS_UPDATES_TRANSLATE_BATCH_CHARS', '4500'))
+
+# 翻訳前に概要を切り詰める長さ（原文の文字数、0 で切り詰めない）
+# レポートに表示するのは訳文の先頭 200 文字なので、日本語にして文字数が半分以下になっても足りる長さにする
+TRANSLATE_SUMMARY_CHARS = int(os.environ.get('AWS_UPDATES_TRANSLATE_SUMMARY_CHARS', '600'))
+
+# 文末（句読点と閉じ括弧・引用符の後に空白か末尾が続く位置）
+_SENTENCE_END_RE = re.compile(r'[.!?。！？]["\'”’)）\]]*(?=\s|$)')
+
+# バッチ内の各セグメントの先頭に付ける番号マーカー（例: [[0]]）
+_BATCH_MARKER_RE = re.compile(r'\[\[\s*(\d+)\s*\]\]')
+
+class TranslationStats:
+    """1回の実行における翻訳リクエストの統計"""
+
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.throttles = 0
+        self.errors = 0
+        self.batch_fallbacks = 0
+        self.fallbacks = 0
+        # 成功したリクエストの所要時間（秒）
+        self.latencies = []
+
+    def summary(self):
+        """統計の要約文字列"""
+        return (f"翻訳リクエスト: {self.requests} 回 / リトライ {self.retries} 回 / "
+                f"スロットリング {self.throttles} 回 / エラー {self.errors} 回 / "
+                f"バッチ分割失敗 {self.batch_fallbacks} 回 / 原文のまま {self.fallbacks} 件")
+
+def truncate_sentences(text, limit=TRANSLATE_SUMMARY_CHARS):
+    """翻訳前に text を文の区切りで切り詰める（少なくとも limit 文字は残す）
+
+    limit 文字目を含む文の終わりまでを返す。その文が limit の 1.5 倍を超えて続く場合は
+    limit 文字目以降の最初の空白で切る。limit が 0 か、text が limit 文字以下ならそのまま返す。
+    """
+    if not limit or len(text) <= limit:
+        return text
+    longest = limit + limit // 2
+    match = _SENTENCE_END_RE.search(text, limit - 1)
+    if match and match.end() <= longest:
+        return text[:match.end()]
+    space = text.find(' ', limit, longest)
+    return text[:space if space >= 0 else limit]
+
+async def _call_with_retry(make_call, max_retries=TRANSLATE_MAX_RETRIES, timeout=None,
+                           limiter=None, stats=None):
+    """リトライ付きで翻訳リクエストを実行し、結果を返す（失敗時は None）
+
+    limiter がエラーの連続でリクエストを止めていれば、送らずに None を返す。
+    """
+    for attempt in range(max_retries):
+        if attempt > 0:
+            if stats is not None:
+                stats.retries += 1
+            await asyncio.sleep(backoff_delay(attempt - 1))
+        if limiter is not None:
+            if limiter.stopped():
+                return None
+            await limiter.acquire()
+        if stats is not None:
+            stats.requests += 1
+
+        started = time.perf_counter()
+        try:
+            if timeout:
+                result = await asyncio.wait_for(make_call(), timeout)
+            else:
+                result = await make_call()
+        except Exception as e:
+            throttled = is_throttle_error(e)
+            if stats is not None:
+                stats.errors += 1
+                stats.throttles += throttled
+            if limiter is not None:
+                limiter.on_error(throttled)
+            print(f"翻訳エラー (試行 {attempt + 1}/{max_retries}): {str(e)[:100]}")
+            if limiter is not None and limiter.failures == limiter.max_failures:
+                print(f"翻訳エラーが {limiter.failures} 回続いたため、以降は翻訳せずに原文を使います")
+            continue
+
+        if limiter is not None:
+            limiter.on_success()
+        if stats is not None:
+            stats.latencies.append(time.perf_counter() - started)
+        return result
+
+    return None
+
+async def _translate_with_retry(translator, text, dest='ja', max_retries=TRANSLATE_MAX_RETRIES,
+                                timeout=None, limiter=None, stats=None):
+    """リトライ付きで翻訳し、訳文を返す（失敗時は None）"""
+    result = await _call_with_retry(lambda: translator.translate(text, dest=dest),
+                                    max_retries, timeout, limiter, stats)
+    if result is None:
+        return None
+    if hasattr(result, 'text'):
+        return result.text
+    print(f"翻訳結果が不正: {type(result)}")
+    return None
+
+async def safe_translate_async(translator, text, dest='ja', max_retries=TRANSLATE_MAX_RETRIES,
+                               timeout=None, cache=None, limiter=None, stats=None):
+    """安全な翻訳処理（リトライ機能付き・キャッシュ対応・非同期版）"""
+    if not text or len(text.strip()) == 0:
+        return text
+
+    if cache is not None:
+        cached = cache.get(text, dest)
+        if cached is not None:
+            return cached
+
+    translated = await _translate_with_retry(translator, text, dest, max_retries, timeout, limiter, stats)
+    if translated is None:
+        print(f"翻訳失敗、元テキスト使用: {text[:30]}...")
+        if stats is not None:
+            stats.fallbacks += 1
+        return text
+    if cache is not None:
+        cache.set(text, dest, translated)
+    return translated
+
+def pack_batches(texts, max_chars=TRANSLATE_BATCH_CHARS):
+    """文字数予算に収まるようにテキストをバッチへ詰める（予算超えのテキストは単独バッチ）"""
+    batches = []
+    current = []
+    current_chars = 0
+    for text in texts:
+        size = len(text) + 8  # マーカーと改行の分
+        if current and current_chars + size > max_chars:
+            batches.append(current)
+            current = []
+            current_chars = 0
+        current.append(text)
+        current_chars += size
+    if current:
+        batches.append(current)
+    return batches
+
+def join_batch(texts):
+    """番号マーカー付きで1つのテキストに連結する"""
+    return '\n'.join(f'[[{i}]] {text}' for i, text in enumerate(texts))
+
+def split_batch(translated, count):
+    """join_batch の翻訳結果を分割する（マーカーが崩れていれば None）"""
+    parts = _BATCH_MARKER_RE.split(translated)
+    if parts[0].strip():
+        return None
+    indices = parts[1::2]
+    segments = parts[2::2]
+    if [int(i) for i in indices] != list(range(count)):
+        return None
+    segments = [segment.strip() for segment in segments]
+    if any(not segment for segment in segments):
+        return None
+    return segments
+
+async def translate_joined(translator, texts, dest='ja'):
+    """マーカー連結で1リクエストにして翻訳し、分割した訳文を返す（崩れていれば None）"""
+    result = await translator.translate(join_batch(texts), dest=dest)
+    if not hasattr(result, 'text'):
+        return None
+    return split_batch(result.text, len(texts))
+
+def _request_batch(translator, texts, dest):
+    """バックエンドのバッチAPIがあればそれを、なければマーカー連結を使う"""
+    if getattr(translator, 'supports_batch', False) is True:
+        return translator.translate_batch(texts, dest=dest)
+    return translate_joined(translator, texts, dest=dest)
+
+async def translate_batch_async(translator, texts, dest='ja', timeout=None, cache=None,
+                                limiter=None, stats=None):
+    """テキストのリストを1リクエストで翻訳し、崩れていれば個別翻訳にフォールバックする
+
+    リトライしてもリクエストが失敗した場合は、個別翻訳でさらにリクエストを重ねず原文をそのまま返す。
+    """
+    if len(texts) > 1:
+        async def _batch():
+            # 結果が崩れていた場合（None）を、リクエスト自体の失敗と区別できるように空のリストにする
+            segments = await _request_batch(translator, texts, dest)
+            return segments if segments is not None else []
+
+        segments = await _call_with_retry(_batch, timeout=timeout, limiter=limiter, stats=stats)
+        if segments is None:
+            print(f"バッチ翻訳に失敗したため原文を使用します ({len(texts)} 件)")
+            if stats is not None:
+                stats.fallbacks += len(texts)
+            return list(texts)
+        if len(segments) == len(texts):
+            if cache is not None:
+                for text, segment in zip(texts, segments):
+                    cache.set(text, dest, segment)
+            return segments
+        print(f"バッチ翻訳の結果が不正なため個別翻訳にフォールバックします ({len(texts)} 件)")
+        if stats is not None:
+            stats.batch_fallbacks += 1
+
+    results = []
+    for text in texts:
+        translated = await _translate_with_retry(translator, text, dest, timeout=timeout,
+                                                 limiter=limiter, stats=stats)
+        if translated is None:
+            print(f"翻訳失敗、元テキスト使用: {text[:30]}...")
+            if stats is not None:
+                stats.fallbacks += 1
+            results.append(text)
+            continue
+        if cache is not None:
+            cache.set(text, dest, translated)
+        results.append(translated)
+    return results
+
+async def translate_all_async(translator, texts, dest='ja', concurrency=TRANSLATE_CONCURRENCY,
+                              timeout=TRANSLATE_TIMEOUT, cache=None, batch_chars=TRANSLATE_BATCH_CHARS,
+                              limiter=None, stats=None, on_pending=None, semaphore=None):
+    """複数テキストを同時実行数を制限して並列翻訳し、原文→訳文の辞書を返す
+
+    on_pending を指定すると、キャッシュになく実際にバックエンドへ送るテキストのリストを渡して呼び出す。
+    semaphore（asyncio.Semaphore）を渡すと concurrency の代わりに使い、同時に走るほかの呼び出しと
+    同時実行数の上限を共有する。
+    """
+    unique_texts = list(dict.fromkeys(texts))
+    translations = {}
+    pending = []
+    for text in unique_texts:
+        if not text or len(text.strip()) == 0:
+            translations[text] = text
+            continue
+        cached = cache.get(text, dest) if cache is not None else None
+        if cached is not None:
+            translations[text] = cached
+        else:
+            pending.append(text)
+    if on_pending is not None:
+        on_pending(pending)
+
+    if batch_chars > 0:
+        batches = pack_batches(pending, batch_chars)
+    else:
+        batches = [[text] for text in pending]
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def _translate(batch):
+        async with semaphore:
+            return await translate_batch_async(translator, batch, dest, timeout=timeout, cache=cache,
+                                               limiter=limiter, stats=stats)
+
+    results = await asyncio.gather(*(_translate(batch) for batch in batches))
+    for batch, translated in zip(batches, results):
+        translations.update(zip(batch, translated))
+    return {text: translations[text] for text in unique_texts}
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+翻訳バックエンド
+
+どのバックエンドも次のインターフェースを持つ:
+- name: キャッシュキーなどに使うバックエンド名
+- async translate(text, dest) -> .text 属性を持つ結果
+- async translate_batch(texts, dest) -> 訳文のリスト（分割に失敗したら None）
+
+バックエンドは --translator オプションか環境変数 AWS_UPDATES_TRANSLATOR で選択する。
+"""
+import asyncio
+import json
+import os
+from collections import namedtuple
+
+from translation import TRANSLATE_CONCURRENCY, translate_joined
+
+DEFAULT_BACKEND = 'googletrans'
+
+TranslationResult = namedtuple('TranslationResult', ['text'])
+
+class TranslationBackend:
+    """翻訳バックエンドの基底クラス（バッチはマーカー連結で1リクエストにする）"""
+    name = 'base'
+    supports_batch = True
+
+    async def translate(self, text, dest='ja'):
+        raise NotImplementedError
+
+    async def translate_batch(self, texts, dest='ja'):
+        return await translate_joined(self, texts, dest=dest)
+
+class GoogleTransBackend(TranslationBackend):
+    """googletrans を使う翻訳バックエンド"""
+    name = 'googletrans'
+
+    def __init__(self, translator=None):
+        if translator is None:
+            from googletrans import Translator
+            translator = Translator()
+        self._translator = translator
+
+    async def translate(self, text, dest='ja'):
+        return await self._translator.translate(text, dest=dest)
+
+class AmazonTranslateBackend(TranslationBackend):
+    """Amazon Translate を使う翻訳バックエンド
+
+    boto3 クライアントは同期 API のため、スレッドで実行する。
+    並列翻訳の同時実行数に合わせてコネクションプールを確保し、
+    スロットリング時は botocore の adaptive リトライに任せる。
+    """
+    name = 'aws'
+
+    def __init__(self, client=None, source_language=None, region_name=None,
+                 max_pool_connections=TRANSLATE_CONCURRENCY):
+        if client is None:
+            import boto3
+            from botocore.config import Config
+            client = boto3.client(
+                'translate',
+                region_name=region_name or os.environ.get('AWS_UPDATES_TRANSLATE_REGION'),
+                config=Config(
+                    max_pool_connections=max(10, max_pool_connections),
+                    retries={'max_attempts': 5, 'mode': 'adaptive'},
+                ),
+            )
+        self._client = client
+        self.source_language = source_language or os.environ.get('AWS_UPDATES_TRANSLATE_SOURCE', 'en')
+
+    async def translate(self, text, dest='ja'):
+        response = await asyncio.to_thread(
+            self._client.translate_text,
+            Text=text,
+            SourceLanguageCode=self.source_language,
+            TargetLanguageCode=dest,
+        )
+        return TranslationResult(response['TranslatedText'])
+
+class LocalBackend(TranslationBackend):
+    """ネットワークを使わない決定的な翻訳バックエンド（テスト・ベンチマーク用）
+
+    辞書にある原文は訳語に置き換え、それ以外は原文をそのまま返す。
+    latency（既定は環境変数 AWS_UPDATES_LOCAL_LATENCY の秒数）を指定すると
+    1リクエストごとに待ち時間を入れる。
+    """
+    name = 'local'
+
+    def __init__(self, dictionary=None, latency=None):
+        if dictionary is None:
+            dictionary = load_dictionary(os.environ.get('AWS_UPDATES_TRANSLATION_DICT'))
+        if latency is None:
+            latency = float(os.environ.get('AWS_UPDATES_LOCAL_LATENCY', '0'))
+        self.dictionary = dictionary
+        self.latency = latency
+        self.requests = 0
+
+    async def _wait(self):
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def translate(self, text, dest='ja'):
+        await self._wait()
+        return TranslationResult(self.dictionary.get(text, text))
+
+    async def translate_batch(self, texts, dest='ja'):
+        await self._wait()
+        return [self.dictionary.get(text, text) for text in texts]
+
+def load_dictionary(path):
+    """原文→訳文の JSON 辞書を読み込む（パス未指定なら空の辞書）"""
+    if not path:
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+BACKENDS = {
+    'googletrans': GoogleTransBackend,
+    'aws': AmazonTranslateBackend,
+    'local': LocalBackend,
+}
+
+def create_backend(name=None):
+    """名前から翻訳バックエンドを生成する"""
+    name = name or os.environ.get('AWS_UPDATES_TRANSLATOR', DEFAULT_BACKEND)
+    if name not in BACKENDS:
+        raise ValueError(f"未知の翻訳バックエンド: {name} (選択肢: {', '.join(BACKENDS)})")
+    return BACKENDS[name]()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+翻訳結果の永続キャッシュ
+
+原文・翻訳先言語・翻訳バックエンドをキーに、翻訳結果を SQLite に保存する。
+aws_updates_summary_improved.py / aws_blog_summary.py / get_custom_range.py で共有する。
+"""
+import hashlib
+import os
+import sqlite3
+import time
+
+# キャッシュの保存先（環境変数で上書き可能）
+DEFAULT_CACHE_DIR = os.environ.get(
+    'AWS_UPDATES_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache')
+)
+# 有効期限（既定30日）と最大サイズ（既定50MB）
+DEFAULT_TTL = float(os.environ.get('AWS_UPDATES_CACHE_TTL', str(30 * 24 * 60 * 60)))
+DEFAULT_MAX_BYTES = int(os.environ.get('AWS_UPDATES_CACHE_MAX_BYTES', str(50 * 1024 * 1024)))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS translations (
+    key TEXT PRIMARY KEY,
+    backend TEXT NOT NULL,
+    dest TEXT NOT NULL,
+    source TEXT NOT NULL,
+    translated TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_translations_accessed_at ON translations (accessed_at);
+"""
+
+def make_key(text, dest, backend):
+    """原文・翻訳先言語・バックエンドからキャッシュキーを作る"""
+    raw = '\0'.join((backend, dest, text)).encode('utf-8')
+    return hashlib.sha256(raw).hexdigest()
+
+class TranslationCache:
+    """SQLite ベースの翻訳キャッシュ（TTL とサイズ上限付き）"""
+
+    def __init__(self, path, backend='googletrans', ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.backend = backend
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(_SCHEMA)
+        self.purge_expired()
+
+    def get(self, text, dest='ja'):
+        """キャッシュ済みの訳文を返す（なければ None）"""
+        key = make_key(text, dest, self.backend)
+        row = self._conn.execute(
+            'SELECT translated, created_at FROM translations WHERE key = ?', (key,)
+        ).fetchone()
+        now = time.time()
+        if row is None or (self.ttl and now - row[1] > self.ttl):
+            self.misses += 1
+            return None
+        self._conn.execute('UPDATE translations SET accessed_at = ? WHERE key = ?', (now, key))
+        self._conn.commit()
+        self.hits += 1
+        return row[0]
+
+    def set(self, text, dest, translated):
+        """訳文を保存する（途中で失敗しても保存済みの分は次回再利用される）"""
+        now = time.time()
+        size = len(text.encode('utf-8')) + len(translated.encode('utf-8'))
+        self._conn.execute(
+            'INSERT OR REPLACE INTO translations '
+            '(key, backend, dest, source, translated, size, created_at, accessed_at) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            (make_key(text, dest, self.backend), self.backend, dest, text, translated, size, now, now),
+        )
+        self._conn.commit()
+
+    def purge_expired(self):
+        """有効期限切れのエントリを削除する"""
+        if not self.ttl:
+            return
+        self._conn.execute('DELETE FROM translations WHERE created_at < ?', (time.time() - self.ttl,))
+        self._conn.commit()
+
+    def total_bytes(self):
+        return self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM translations').fetchone()[0]
+
+    def evict(self):
+        """サイズ上限を超えていれば、最終参照が古いものから削除する"""
+        excess = self.total_bytes() - self.max_bytes
+        if excess <= 0:
+            return 0
+        removed = 0
+        rows = self._conn.execute('SELECT key, size FROM translations ORDER BY accessed_at').fetchall()
+        keys = []
+        for key, size in rows:
+            if excess <= 0:
+                break
+            keys.append((key,))
+            excess -= size
+            removed += 1
+        self._conn.executemany('DELETE FROM translations WHERE key = ?', keys)
+        self._conn.commit()
+        return removed
+
+    def summary(self):
+        """ヒット/ミス件数の要約文字列"""
+        total = self.hits + self.misses
+        rate = (self.hits / total * 100) if total else 0.0
+        return f"翻訳キャッシュ: ヒット {self.hits} 件 / ミス {self.misses} 件 (ヒット率 {rate:.1f}%)"
+
+    def close(self):
+        self.evict()
+        self._conn.close()
+
+def open_translation_cache(backend='googletrans', cache_dir=None):
+    """既定の場所にあるキャッシュを開く（AWS_UPDATES_TRANSLATION_CACHE=0 で無効化）"""
+    if os.environ.get('AWS_UPDATES_TRANSLATION_CACHE', '1') == '0':
+        return None
+    cache_dir = cache_dir or DEFAULT_CACHE_DIR
+    try:
+        return TranslationCache(os.path.join(cache_dir, 'translations.sqlite3'), backend=backend)
+    except sqlite3.Error as e:
+        print(f"翻訳キャッシュを開けませんでした: {e}")
+        return None
@@ -1,46 +1,119 @@
 #!/usr/bin/env python3
 import json
 import glob
-import re
 import os
 
+from mapping_index import rebuild_index
+from translation_cache import DEFAULT_CACHE_DIR
+
 # Paths
-root = os.path.dirname(__file__)
+root = os.path.dirname(os.path.abspath(__file__))
 mapping_file = os.path.join(root, 'service_mappings.json')
+output_dir = os.path.join(root, 'output')
+# Files already scanned: {name: {'size', 'mtime_ns', 'services'}}
+manifest_file = os.path.join(DEFAULT_CACHE_DIR, 'service_scan_manifest.json')
+
+# Read service names from the structured JSON / JSONL outputs
+def iter_report_items(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith('.jsonl'):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from json.load(f).get('items', [])
+
+def list_reports(directory):
+    """One structured file per run (JSONL is preferred when both exist)"""
+    reports = {}
+    for path in sorted(glob.glob(os.path.join(directory, '*.json'))
+                       + glob.glob(os.path.join(directory, '*.jsonl'))):
+        stem = os.path.splitext(path)[0]
+        if path.endswith('.jsonl') or stem not in reports:
+            reports[stem] = path
+    return sorted(reports.values())
+
+def load_manifest(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_manifest(path, manifest):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def scan_reports(directory, manifest):
+    """Scan only new or changed reports.
+
+    Returns (services, new_manifest, scanned, skipped). Entries for reports
+    that no longer exist are dropped from the manifest.
+    """
+    new_manifest = {}
+    scanned = skipped = 0
+    for path in list_reports(directory):
+        name = os.path.basename(path)
+        stat = os.stat(path)
+        entry = manifest.get(name)
+        if entry and entry.get('size') == stat.st_size and entry.get('mtime_ns') == stat.st_mtime_ns:
+            new_manifest[name] = entry
+            skipped += 1
+            continue
+        services = set()
+        try:
+            for item in iter_report_items(path):
+                svc = (item.get('service') or '').strip()
+                if svc:
+                    services.add(svc)
+        except ValueError:
+            # Half-written or foreign file: try again next time
+            print(f'Skipped unreadable report: {name}')
+            continue
+        new_manifest[name] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                              'services': sorted(services)}
+        scanned += 1
+    services = set()
+    for entry in new_manifest.values():
+        services.update(entry['services'])
+    return services, new_manifest, scanned, skipped
+
+def main():
+    # Load existing mappings
+    with open(mapping_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    category_mappings = data.get('category_mappings', {})
+    service_descriptions = data.get('service_descriptions', {})
+
+    services_in_files, manifest, scanned, skipped = scan_reports(output_dir, load_manifest(manifest_file))
+    print(f'Scanned {scanned} report(s), skipped {skipped} unchanged report(s).')
+
+    # Identify missing mappings
+    missing = services_in_files - set(category_mappings.keys())
+    if missing:
+        # Add missing with defaults
+        for svc in sorted(missing):
+            category_mappings[svc] = 'その他'
+            service_descriptions[svc] = ''
+            print(f'Added mapping for: {svc}')
+
+        # Save updated JSON
+        data['category_mappings'] = category_mappings
+        data['service_descriptions'] = service_descriptions
+        with open(mapping_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+        # Rebuild the compiled mapping index so the next run does not re-parse the JSON
+        rebuild_index(mapping_file)
+        print('service_mappings.json updated.')
+    else:
+        print('No new services to add.')
+
+    # Record the scanned reports only after the mappings have been saved
+    save_manifest(manifest_file, manifest)
 
-# Load existing mappings
-with open(mapping_file, 'r', encoding='utf-8') as f:
-    data = json.load(f)
-category_mappings = data.get('category_mappings', {})
-service_descriptions = data.get('service_descriptions', {})
-
-# Scan markdown outputs for service names
-services_in_files = set()
-pattern = re.compile(r'^- サービス: (.+)')
-for md in glob.glob(os.path.join(root, 'output', '*.md')):
-    with open(md, 'r', encoding='utf-8') as f:
-        for line in f:
-            m = pattern.match(line)
-            if m:
-                svc = m.group(1).strip()
-                services_in_files.add(svc)
-
-# Identify missing mappings
-missing = services_in_files - set(category_mappings.keys())
-if not missing:
-    print('No new services to add.')
-    exit(0)
-
-# Add missing with defaults
-for svc in sorted(missing):
-    category_mappings[svc] = 'その他'
-    service_descriptions[svc] = ''
-    print(f'Added mapping for: {svc}')
-
-# Save updated JSON
-data['category_mappings'] = category_mappings
-data['service_descriptions'] = service_descriptions
-with open(mapping_file, 'w', encoding='utf-8') as f:
-    json.dump(data, f, ensure_ascii=False, indent=2)
-
-print('service_mappings.json updated.')
+if __name__ == '__main__':
+    main()